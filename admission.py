@@ -0,0 +1,235 @@
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+from langgraph.config import get_stream_writer
+
+# 검색 모드별 우선순위 (값이 작을수록 먼저 처리)
+PRIORITY_FAST_FORWARD = 0
+PRIORITY_COMMON = 1
+PRIORITY_SEARCH = 2
+
+_MODE_PRIORITIES = {
+    "FAST_FORWARD": PRIORITY_FAST_FORWARD,
+    "COMMON": PRIORITY_COMMON,
+    "DEPARTMENT_SEARCH": PRIORITY_COMMON,
+}
+
+_request_priority: ContextVar[int] = ContextVar("request_priority", default=PRIORITY_COMMON)
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def get_priority(search_type: Optional[str]) -> int:
+    """검색 모드의 우선순위를 반환합니다. 정의되지 않은 모드는 검색(SEARCH) 우선순위로 처리합니다."""
+    return _MODE_PRIORITIES.get((search_type or "COMMON").upper(), PRIORITY_SEARCH)
+
+
+def set_request_priority(search_type: Optional[str]):
+    """현재 요청(컨텍스트)의 우선순위를 설정합니다. 그래프 노드는 이 값을 상속합니다."""
+    _request_priority.set(get_priority(search_type))
+
+
+class AdmissionRejectedError(Exception):
+    """대기열이 가득 차 요청을 받을 수 없을 때 발생합니다."""
+    pass
+
+
+class TokenBucket:
+    """
+    분당 토큰 수(TPM) 기준의 토큰 버킷입니다.
+    버킷이 비어 있으면 필요한 토큰이 채워질 때까지 기다립니다.
+    """
+    def __init__(self, tokens_per_minute: int):
+        self.capacity = tokens_per_minute
+        self.rate = tokens_per_minute / 60.0
+        self._tokens = float(tokens_per_minute)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self, tokens: int):
+        # 버킷 용량보다 큰 요청은 용량만큼만 차감 (영원히 대기하지 않도록)
+        tokens = min(tokens, self.capacity)
+        while True:
+            async with self._lock:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                wait_seconds = (tokens - self._tokens) / self.rate
+            # 기다리는 동안 lock을 잡고 있지 않아 작은 요청이 큰 요청 뒤에 막히지 않음
+            await asyncio.sleep(wait_seconds)
+
+    @property
+    def available(self) -> int:
+        self._refill()
+        return int(self._tokens)
+
+
+class AdmissionGate:
+    """
+    백엔드 하나의 동시 실행 수를 제한하는 우선순위 세마포어입니다.
+
+    - 빈 슬롯이 없으면 (우선순위, 도착 순서)로 정렬된 대기열에서 기다립니다.
+    - 대기열이 max_queue를 넘으면 기다리지 않고 AdmissionRejectedError를 발생시킵니다.
+    - 대기 중에는 대기 순번이 바뀔 때마다 클라이언트에게 알립니다.
+    """
+    def __init__(self, name: str, max_concurrency: int, max_queue: int):
+        self.name = name
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+
+        self._active = 0
+        self._waiters: List[list] = []
+        self._sequence = itertools.count()
+        self._admitted = 0
+        self._rejected = 0
+
+    def _pending_waiters(self) -> List[list]:
+        return [entry for entry in self._waiters if not entry[2].done()]
+
+    def _get_position(self, entry: list) -> int:
+        return 1 + sum(1 for other in self._pending_waiters() if other[:2] < entry[:2])
+
+    async def acquire(self, priority: int):
+        if self._active < self.max_concurrency and not self._pending_waiters():
+            self._active += 1
+            self._admitted += 1
+            return
+
+        if len(self._pending_waiters()) >= self.max_queue:
+            self._rejected += 1
+            raise AdmissionRejectedError(f"'{self.name}' 대기열이 가득 찼습니다. ({self.max_queue})")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = [priority, next(self._sequence), future]
+        heapq.heappush(self._waiters, entry)
+
+        position = None
+        try:
+            while True:
+                current_position = self._get_position(entry)
+                if current_position != position:
+                    position = current_position
+                    report_queue_position(self.name, position)
+                try:
+                    # release()가 슬롯을 넘겨줄 때까지 대기하며 주기적으로 순번 갱신
+                    await asyncio.wait_for(asyncio.shield(future), timeout=1.0)
+                    break
+                except asyncio.TimeoutError:
+                    continue
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # 슬롯을 받은 직후 취소되었으면 슬롯을 반납
+                self.release()
+            else:
+                future.cancel()
+            raise
+        self._admitted += 1
+
+    def release(self):
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # 슬롯을 대기 중인 가장 높은 우선순위 요청에게 그대로 넘김
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "active": self._active,
+            "queued": len(self._pending_waiters()),
+            "max_queue": self.max_queue,
+            "admitted": self._admitted,
+            "rejected": self._rejected,
+        }
+
+
+def report_queue_position(backend: str, position: int):
+    """대기 순번을 custom 스트림으로 클라이언트에게 알립니다."""
+    try:
+        writer = get_stream_writer()
+    except Exception:
+        # 그래프 실행 컨텍스트 밖에서 호출된 경우
+        return
+    writer({
+        "mode": "loading",
+        "backend": backend,
+        "queue_position": position,
+        "message": f"요청이 많아 대기 중이에요. (대기 순번: {position}번)"
+    })
+
+
+class AdmissionController:
+    """
+    OpenAI, MCP 등 외부 백엔드 호출에 대한 공용 admission control입니다.
+    백엔드마다 동시 실행 수(AdmissionGate)와 분당 토큰 수(TokenBucket)를 제한합니다.
+    """
+    def __init__(self):
+        self._gates: Dict[str, AdmissionGate] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+
+    def configure(self, backend: str, max_concurrency: int, max_queue: int, tokens_per_minute: Optional[int] = None):
+        self._gates[backend] = AdmissionGate(backend, max_concurrency, max_queue)
+        if tokens_per_minute:
+            self._buckets[backend] = TokenBucket(tokens_per_minute)
+
+    @asynccontextmanager
+    async def admit(self, backend: str, tokens: int = 0, priority: Optional[int] = None):
+        """
+        백엔드 호출 구간을 감쌉니다.
+
+        async with admission_controller.admit("openai", tokens=1200):
+            ...
+        """
+        gate = self._gates.get(backend)
+        if gate is None:
+            yield
+            return
+
+        await gate.acquire(_request_priority.get() if priority is None else priority)
+        try:
+            bucket = self._buckets.get(backend)
+            if bucket is not None and tokens:
+                await bucket.acquire(tokens)
+            yield
+        finally:
+            gate.release()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = {backend: gate.get_metrics() for backend, gate in self._gates.items()}
+        for backend, bucket in self._buckets.items():
+            metrics[backend]["tokens_per_minute"] = bucket.capacity
+            metrics[backend]["available_tokens"] = bucket.available
+        return metrics
+
+
+admission_controller = AdmissionController()
+admission_controller.configure(
+    "openai",
+    max_concurrency=_get_int_env("ADMISSION_OPENAI_CONCURRENCY", 16),
+    max_queue=_get_int_env("ADMISSION_OPENAI_QUEUE", 64),
+    tokens_per_minute=_get_int_env("ADMISSION_OPENAI_TPM", 200000),
+)
+admission_controller.configure(
+    "mcp",
+    max_concurrency=_get_int_env("ADMISSION_MCP_CONCURRENCY", 8),
+    max_queue=_get_int_env("ADMISSION_MCP_QUEUE", 32),
+)
@@ -1,37 +1,77 @@
 from fastapi import FastAPI, WebSocket, Request
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse
 from fastapi.templating import Jinja2Templates
-from graphs.main_graph import graph_agent_instance as agent
 from models import ChatRequest, StatelessChatRequest, HttpResponse
-from databases.chat_database import get_chats_by_session_id
-import uvicorn, json
+from databases.chat_history_repository import instance as chat_history_repository
+from databases.database_connector import instance as db
+import uvicorn, json, asyncio
+from contextlib import asynccontextmanager
 from fastapi.websockets import WebSocketDisconnect
 from stream_models import AiMessageChunkModel, ChunkMetadataModel
 from utils import write_stream_log
-from databases.chat_database import get_chats_by_session_id
-from databases.redis_connector import existsKey, findBySessionId, save as save_to_redis
+from graphs.nodes.node_utils import is_client_streaming_node
+from admission import AdmissionRejectedError
+from resources import resource_registry
 
-app = FastAPI()
+def _create_graph_agent():
+    # langgraph/langchain import와 그래프 컴파일은 warm-up 또는 첫 요청에서 수행
+    from graphs.main_graph import graph_agent_instance
+    return graph_agent_instance
+
+def _create_chat_gpt():
+    from tools.mcp.llm_models.chat_gpt import model_instance
+    return model_instance
+
+def _create_chroma_db():
+    from tools.mcp.vectordb.chroma.chroma_db import db_instance
+    return db_instance
+
+def _create_hybrid_retriever():
+    from graphs.nodes.department_search import hybrid_retriever
+    return hybrid_retriever
+
+resource_registry.register("graph", _create_graph_agent)
+resource_registry.register("chat_gpt", _create_chat_gpt)
+resource_registry.register("mysql", lambda: db)
+# 임베딩 모델은 학과 검색/시맨틱 캐시에만 쓰이므로 준비 전에도 다른 요청은 처리
+resource_registry.register("chroma", _create_chroma_db, required=False)
+resource_registry.register("hybrid_retriever", _create_hybrid_retriever, required=False)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 서버는 바로 요청을 받고, 그래프 컴파일/MCP 세션 연결/모델 로드 등은 백그라운드로 수행
+    warm_up_task = asyncio.create_task(resource_registry.warm_up_all())
+    yield
+    warm_up_task.cancel()
+    chat_history_repository.shutdown()
+
+app = FastAPI(lifespan=lifespan)
 
 templates = Jinja2Templates(directory="templates")
 
+@app.exception_handler(AdmissionRejectedError)
+async def admission_rejected_handler(request: Request, e: AdmissionRejectedError):
+    print(f"🚦 요청 거절: {e}")
+    return JSONResponse(
+        status_code=503,
+        content=HttpResponse(
+            status=503,
+            message="요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.",
+            item=None
+        ).model_dump()
+    )
+
 @app.post("/api/v1/llm/chat", response_model=HttpResponse)
 async def chat(request: ChatRequest):
+    agent = await resource_registry.aget("graph")
     
-    chats = sorted(get_chats_by_session_id(request.sessionId), key=lambda chat: chat.created_at)
-    messages = []
+    messages = await chat_history_repository.get_messages(request.sessionId)
     
-    for idx, chat in enumerate(chats):
-        role = "assistant" if chat.is_bot else "user"
-        
-        print(f"chat {idx}: {chat.content}")
-        
-        messages.append({
-            "role": role,
-            "content": chat.content
-        })
+    for idx, message in enumerate(messages):
+        print(f"chat {idx}: {message['content']}")
     
-    result = await agent.run(question=request.question,
+    result = await agent.run(thread_id=request.sessionId,
+              question=request.question,
               existing_messages=messages,
               search_type=request.chatType,
               optional_args=request.additionalData
@@ -49,6 +89,7 @@ async def chat(request: ChatRequest):
     
 @app.post("/api/v1/llm/query", response_model=HttpResponse)
 async def query(request: StatelessChatRequest):
+    agent = await resource_registry.aget("graph")
     result = await agent.run(
               thread_id=request.sessionId,
               question=request.question,
@@ -77,32 +118,16 @@ async def chat_stream(websocket: WebSocket):
                 data = await websocket.receive_json()
                 session_id = data.get("session_id")
                 
-                # 1) Redis에 session_id에 대한 채팅목록이 존재하면 로드
+                # Redis 캐시의 최근 메시지 윈도우를 로드 (없으면 MySQL에서 로드 후 캐시)
                 messages = []
                 
                 if session_id:
-                    # Redis에서 채팅 기록 확인
-                    redis_exists = await existsKey(session_id)
-                    
-                    if redis_exists:
-                        # Redis에서 메시지 로드
-                        messages = await findBySessionId(session_id)
-                        print(f"Redis에서 {len(messages)}개의 메시지를 로드했습니다.")
-                    else:
-                        # 2) Redis에 없다면 MySQL 통해 채팅내역 모두 로드
-                        chats = get_chats_by_session_id(session_id)
-                        for chat in chats:
-                            messages.append({
-                                "role": "assistant" if chat.is_bot else "user",
-                                "content": chat.content
-                            })
-                        print(f"MySQL에서 {len(messages)}개의 메시지를 로드했습니다.")
-                        
-                        # MySQL에서 로드한 메시지를 Redis에 저장
-                        if messages:
-                            await save_to_redis(session_id, messages)
+                    messages = await chat_history_repository.get_recent_messages(session_id)
+                
+                agent = await resource_registry.aget("graph")
                 
                 current_node_name = None
+                answer = ""
                 
                 await websocket.send_json({
                     "mode": "loading",
@@ -117,6 +142,13 @@ async def chat_stream(websocket: WebSocket):
                                                     search_type=data.get("search_type"),
                                                     optional_args=data.get("optional_args")):
                     
+                    stream_mode, chunk = chunk
+                    
+                    # 노드가 보낸 사용자 정의 이벤트 (예: SEARCH_ALL 부분 결과)는 그대로 전달
+                    if stream_mode == "custom":
+                        await websocket.send_json(ChunkMetadataModel.get_custom_payload(chunk))
+                        continue
+                    
                     if current_node_name is None:
                         init_payload = ChunkMetadataModel.get_client_answer_payload()
                         await websocket.send_json(init_payload)
@@ -136,9 +168,10 @@ async def chat_stream(websocket: WebSocket):
                     if ((current_node_name != meta.node_name) or (current_node_name is None)):
                         await websocket.send_json(payload)
 
-                    # 최종 메시지 생성 단계(merge_messages) 일 때 메시지 전송
-                    if meta.node_name == "merge_messages":
+                    # 클라이언트 스트리밍이 선언된 노드(merge_messages, fast_forward_question 등)일 때 메시지 전송
+                    if is_client_streaming_node(meta.node_name):
                         await websocket.send_text(ai_chunk.content)
+                        answer += ai_chunk.content or ""
 
                     current_node_name = meta.node_name
 
@@ -153,11 +186,19 @@ async def chat_stream(websocket: WebSocket):
                         }
                     }
                 )   
+                
+                # 이번 턴의 질문/답변을 캐시에 이어 붙여 다음 턴에서 재사용
+                if session_id and answer:
+                    await chat_history_repository.append_turn(session_id, data.get("question"), answer)
                    
             except WebSocketDisconnect:
                 client_host, client_port = websocket.client if hasattr(websocket, "client") else ("알 수 없음", "알 수 없음")
                 print(f"클라이언트 연결 종료 - IP: {client_host}, PORT: {client_port}")
                 break
+            except AdmissionRejectedError as e:
+                print(f"🚦 요청 거절: {e}")
+                error_response = ChunkMetadataModel.get_error_payload("[⛔ 오류]: 요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요.")
+                await websocket.send_json(error_response)
             except json.JSONDecodeError as e:
                 print(f"JSON 파싱 오류: {e}")
                 error_response = ChunkMetadataModel.get_error_payload("[⛔ 오류]: 잘못된 데이터 형식입니다.")
@@ -175,6 +216,37 @@ async def chat_stream(websocket: WebSocket):
     finally:
         print("WebSocket 연결 종료")
         
+@app.get("/api/v1/llm/metrics", response_model=HttpResponse)
+async def metrics():
+    agent = await resource_registry.aget("graph")
+    return HttpResponse(
+        status=200,
+        message="메트릭을 조회했습니다.",
+        item={
+            "db_pool": db.get_pool_metrics(),
+            "semantic_cache": agent.semantic_cache.get_metrics(),
+            "admission": agent.admission_controller.get_metrics()
+        }
+    )
+        
+@app.get("/health/live", response_model=HttpResponse)
+async def health_live():
+    # 프로세스가 살아 있는지만 확인 (외부 리소스 상태와 무관)
+    return HttpResponse(status=200, message="서버가 동작 중입니다.", item=None)
+
+@app.get("/health/ready", response_model=HttpResponse)
+async def health_ready():
+    # 필수 리소스(그래프, LLM 클라이언트, DB)가 모두 준비되었을 때만 200
+    ready = resource_registry.is_ready()
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content=HttpResponse(
+            status=200 if ready else 503,
+            message="요청을 처리할 준비가 되었습니다." if ready else "리소스를 준비 중입니다.",
+            item={"resources": resource_registry.get_status()}
+        ).model_dump()
+    )
+        
 @app.get("/chat", response_class=HTMLResponse)
 async def chat_page(request: Request):
     return templates.TemplateResponse("chat.html", {"request": request})
@@ -0,0 +1,71 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+from databases.chat_database import get_chats_by_session_id
+from databases.database_connector import instance as db
+from databases.redis_connector import appendMessages, findRecentBySessionId, save as save_to_redis
+from models import Chat
+
+
+def to_message(chat: Chat) -> Dict[str, Any]:
+    """Chat을 그래프에 전달하는 메시지 형식으로 변환합니다."""
+    return {
+        "role": "assistant" if chat.is_bot else "user",
+        "content": chat.content
+    }
+
+
+class ChatHistoryRepository:
+    """
+    채팅 내역을 이벤트 루프를 막지 않고 조회하기 위한 비동기 저장소입니다.
+
+    동기 MySQL 조회는 커넥션 풀 크기만큼의 스레드를 가진 전용 executor에서 실행하므로,
+    느린 쿼리가 있어도 다른 WebSocket 스트림은 계속 처리됩니다.
+    """
+    def __init__(self, max_workers: int):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="chat-history")
+
+    async def get_chats(self, session_id: str) -> List[Chat]:
+        """세션의 모든 Chat을 생성 시간 순으로 반환합니다."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, get_chats_by_session_id, session_id)
+
+    async def get_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """세션의 채팅 내역을 role/content 메시지 목록으로 반환합니다."""
+        chats = await self.get_chats(session_id)
+        return [to_message(chat) for chat in chats]
+
+    async def get_recent_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        """
+        세션의 최근 메시지 윈도우를 반환합니다.
+        Redis 캐시를 먼저 조회하고, 없으면 MySQL에서 로드한 뒤 캐시에 채워둡니다.
+        """
+        messages = await findRecentBySessionId(session_id)
+        if messages:
+            print(f"Redis에서 {len(messages)}개의 메시지를 로드했습니다.")
+            return messages
+
+        messages = await self.get_messages(session_id)
+        print(f"MySQL에서 {len(messages)}개의 메시지를 로드했습니다.")
+
+        # MySQL에서 로드한 메시지를 Redis에 저장 (최근 윈도우만 유지됨)
+        if messages:
+            await save_to_redis(session_id, messages)
+        return messages
+
+    async def append_turn(self, session_id: str, question: str, answer: str):
+        """
+        한 턴의 질문과 답변을 Redis 캐시에 이어 붙여(write-through) 다음 턴에서 그대로 사용합니다.
+        """
+        await appendMessages(session_id, [
+            {"role": "user", "content": question},
+            {"role": "assistant", "content": answer}
+        ])
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
+
+
+# 풀 크기보다 많은 스레드는 연결을 기다리기만 하므로 executor 크기를 풀 크기에 맞춤
+instance = ChatHistoryRepository(max_workers=db.pool.max_size)
@@ -1,9 +1,173 @@
 import mysql.connector
 import json,os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ConnectionPoolTimeoutError(Exception):
+    """커넥션 풀에서 제한 시간 안에 연결을 가져오지 못했을 때 발생합니다."""
+
+
+class ConnectionPool:
+    """
+    최대 크기가 제한된 MySQL 커넥션 풀입니다.
+
+    - checkout()으로 연결을 빌리고 release()로 반납합니다. 최대 크기를 넘으면 반납될 때까지 대기합니다.
+    - 일정 시간 이상 유휴 상태였던 연결은 빌려주기 전에 ping으로 상태를 확인하고, 끊어진 연결은 폐기합니다.
+    - get_metrics()로 풀 사용 현황을 확인할 수 있습니다.
+    """
+    def __init__(self, connect, max_size: int = 10, checkout_timeout: float = 5.0, health_check_interval: float = 30.0):
+        self._connect = connect
+        self.max_size = max_size
+        self.checkout_timeout = checkout_timeout
+        self.health_check_interval = health_check_interval
+
+        # 최근에 반납된 연결부터 재사용 (오래된 연결은 자연스럽게 유휴 상태로 남음)
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+
+        self._in_use = 0
+        self._created = 0
+        self._discarded = 0
+        self._checkouts = 0
+        self._timeouts = 0
+        self._total_wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    def checkout(self, timeout: float = None):
+        """
+        풀에서 연결을 가져옵니다. 사용 후에는 반드시 release()로 반납해야 합니다.
+        """
+        timeout = self.checkout_timeout if timeout is None else timeout
+        started_at = time.monotonic()
+
+        if not self._slots.acquire(timeout=timeout):
+            with self._lock:
+                self._timeouts += 1
+            raise ConnectionPoolTimeoutError(f"{timeout}초 안에 데이터베이스 연결을 가져오지 못했습니다. (최대 {self.max_size}개 사용 중)")
+
+        try:
+            connection = self._get_healthy_connection()
+        except Exception:
+            self._slots.release()
+            raise
+
+        waited = time.monotonic() - started_at
+        with self._lock:
+            self._in_use += 1
+            self._checkouts += 1
+            self._total_wait_seconds += waited
+            self._max_wait_seconds = max(self._max_wait_seconds, waited)
+
+        return connection
+
+    def release(self, connection, discard: bool = False):
+        """
+        연결을 풀에 반납합니다. discard가 True이면 연결을 닫고 폐기합니다.
+        """
+        try:
+            if not discard:
+                try:
+                    # 다음 사용자가 이전 트랜잭션 상태를 이어받지 않도록 정리
+                    if connection.in_transaction:
+                        connection.rollback()
+                except Exception:
+                    discard = True
+
+            if discard:
+                self._close(connection)
+            else:
+                self._idle.put((connection, time.monotonic()))
+        finally:
+            with self._lock:
+                self._in_use -= 1
+            self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: float = None):
+        """
+        with 문으로 연결을 빌리고, 블록이 끝나면 자동으로 반납합니다.
+        """
+        connection = self.checkout(timeout)
+        discard = False
+        try:
+            yield connection
+        except Exception:
+            # 연결 자체가 끊어진 경우에만 폐기
+            discard = not self._is_alive(connection)
+            raise
+        finally:
+            self.release(connection, discard=discard)
+
+    def get_metrics(self) -> dict:
+        """풀 사용 현황을 반환합니다."""
+        with self._lock:
+            return {
+                "max_size": self.max_size,
+                "in_use": self._in_use,
+                "idle": self._idle.qsize(),
+                "created": self._created,
+                "discarded": self._discarded,
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "avg_wait_ms": (self._total_wait_seconds / self._checkouts * 1000) if self._checkouts else 0.0,
+                "max_wait_ms": self._max_wait_seconds * 1000,
+            }
+
+    def close_all(self):
+        """유휴 연결을 모두 닫습니다."""
+        while True:
+            try:
+                connection, _ = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            self._close(connection)
+
+    def _get_healthy_connection(self):
+        while True:
+            try:
+                connection, last_used = self._idle.get_nowait()
+            except queue.Empty:
+                return self._create()
+
+            if time.monotonic() - last_used < self.health_check_interval:
+                return connection
+
+            # 오래 유휴 상태였던 연결은 ping으로 확인 후 사용
+            if self._is_alive(connection):
+                return connection
+
+            self._close(connection)
+
+    def _create(self):
+        connection = self._connect()
+        with self._lock:
+            self._created += 1
+        return connection
+
+    def _close(self, connection):
+        try:
+            connection.close()
+        except Exception:
+            pass
+        with self._lock:
+            self._discarded += 1
+
+    @staticmethod
+    def _is_alive(connection) -> bool:
+        try:
+            connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
 
 class DatabaseConnector:
     def __init__(self):
-        
+
         # 현재 파일(chat_gpt.py 등)의 디렉토리 기준으로 경로 설정
         base_dir = os.path.dirname(os.path.abspath(__file__))
         config_path = os.path.join(base_dir, 'database_config.json')
@@ -12,7 +176,15 @@ class DatabaseConnector:
             config = json.load(f)
         self.db_config = config['database']
 
-        self.connection = mysql.connector.connect(
+        self.pool = ConnectionPool(
+            self._create_connection,
+            max_size=self.db_config.get('pool_size', 10),
+            checkout_timeout=self.db_config.get('pool_timeout', 5.0),
+            health_check_interval=self.db_config.get('pool_health_check_interval', 30.0)
+        )
+
+    def _create_connection(self):
+        return mysql.connector.connect(
             host=self.db_config.get('host', 'localhost'),
             port=self.db_config.get('port', 3306),
             database=self.db_config.get('name', ''),
@@ -20,34 +192,31 @@ class DatabaseConnector:
             password=self.db_config.get('password', '')
         )
 
-    def get_connection(self):
+    def connection(self, timeout: float = None):
+        """
+        커넥션 풀에서 MySQL 연결을 빌려오는 컨텍스트 매니저를 반환합니다.
+        with 블록이 끝나면 연결은 닫히지 않고 풀에 반납됩니다.
+        """
+        return self.pool.connection(timeout)
+
+    def warm_up(self):
         """
-        MySQL 연결 객체를 반환합니다.
+        풀에 연결을 하나 만들어 ping으로 확인합니다. (연결은 닫지 않고 풀에 반납되어 첫 요청에서 재사용)
         """
-        if not self.connection.is_connected():
-            self.connection = mysql.connector.connect(
-                host=self.db_config.get('host', 'localhost'),
-                port=self.db_config.get('port', 3306),
-                database=self.db_config.get('name', ''),
-                user=self.db_config.get('user', ''),
-                password=self.db_config.get('password', '')
-            )
-            
-        return self.connection
+        with self.connection() as connection:
+            connection.ping(reconnect=False)
 
-    def get_cursor(self):
+    def get_pool_metrics(self) -> dict:
         """
-        MySQL 커서 객체를 반환합니다.
+        커넥션 풀 사용 현황을 반환합니다.
         """
-        return self.cursor
+        return self.pool.get_metrics()
 
     def __del__(self):
         """
-        소멸자에서 연결과 커서를 정리합니다.
+        소멸자에서 풀에 남아있는 연결을 정리합니다.
         """
-        if hasattr(self, 'cursor'):
-            self.cursor.close()
-        if hasattr(self, 'connection'):
-            self.connection.close()
+        if hasattr(self, 'pool'):
+            self.pool.close_all()
 
-instance = DatabaseConnector()
\ No newline at end of file
+instance = DatabaseConnector()
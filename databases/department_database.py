@@ -0,0 +1,21 @@
+from databases.database_connector import instance as db
+from tools.mcp.search_index import DepartmentResolver
+from typing import Dict, List
+
+def get_college_department_pairs() -> List[Dict[str, str]]:
+    """
+    departments 테이블의 모든 row를 college, department로 이루어진 딕셔너리 리스트로 반환합니다.
+    """
+    with db.connection() as connection:
+        cursor = connection.cursor()
+        try:
+            cursor.execute("SELECT college, department FROM departments")
+            rows = cursor.fetchall()
+        finally:
+            cursor.close()
+
+    return [{"college": row[0], "department": row[1]} for row in rows]
+
+
+# 학과명 정규화 resolver (그래프 노드에서 공유, 1시간마다 갱신)
+department_resolver = DepartmentResolver(loader=get_college_department_pairs)
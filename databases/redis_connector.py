@@ -2,6 +2,7 @@ import json
 import os
 from typing import Any, Dict, List, Optional
 
+from redis import Redis as SyncRedis
 from redis.asyncio import Redis
 
 
@@ -14,6 +15,10 @@ def _get_session_key(session_id: str) -> str:
     return f"chat:{session_id}"
 
 
+def _get_summary_key(thread_id: str) -> str:
+    return f"chat_summary:{thread_id}"
+
+
 def _get_ttl_seconds() -> Optional[int]:
     ttl_str = os.getenv("REDIS_TTL_SECONDS", "1800")
     if not ttl_str:
@@ -25,8 +30,31 @@ def _get_ttl_seconds() -> Optional[int]:
         return None
 
 
+def _get_history_window() -> Optional[int]:
+    # 세션별로 보관할 최근 메시지 수 (user/assistant 각각 1개씩 = 1턴에 2개)
+    window_str = os.getenv("REDIS_HISTORY_WINDOW", "40")
+    try:
+        window_val = int(window_str)
+        return window_val if window_val > 0 else None
+    except ValueError:
+        return None
+
+
+def _parse_messages(items: List[str]) -> List[Dict[str, Any]]:
+    result: List[Dict[str, Any]] = []
+    for item in items:
+        try:
+            result.append(json.loads(item))
+        except Exception:
+            # 손상된 항목은 무시
+            continue
+    return result
+
+
 class RedisClient:
     _instance: Optional[Redis] = None
+    _binary_instance: Optional[Redis] = None
+    _sync_binary_instance: Optional[SyncRedis] = None
 
     @classmethod
     def get_client(cls) -> Redis:
@@ -34,6 +62,20 @@ class RedisClient:
             cls._instance = Redis.from_url(_get_redis_url(), decode_responses=True)
         return cls._instance
 
+    @classmethod
+    def get_binary_client(cls) -> Redis:
+        """직렬화된 바이트 값을 그대로 다루기 위한(decode 하지 않는) 클라이언트를 반환합니다."""
+        if cls._binary_instance is None:
+            cls._binary_instance = Redis.from_url(_get_redis_url(), decode_responses=False)
+        return cls._binary_instance
+
+    @classmethod
+    def get_sync_binary_client(cls) -> SyncRedis:
+        """동기 API(그래프 invoke/stream, get_state 등)에서 사용하는 decode 하지 않는 동기 클라이언트를 반환합니다."""
+        if cls._sync_binary_instance is None:
+            cls._sync_binary_instance = SyncRedis.from_url(_get_redis_url(), decode_responses=False)
+        return cls._sync_binary_instance
+
 
 async def existsKey(session_id: str) -> bool:
     """세션 키가 Redis에 존재하는지 확인합니다."""
@@ -49,20 +91,33 @@ async def findBySessionId(session_id: str) -> List[Dict[str, Any]]:
     key = _get_session_key(session_id)
     # 리스트에 저장된 각 요소는 JSON 문자열
     items = await client.lrange(key, 0, -1)
-    result: List[Dict[str, Any]] = []
-    for item in items:
-        try:
-            result.append(json.loads(item))
-        except Exception:
-            # 손상된 항목은 무시
-            continue
-    return result
+    return _parse_messages(items)
+
+
+async def findRecentBySessionId(session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    세션의 최근 limit개 메시지를 입력 순서로 반환합니다.
+    조회 시 TTL을 갱신하여(sliding expiry) 대화 중인 세션이 만료되지 않도록 합니다.
+    """
+    client = RedisClient.get_client()
+    key = _get_session_key(session_id)
+    limit = limit or _get_history_window()
+    pipe = client.pipeline(transaction=False)
+    pipe.lrange(key, -limit if limit else 0, -1)
+    ttl_seconds = _get_ttl_seconds()
+    if ttl_seconds:
+        pipe.expire(key, ttl_seconds)
+    items, *_ = await pipe.execute()
+    return _parse_messages(items)
 
 
 async def save(session_id: str, messages: List[Dict[str, Any]]) -> None:
-    """세션 메시지 목록을 통으로 저장(덮어쓰기)."""
+    """세션 메시지 목록을 통으로 저장(덮어쓰기). 최근 메시지 윈도우만 유지합니다."""
     client = RedisClient.get_client()
     key = _get_session_key(session_id)
+    window = _get_history_window()
+    if window:
+        messages = messages[-window:]
     pipe = client.pipeline(transaction=True)
     pipe.delete(key)
     if messages:
@@ -74,14 +129,29 @@ async def save(session_id: str, messages: List[Dict[str, Any]]) -> None:
     await pipe.execute()
 
 
-async def appendMessage(session_id: str, message: Dict[str, Any]) -> None:
-    """단일 메시지를 세션 리스트의 끝에 추가."""
+async def appendMessages(session_id: str, messages: List[Dict[str, Any]]) -> None:
+    """
+    메시지들을 세션 리스트의 끝에 추가하고, 최근 메시지 윈도우만 남기도록 잘라냅니다.
+    대화가 길어져도 한 턴당 비용이 일정하게 유지됩니다.
+    """
+    if not messages:
+        return
     client = RedisClient.get_client()
     key = _get_session_key(session_id)
-    await client.rpush(key, json.dumps(message, ensure_ascii=False))
+    pipe = client.pipeline(transaction=True)
+    pipe.rpush(key, *[json.dumps(m, ensure_ascii=False) for m in messages])
+    window = _get_history_window()
+    if window:
+        pipe.ltrim(key, -window, -1)
     ttl_seconds = _get_ttl_seconds()
     if ttl_seconds:
-        await client.expire(key, ttl_seconds)
+        pipe.expire(key, ttl_seconds)
+    await pipe.execute()
+
+
+async def appendMessage(session_id: str, message: Dict[str, Any]) -> None:
+    """단일 메시지를 세션 리스트의 끝에 추가."""
+    await appendMessages(session_id, [message])
 
 
 async def clearBySessionId(session_id: str) -> None:
@@ -91,3 +161,20 @@ async def clearBySessionId(session_id: str) -> None:
     await client.delete(key)
 
 
+async def findSummaryByThreadId(thread_id: str) -> Optional[Dict[str, Any]]:
+    """스레드의 이전 대화 요약을 반환합니다. 없으면 None."""
+    client = RedisClient.get_client()
+    item = await client.get(_get_summary_key(thread_id))
+    if not item:
+        return None
+    try:
+        return json.loads(item)
+    except Exception:
+        return None
+
+
+async def saveSummary(thread_id: str, summary: Dict[str, Any]) -> None:
+    """스레드의 이전 대화 요약을 저장합니다."""
+    client = RedisClient.get_client()
+    ttl_seconds = _get_ttl_seconds()
+    await client.set(_get_summary_key(thread_id), json.dumps(summary, ensure_ascii=False), ex=ttl_seconds)
@@ -0,0 +1,67 @@
+import asyncio
+from typing import Dict, Optional, Tuple
+
+from langgraph.prebuilt import create_react_agent
+
+from graphs.graph_status import GraphStatus
+from mcp_client_pool import instance as mcp_client_pool
+from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
+
+
+class ReactAgentRegistry:
+    """
+    검색 모드별로 컴파일된 ReAct agent를 보관합니다.
+
+    agent는 모드별로 (사용하는 서버들의 세션 버전, tool 목록)을 키로 캐시되며,
+    그 모드가 사용하는 MCP 서버의 세션이 다시 연결되어 tool이 바뀐 경우에만 새로 컴파일합니다.
+    (다른 서버의 재연결이나 다른 모드의 컴파일은 캐시된 agent에 영향을 주지 않음)
+    """
+    def __init__(self):
+        self._server_names: Dict[str, Optional[str]] = {}
+        self._agents: Dict[str, Tuple[Tuple, object]] = {}
+        self._lock = asyncio.Lock()
+
+    def register(self, mode: str, server_name: Optional[str] = None):
+        """
+        모드가 사용할 MCP 서버를 등록합니다. server_name이 없으면 모든 서버의 tool을 사용합니다.
+        """
+        self._server_names[mode] = server_name
+
+    def get_server_name(self, mode: str) -> Optional[str]:
+        if mode not in self._server_names:
+            raise ValueError(f"'{mode}' 모드의 agent가 등록되지 않았습니다.")
+        return self._server_names[mode]
+
+    async def get_agent(self, mode: str):
+        """모드에 해당하는 컴파일된 agent를 반환합니다."""
+        server_name = self.get_server_name(mode)
+        tools, version = await mcp_client_pool.get_tools_with_version(server_name=server_name)
+        key = (version, tuple(tool.name for tool in tools))
+
+        cached = self._agents.get(mode)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        async with self._lock:
+            cached = self._agents.get(mode)
+            if cached is not None and cached[0] == key:
+                return cached[1]
+
+            # 이 모드의 이전 버전 agent만 교체
+            agent = create_react_agent(model=chat_gpt.get_model(),
+                                    tools=tools,
+                                    state_schema=GraphStatus)
+            self._agents[mode] = (key, agent)
+            print(f"🛠️ ReAct agent 컴파일: {mode} (tools: {len(tools)})")
+            return agent
+
+    async def warm_up(self):
+        """등록된 모든 모드의 agent를 미리 컴파일합니다."""
+        for mode in self._server_names:
+            try:
+                await self.get_agent(mode)
+            except Exception as e:
+                print(f"⚠️ ReAct agent 사전 컴파일 실패: {mode} - {e}")
+
+
+react_agent_registry = ReactAgentRegistry()
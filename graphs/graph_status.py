@@ -1,14 +1,32 @@
 from typing import TypedDict, Annotated, List, Dict, Any
-import operator
+
+
+# messages 맨 앞에 이 role을 가진 메시지를 넣으면, 기존 메시지를 모두 지우고 뒤의 메시지로 교체합니다.
+REMOVE_ALL_MESSAGES = "__remove_all__"
+
+
+def add_or_replace_messages(left: List[Dict[str, Any]], right: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    messages 리듀서. 기본적으로 이어 붙이지만, REMOVE_ALL_MESSAGES 메시지로 시작하면 교체합니다.
+    같은 thread_id로 다시 실행할 때 체크포인트에 남은 이전 메시지에 전체 대화 내역이 중복으로 쌓이지 않도록 합니다.
+    """
+    if right and isinstance(right[0], dict) and right[0].get("role") == REMOVE_ALL_MESSAGES:
+        return list(right[1:])
+    return left + right
 
 
 class GraphStatus(TypedDict):
-    messages: Annotated[List[Dict[str, Any]], operator.add]
-    answer: str   
+    messages: Annotated[List[Dict[str, Any]], add_or_replace_messages]
+    answer: str
     instruction: str
-    
+
     search_type: str
     optional_args: Dict[str, Any]
     context_relrelevant_score: float
     remaining_steps: int
     thread_id: str
+    
+    # 요청 마감 시각 (time.time() 기준). 노드는 남은 시간 안에서만 실행됩니다.
+    deadline: float
+    # 시간 초과 등으로 fallback 결과가 반환되었는지 여부 (그래프 캐시에 저장하지 않음)
+    degraded: bool
@@ -0,0 +1,150 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from databases.redis_connector import findSummaryByThreadId, saveSummary
+from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def _hash_message(message: Dict[str, Any]) -> str:
+    serialized = json.dumps(message, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class HistoryCompactor:
+    """
+    그래프에 들어가기 전에 이전 대화 내역을 토큰 예산 안으로 줄입니다.
+
+    - 최근 keep_last_turns 턴은 그대로 유지합니다.
+    - 그보다 오래된 메시지는 thread_id별로 저장된 누적 요약(rolling summary)으로 대체합니다. (thread_id가 없으면 제외)
+    - 아직 요약되지 않은 오래된 메시지가 summary_trigger_tokens를 넘거나 예산을 초과할 때만 요약을 갱신하므로,
+      매 턴마다 요약 LLM 호출이 발생하지 않습니다.
+    """
+    def __init__(self, token_budget: int, keep_last_turns: int, summary_trigger_tokens: int):
+        self.token_budget = token_budget
+        self.keep_last_turns = keep_last_turns
+        self.summary_trigger_tokens = summary_trigger_tokens
+
+    async def compact(self, thread_id: Optional[Any], messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        :param thread_id: 요약을 저장/재사용할 대화 식별자. 없으면(요청마다 새로 만든 id) 요약하지 않고 오래된 메시지를 제외합니다.
+        """
+        if not messages or chat_gpt.count_message_tokens(messages) <= self.token_budget:
+            return messages
+
+        older, recent = self._split_recent(messages)
+        if not older:
+            return recent
+
+        if thread_id is None:
+            # 다음 요청에서 다시 찾을 수 없는 요약을 만들면 매번 요약 LLM 호출만 늘어남
+            print(f"🗜️ 대화 내역 압축(요약 없음): {len(messages)}개 -> {len(recent)}개 메시지")
+            return recent
+
+        thread_id = str(thread_id)
+        summary = await self._load_summary(thread_id)
+        unsummarized = self._get_unsummarized(older, summary)
+
+        compacted = self._build_messages(summary, unsummarized, recent)
+        if unsummarized and (
+            chat_gpt.count_message_tokens(unsummarized) > self.summary_trigger_tokens
+            or chat_gpt.count_message_tokens(compacted) > self.token_budget
+        ):
+            summary = await self._summarize(thread_id, summary, unsummarized)
+            compacted = self._build_messages(summary, [], recent)
+
+        print(f"🗜️ 대화 내역 압축: {len(messages)}개 -> {len(compacted)}개 메시지, {chat_gpt.count_message_tokens(compacted)} 토큰")
+        return compacted
+
+    def _split_recent(self, messages: List[Dict[str, Any]]) -> tuple:
+        """최근 턴들을 예산 안에서 최대한 유지하고, 나머지를 오래된 메시지로 분리합니다."""
+        turns = self.keep_last_turns
+        while True:
+            split_index = self._find_turn_start(messages, turns)
+            recent = messages[split_index:]
+            if turns <= 1 or chat_gpt.count_message_tokens(recent) <= self.token_budget:
+                return messages[:split_index], recent
+            turns -= 1
+
+    @staticmethod
+    def _find_turn_start(messages: List[Dict[str, Any]], turns: int) -> int:
+        """뒤에서부터 turns번째 user 메시지의 위치를 반환합니다."""
+        seen = 0
+        for index in range(len(messages) - 1, -1, -1):
+            if messages[index].get("role") == "user":
+                seen += 1
+                if seen == turns:
+                    return index
+        return 0
+
+    @staticmethod
+    def _get_unsummarized(older: List[Dict[str, Any]], summary: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """요약에 마지막으로 포함된 메시지 이후의 오래된 메시지를 반환합니다."""
+        if not summary:
+            return older
+        last_hash = summary.get("last_message_hash")
+        for index in range(len(older) - 1, -1, -1):
+            if _hash_message(older[index]) == last_hash:
+                return older[index + 1:]
+        # 최근 윈도우가 밀려나 요약 지점을 찾을 수 없으면 남아있는 오래된 메시지를 모두 요약 대상으로 봄
+        return older
+
+    @staticmethod
+    def _build_messages(summary: Optional[Dict[str, Any]], unsummarized: List[Dict[str, Any]], recent: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        messages = []
+        if summary and summary.get("content"):
+            messages.append({"role": "system", "content": f"이전 대화 요약:\n{summary['content']}"})
+        return messages + unsummarized + recent
+
+    async def _summarize(self, thread_id: str, summary: Optional[Dict[str, Any]], unsummarized: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        previous = summary.get("content") if summary else ""
+        conversation = "\n".join(f"{message.get('role')}: {message.get('content')}" for message in unsummarized)
+        prompt = f'''Update the summary of the conversation between a university student and a chatbot.
+        Keep the facts the student mentioned (department, grade, interests), the courses and materials that were recommended, and any open questions.
+        Write concisely in Korean, within 10 bullet points.
+
+        ### Previous summary
+        {previous}
+
+        ### New messages
+        {conversation}'''
+
+        try:
+            content = await chat_gpt.aquery_by_single_instruction(prompt)
+        except Exception as e:
+            # 요약에 실패하면 오래된 메시지는 이번 요청에서 제외
+            print(f"⚠️ 대화 요약 실패: {e}")
+            return summary
+
+        summary = {
+            "content": content,
+            "last_message_hash": _hash_message(unsummarized[-1])
+        }
+        try:
+            await saveSummary(thread_id, summary)
+        except Exception as e:
+            print(f"⚠️ 대화 요약 저장 실패: {e}")
+        return summary
+
+    @staticmethod
+    async def _load_summary(thread_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            return await findSummaryByThreadId(thread_id)
+        except Exception as e:
+            print(f"⚠️ 대화 요약 조회 실패: {e}")
+            return None
+
+
+history_compactor = HistoryCompactor(
+    token_budget=_get_int_env("HISTORY_TOKEN_BUDGET", 3000),
+    keep_last_turns=_get_int_env("HISTORY_KEEP_LAST_TURNS", 3),
+    summary_trigger_tokens=_get_int_env("HISTORY_SUMMARY_TRIGGER_TOKENS", 1000),
+)
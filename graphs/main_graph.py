@@ -1,9 +1,16 @@
 from langgraph.graph import END, START, StateGraph
-from langgraph.checkpoint.memory import MemorySaver
 from typing import Dict, Any, List
-from graphs.graph_status import GraphStatus
-from langgraph.cache.memory import InMemoryCache
-from langgraph.types import CachePolicy
+from graphs.graph_status import GraphStatus, REMOVE_ALL_MESSAGES
+from graphs.history_compactor import history_compactor
+from graphs.semantic_cache import semantic_cache, SEMANTIC_CACHE_NODE_NAME
+from langchain_core.messages import AIMessageChunk
+from graphs.agent_registry import react_agent_registry
+from databases.department_database import department_resolver
+from admission import admission_controller, set_request_priority
+from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
+from graphs.nodes.node_utils import is_client_streaming_node
+from graphs.redis_cache import redis_cache, content_hash_key, node_cache_policy
+from graphs.redis_checkpointer import create_checkpointer
 
 from graphs.nodes.agent_question import agent_question
 from graphs.nodes.department_search import department_search
@@ -12,9 +19,13 @@ from graphs.nodes.init import init
 from graphs.nodes.kocw_search import kocw_search
 from graphs.nodes.merge import merge_messages
 from graphs.nodes.route import route
+from graphs.nodes.search_all import search_all
 from graphs.nodes.web_search import web_search
 from graphs.nodes.youtube_search import youtube_search
 
+import asyncio
+import os
+import time
 import uuid
 from utils import time_measurement
 
@@ -23,26 +34,28 @@ class AgentGraphApplication:
     @time_measurement
     def __init__(self):
         self.workflow = StateGraph(GraphStatus)
-        memory = MemorySaver()
-        cache = InMemoryCache()
-        cache_policy = CachePolicy(
-            ttl=600,
-            key_func = lambda state: str(state["thread_id"])+state["instruction"]
-        )
+        # 체크포인트는 기본적으로 Redis에 저장 (GRAPH_CHECKPOINTER=memory로 변경 가능)
+        self.checkpointer = create_checkpointer()
+        
+        # 노드 캐시는 Redis에 저장해 워커/재시작과 관계없이 공유 (thread_id는 키에 포함하지 않음)
+        self.cache = redis_cache
+        search_cache_key = content_hash_key()
+        history_cache_key = content_hash_key(include_messages=True)
         
         # node - initialize
         self.workflow.add_node("init", init)
         
         # node - main logic
-        self.workflow.add_node("youtube_search", youtube_search, cache_policy=cache_policy)
-        self.workflow.add_node("kocw_search", kocw_search, cache_policy=cache_policy)
-        self.workflow.add_node("web_search", web_search, cache_policy=cache_policy)
-        self.workflow.add_node("department_search", department_search, cache_policy=cache_policy)
-        self.workflow.add_node("agent_question", agent_question, cache_policy=cache_policy)
-        self.workflow.add_node("fast_forward_question", fast_forward_question, cache_policy=cache_policy)
+        self.workflow.add_node("youtube_search", youtube_search, cache_policy=node_cache_policy("youtube_search", 3600, search_cache_key))
+        self.workflow.add_node("kocw_search", kocw_search, cache_policy=node_cache_policy("kocw_search", 3600, search_cache_key))
+        self.workflow.add_node("web_search", web_search, cache_policy=node_cache_policy("web_search", 3600, search_cache_key))
+        self.workflow.add_node("search_all", search_all, cache_policy=node_cache_policy("search_all", 3600, search_cache_key))
+        self.workflow.add_node("department_search", department_search, cache_policy=node_cache_policy("department_search", 3600, content_hash_key("department")))
+        self.workflow.add_node("agent_question", agent_question, cache_policy=node_cache_policy("agent_question", 600, history_cache_key))
+        self.workflow.add_node("fast_forward_question", fast_forward_question, cache_policy=node_cache_policy("fast_forward_question", 600, search_cache_key))
         
         # node - summarize & evaluate
-        self.workflow.add_node("merge_messages", merge_messages, cache_policy=cache_policy)
+        self.workflow.add_node("merge_messages", merge_messages, cache_policy=node_cache_policy("merge_messages", 600, content_hash_key("department", include_messages=True)))
         
         # edge - depth 1
         self.workflow.add_edge(START, "init")
@@ -55,6 +68,7 @@ class AgentGraphApplication:
                 "YOUTUBE_SEARCH": "youtube_search",
                 "KOCW_SEARCH": "kocw_search",
                 "WEB_SEARCH": "web_search",
+                "SEARCH_ALL": "search_all",
                 "DEPARTMENT_SEARCH": "department_search",
                 "COMMON": "agent_question",
                 "FAST_FORWARD": "fast_forward_question",
@@ -65,6 +79,7 @@ class AgentGraphApplication:
         self.workflow.add_edge("youtube_search", "merge_messages")
         self.workflow.add_edge("kocw_search", "merge_messages")
         self.workflow.add_edge("web_search", "merge_messages")
+        self.workflow.add_edge("search_all", "merge_messages")
         self.workflow.add_edge("department_search", "merge_messages")
         self.workflow.add_edge("agent_question", "merge_messages")
     
@@ -73,36 +88,128 @@ class AgentGraphApplication:
         self.workflow.add_edge("fast_forward_question", END)
         self.workflow.add_edge("merge_messages", END)
 
-        self.app = self.workflow.compile(checkpointer=memory, cache=InMemoryCache())
+        self.app = self.workflow.compile(checkpointer=self.checkpointer, cache=self.cache)
+        
+        # MCP tool을 사용하는 모드별 ReAct agent 등록 (tool 목록이 바뀔 때만 다시 컴파일)
+        self.agent_registry = react_agent_registry
+        self.agent_registry.register("COMMON")
+        self.agent_registry.register("YOUTUBE_SEARCH", server_name="youtube_search_mcp")
+        self.agent_registry.register("KOCW_SEARCH", server_name="kocw_lecture_search_mcp")
+        self.agent_registry.register("WEB_SEARCH", server_name="naver_search_mcp")
+        
+        # 그래프 진입 전 대화 내역 압축 단계
+        self.history_compactor = history_compactor
+        
+        # 세션과 관계없이 비슷한 질문의 답변을 재사용하는 시맨틱 캐시
+        self.semantic_cache = semantic_cache
+        
+        # OpenAI 호출은 공용 admission control(동시 실행 수, 분당 토큰 수, 우선순위)을 거침
+        self.admission_controller = admission_controller
+        chat_gpt.set_admission(lambda tokens: self.admission_controller.admit("openai", tokens=tokens))
         
+        # 요청 하나가 그래프 안에서 사용할 수 있는 최대 시간(초)
+        self.request_timeout = float(os.getenv("GRAPH_REQUEST_TIMEOUT_SECONDS", "90"))
+        
+    async def warm_up(self):
+        """
+        MCP 세션 연결, ReAct agent 컴파일, 학과 목록 로드를 미리 수행합니다.
+        """
+        await self.agent_registry.warm_up()
+        
+        # 학과명 resolver 목록 미리 로드 (노드에서는 메모리 조회만 수행)
+        try:
+            await asyncio.to_thread(department_resolver.refresh)
+        except Exception as e:
+            print(f"⚠️ 학과 목록 로드 실패: {e}")
+        
+    async def _build_input(self, question: str, thread_id: str, existing_messages: List[Dict[str, Any]], search_type: str, optional_args: Dict[Any, Any], summary_thread_id: str = None) -> Dict[str, Any]:
+        # 토큰 예산에 맞게 이전 대화 내역을 압축 (최근 턴 유지 + 오래된 턴 요약)
+        # 요약은 호출자가 준 고정 thread_id가 있을 때만 저장/재사용
+        messages = await self.history_compactor.compact(summary_thread_id, existing_messages)
+        
+        return {
+            "thread_id": thread_id,
+            "instruction": question,
+            # 체크포인트에 남은 이전 실행의 메시지를 압축된 대화 내역으로 교체
+            "messages": [{"role": REMOVE_ALL_MESSAGES}] + messages,
+            "search_type": search_type.upper(), 
+            "optional_args": optional_args,
+            # 요청 전체의 시간 예산. 각 노드는 이 마감 시각을 넘기면 취소되고 fallback 결과를 반환
+            "deadline": time.time() + self.request_timeout,
+            "degraded": False
+        }
+    
     @time_measurement
     async def run(self, question: str, thread_id: str = None, existing_messages: List[Dict[str, Any]] = [], search_type: str = "COMMON", optional_args: Dict[Any, Any] = {}):
+        summary_thread_id = thread_id
         if thread_id is None:
             thread_id = uuid.uuid4()
         
-        return await self.app.ainvoke({
-                                "thread_id": thread_id,
-                                "instruction": question,
-                                "messages": existing_messages,
-                                "search_type": search_type.upper(), 
-                                "optional_args": optional_args},
+        # 이후 OpenAI/MCP 호출의 대기열 우선순위 (FAST_FORWARD > COMMON/DEPARTMENT_SEARCH > 검색)
+        set_request_priority(search_type)
+        
+        cache_query = await self.semantic_cache.prepare(question, search_type, optional_args, existing_messages)
+        cached_answer = self.semantic_cache.lookup(cache_query)
+        if cached_answer is not None:
+            return {"thread_id": thread_id, "instruction": question, "answer": cached_answer}
+        
+        graph_input = await self._build_input(question, thread_id, existing_messages, search_type, optional_args, summary_thread_id)
+        
+        result = await self.app.ainvoke(graph_input,
                                config={"configurable": {"thread_id": thread_id}})
+        
+        # 시간 초과로 일부 단계를 생략한 답변은 재사용하지 않음
+        if not result.get("degraded"):
+            self.semantic_cache.store(cache_query, result.get("answer"))
+        return result
     
     async def run_astream(self, question: str, thread_id: str = None, existing_messages: List[Dict[str, Any]] = [], search_type: str = "COMMON", optional_args: Dict[Any, Any] = {}):
+        summary_thread_id = thread_id
         if thread_id is None:
             thread_id = uuid.uuid4()
         
-        async for chunk in self.app.astream(
-            {
-                "thread_id": thread_id,
-                "instruction": question,
-                "messages": existing_messages,
-                "search_type": search_type.upper(), 
-                "optional_args": optional_args
-            },
-            config={"configurable": {"thread_id": thread_id}},
-            stream_mode="messages"
+        # 이후 OpenAI/MCP 호출의 대기열 우선순위 (FAST_FORWARD > COMMON/DEPARTMENT_SEARCH > 검색)
+        set_request_priority(search_type)
+        
+        cache_query = await self.semantic_cache.prepare(question, search_type, optional_args, existing_messages)
+        cached_answer = self.semantic_cache.lookup(cache_query)
+        if cached_answer is not None:
+            # 캐시 적중 시 LLM을 거치지 않고 저장된 답변을 한 번에 스트리밍
+            yield "messages", self._cached_answer_chunk(cached_answer)
+            return
+        
+        graph_input = await self._build_input(question, thread_id, existing_messages, search_type, optional_args, summary_thread_id)
+        config = {"configurable": {"thread_id": thread_id}}
+        
+        answer_streamed = False
+        # messages: LLM 토큰, custom: 노드가 get_stream_writer로 보내는 이벤트 (예: SEARCH_ALL 부분 결과)
+        async for mode, chunk in self.app.astream(
+            graph_input,
+            config=config,
+            stream_mode=["messages", "custom"]
         ):
-            yield chunk  # chunk를 필요에 따라 join/누적/즉시 반환
+            if mode == "messages":
+                _, metadata = chunk
+                answer_streamed = answer_streamed or is_client_streaming_node(str(metadata.get("checkpoint_ns", "")).split(":")[0])
+            yield mode, chunk  # chunk를 필요에 따라 join/누적/즉시 반환
+        
+        if cache_query is not None or not answer_streamed:
+            state = await self.app.aget_state(config)
+            answer = state.values.get("answer")
+            
+            # 답변 노드가 그래프 캐시에 적중하면 토큰이 스트리밍되지 않으므로 최종 답변을 한 번에 전달
+            if not answer_streamed and answer:
+                yield "messages", self._cached_answer_chunk(answer)
+            
+            # 시간 초과로 일부 단계를 생략한 답변은 재사용하지 않음
+            if not state.values.get("degraded"):
+                self.semantic_cache.store(cache_query, answer)
+    
+    @staticmethod
+    def _cached_answer_chunk(answer: str):
+        return AIMessageChunk(content=answer), {
+            "langgraph_node": SEMANTIC_CACHE_NODE_NAME,
+            "checkpoint_ns": f"{SEMANTIC_CACHE_NODE_NAME}:"
+        }
         
 graph_agent_instance = AgentGraphApplication()
\ No newline at end of file
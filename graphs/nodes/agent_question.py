@@ -1,31 +1,26 @@
 from graphs.graph_status import GraphStatus
-from mcp_server_api import get_multi_server_mcp_clients_from_api
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.prebuilt import create_react_agent
+from mcp_client_pool import instance as mcp_client_pool
+from graphs.agent_registry import react_agent_registry
+from admission import admission_controller
 
-from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
+from graphs.nodes.node_utils import node, skip_search_fallback
 
-from graphs.nodes.node_utils import node
-
-@node
+@node(timeout=45, reserve=20, fallback=skip_search_fallback)
 async def agent_question(state: GraphStatus) -> GraphStatus:
-    client_config = await get_multi_server_mcp_clients_from_api()
-    
-    client = MultiServerMCPClient(client_config)
-    
-    model = chat_gpt.get_model()
-    
-    # 클라이언트 연결
-    tools = await client.get_tools()
-        
-    agent = create_react_agent(model=model,
-                            tools=tools,
-                            state_schema=GraphStatus)
+    # 미리 컴파일된 agent 조회 (MCP tool 목록이 바뀐 경우에만 새로 컴파일)
+    agent = await react_agent_registry.get_agent("COMMON")
     
-    result = await agent.ainvoke(
-        {"messages": state["messages"]},
-        config={"configurable": {"thread_id": state["thread_id"]}}
-    )
+    # MCP 호출 동시 실행 수 제한 (대기열이 가득 차면 AdmissionRejectedError)
+    async with admission_controller.admit("mcp"):
+        try:
+            result = await agent.ainvoke(
+                {"messages": state["messages"]},
+                config={"configurable": {"thread_id": state["thread_id"]}}
+            )
+        except Exception as e:
+            # 연결 문제일 때만 응답 없는 세션을 폐기 (다음 요청에서 재연결, 다른 요청이 사용 중인 정상 세션은 유지)
+            await mcp_client_pool.reset_if_disconnected(e)
+            raise
     
     print("😇 RESULT: ",result)
     
@@ -1,10 +1,23 @@
 from graphs.graph_status import GraphStatus
 from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
-from tools.mcp.vectordb.chroma.chroma_db import db_instance as chroma_db
+from tools.mcp.vectordb.chroma.chroma_db import HybridRetriever, db_instance as chroma_db
+from tools.mcp.vectordb.context_builder import ContextBuilder
+from databases.department_database import department_resolver
 
-from graphs.nodes.node_utils import node
+from graphs.nodes.node_utils import node, skip_search_fallback
+import os
 
-@node
+# 프롬프트에 넣을 검색 결과 청크 수
+DEPARTMENT_SEARCH_RESULTS = int(os.getenv("DEPARTMENT_SEARCH_RESULTS", "5"))
+
+# 벡터 + BM25 하이브리드 검색기 (학과명은 앱 전체와 같은 department_resolver로 정규화)
+hybrid_retriever = HybridRetriever(chroma_db, resolve_department=department_resolver.resolve)
+
+# 검색 결과를 질의 관련 문장만 남겨 모델별 토큰 예산 안에서 컨텍스트로 구성
+# (중복 청크는 hybrid_retriever에서 이미 제거하므로 다시 비교하지 않음)
+context_builder = ContextBuilder(model_name=chat_gpt.model_name, duplicate_threshold=None)
+
+@node(timeout=30, reserve=20, fallback=skip_search_fallback)
 async def department_search(state: GraphStatus) -> GraphStatus:
     """
     학과 정보 탐색을 하는 단계
@@ -21,9 +34,10 @@ async def department_search(state: GraphStatus) -> GraphStatus:
             "answer": generated_message["content"]
         }
     
+    # 학과명 정규화(예: "컴공" -> "컴퓨터공학과")는 hybrid_retriever가 검색 스레드에서 수행 (실패하면 입력값 그대로 사용)
     department = optional_args.get("department")
     
-    context = retreive(instruction=instruction, department=department)
+    context = await retreive(instruction=instruction, department=department)
     
     prompt = f'''Please answer the following question using the provided context information.
                 Please follow these guidelines when generating your response:
@@ -40,7 +54,7 @@ async def department_search(state: GraphStatus) -> GraphStatus:
                 ### Context
                 {context}'''
             
-    answer = model.query_by_single_instruction(prompt)
+    answer = await model.aquery_by_single_instruction(prompt)
     generated_message = {"role":"assistant", "content": answer}
 
     return {
@@ -48,7 +62,8 @@ async def department_search(state: GraphStatus) -> GraphStatus:
         "answer": answer
     }
 
-def retreive(instruction: str, department: str = None) -> str:
-    retreive_result = chroma_db.query(input = instruction, filter=[department], n_results=10)
-    return retreive_result
+async def retreive(instruction: str, department: str = None) -> str:
+    # 벡터 + BM25 하이브리드 검색 (학과명 정규화, 중복 청크 제거)
+    retreive_result = await hybrid_retriever.asearch(query=instruction, department=department, n_results=DEPARTMENT_SEARCH_RESULTS)
+    return context_builder.build(instruction, retreive_result)
     
\ No newline at end of file
@@ -1,9 +1,9 @@
 from graphs.graph_status import GraphStatus
 from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
 
-from graphs.nodes.node_utils import node
+from graphs.nodes.node_utils import node, timeout_answer_fallback
 
-@node
+@node(stream_to_client=True, timeout=30, fallback=timeout_answer_fallback)
 async def fast_forward_question(state: GraphStatus) -> GraphStatus:
     """
     빠른 질문
@@ -11,8 +11,11 @@ async def fast_forward_question(state: GraphStatus) -> GraphStatus:
     
     model = chat_gpt
     
-    answer = model.query_by_single_instruction(state["instruction"])
+    # 토큰 단위로 스트리밍하여 첫 토큰이 바로 클라이언트에게 전달되도록 함
+    answer = ""
+    async for chunk in model.stream_query_by_messages([{"role":"user", "content": state["instruction"]}]):
+        answer += chunk.content if hasattr(chunk, 'content') else str(chunk)
 
     return {
         "answer": answer
-    }
\ No newline at end of file
+    }
@@ -1,9 +1,9 @@
 from graphs.graph_status import GraphStatus
 from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
 
-from graphs.nodes.node_utils import node
+from graphs.nodes.node_utils import node, timeout_answer_fallback
 
-@node
+@node(stream_to_client=True, timeout=40, fallback=timeout_answer_fallback)
 async def merge_messages(state: GraphStatus) -> GraphStatus:
     """
     메시지를 병합하는 단계
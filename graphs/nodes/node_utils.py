@@ -1,21 +1,117 @@
 from graphs.graph_status import GraphStatus
+from langgraph.config import get_stream_writer
+from typing import Any, Callable, Dict, Optional
 import asyncio
+import time
 
-def node(func):
-    async def wrapper(state: GraphStatus):
-        result = func(state)
-        
-        if asyncio.iscoroutine(result):
-            result = await result
-            print_state(func.__name__, result)
+# LLM 토큰을 클라이언트에게 그대로 스트리밍하는 노드 이름 목록
+_client_streaming_nodes = set()
+
+def node(func=None, *, stream_to_client: bool = False, timeout: Optional[float] = None, fallback: Optional[Callable[[GraphStatus], Any]] = None, reserve: float = 0.0):
+    """
+    그래프 노드 데코레이터. @node 또는 @node(stream_to_client=True) 형태로 사용합니다.
+    stream_to_client가 True이면 해당 노드에서 생성되는 LLM 토큰을 클라이언트에게 스트리밍합니다.
+
+    timeout이 있거나 state에 deadline(요청 마감 시각)이 있으면, 둘 중 먼저 도래하는 시점에 노드를 취소합니다.
+    reserve는 이후 노드(예: merge_messages)를 위해 deadline에서 남겨둘 시간(초)입니다.
+    취소되면 클라이언트에게 timeout 이벤트를 보내고 fallback(state)의 결과를 반환합니다. fallback이 없으면 TimeoutError를 그대로 올립니다.
+    """
+    def decorator(func):
+        node_name = func.__name__
+        if stream_to_client:
+            _client_streaming_nodes.add(node_name)
+
+        async def wrapper(state: GraphStatus):
+            time_limit = get_time_limit(state, timeout, reserve)
+            
+            if time_limit is None:
+                result = await _run(func, state)
+            else:
+                try:
+                    if time_limit <= 0:
+                        raise asyncio.TimeoutError()
+                    result = await asyncio.wait_for(_run(func, state), timeout=time_limit)
+                except asyncio.TimeoutError:
+                    print(f"⏱️ 노드 시간 초과: {node_name} ({max(time_limit, 0):.1f}s)")
+                    if fallback is None:
+                        raise
+                    report_timeout(node_name)
+                    result = await _run(fallback, state)
+            
+            print_state(node_name, result)
             
             return result
-        
-        print_state(func.__name__, result)
-        
-        return result
-    return wrapper
+        return wrapper
+
+    if func is None:
+        return decorator
+    return decorator(func)
+
+
+async def _run(func, state: GraphStatus):
+    result = func(state)
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+
+
+def get_time_limit(state: GraphStatus, timeout: Optional[float] = None, reserve: float = 0.0) -> Optional[float]:
+    """노드 timeout과 요청 deadline 중 더 짧은 남은 시간(초)을 반환합니다. 둘 다 없으면 None."""
+    limits = []
+    if timeout is not None:
+        limits.append(timeout)
+    deadline = state.get("deadline") if isinstance(state, dict) else None
+    if deadline:
+        limits.append(deadline - time.time() - reserve)
+    return min(limits) if limits else None
+
+
+def report_timeout(node_name: str):
+    """노드 시간 초과를 custom 스트림으로 클라이언트에게 알립니다."""
+    try:
+        writer = get_stream_writer()
+    except Exception:
+        # 그래프 실행 컨텍스트 밖에서 호출된 경우
+        return
+    writer({
+        "mode": "timeout",
+        "node_name": node_name,
+        "message": "응답이 지연되어 일부 작업을 생략하고 답변을 준비하고 있어요."
+    })
+
+
+def skip_search_fallback(state: GraphStatus) -> Dict[str, Any]:
+    """검색/도구 노드가 시간 초과되면 검색 결과 없이 merge_messages가 바로 답변하도록 합니다."""
+    generated_message = {
+        "role": "assistant",
+        "content": "검색 시간이 초과되어 검색 결과를 가져오지 못했습니다. 일반적인 지식을 바탕으로 답변해주세요."
+    }
+    return {
+        "messages": [generated_message],
+        "answer": "",
+        "degraded": True
+    }
+
+
+def timeout_answer_fallback(state: GraphStatus) -> Dict[str, Any]:
+    """답변 생성 노드가 시간 초과되면 안내 문구를 답변으로 반환합니다."""
+    answer = "⚠️ 답변 생성 시간이 초과되었습니다. 잠시 후 다시 시도해주세요."
+    return {
+        "messages": [{"role": "assistant", "content": answer}],
+        "answer": answer,
+        "degraded": True
+    }
+
+
+def mark_client_streaming_node(node_name: str):
+    """그래프 노드가 아닌 단계(예: 캐시 응답)도 클라이언트 스트리밍 대상으로 선언합니다."""
+    _client_streaming_nodes.add(node_name)
+
+
+def is_client_streaming_node(node_name: str) -> bool:
+    """노드가 LLM 토큰을 클라이언트에게 스트리밍하도록 선언되었는지 확인합니다."""
+    return node_name in _client_streaming_nodes
 
 
 def print_state(node_name: str, state: GraphStatus):
-        print("[node]",node_name,"--->",state)
\ No newline at end of file
+        print("[node]",node_name,"--->",state)
@@ -0,0 +1,74 @@
+import asyncio
+import os
+
+from langgraph.config import get_stream_writer
+
+from graphs.graph_status import GraphStatus
+from graphs.nodes.node_utils import node, skip_search_fallback
+from graphs.nodes.kocw_search import kocw_search
+from graphs.nodes.web_search import web_search
+from graphs.nodes.youtube_search import youtube_search
+
+# 동시에 실행할 검색 노드 (노드 이름, 노드 함수, 결과 제목)
+SEARCH_BRANCHES = [
+    ("youtube_search", youtube_search, "유튜브 검색 결과"),
+    ("kocw_search", kocw_search, "KOCW 강의 검색 결과"),
+    ("web_search", web_search, "웹 검색 결과"),
+]
+
+
+def _get_branch_timeout() -> float:
+    try:
+        return float(os.getenv("SEARCH_ALL_BRANCH_TIMEOUT_SECONDS", "40"))
+    except ValueError:
+        return 40.0
+
+
+@node(timeout=60, reserve=20, fallback=skip_search_fallback)
+async def search_all(state: GraphStatus) -> GraphStatus:
+    """
+    유튜브, KOCW, 웹 검색을 동시에 수행하는 단계
+    각 검색은 개별 timeout을 가지며, 끝나는 대로 부분 결과를 클라이언트에게 스트리밍합니다.
+    전체 소요 시간은 세 검색의 합이 아니라 가장 느린 검색(최대 timeout)에 맞춰집니다.
+    """
+    writer = get_stream_writer()
+    timeout = _get_branch_timeout()
+
+    async def run_branch(node_name, node_func):
+        try:
+            result = await asyncio.wait_for(node_func(state), timeout=timeout)
+            # 검색 노드 자체의 timeout으로 fallback 결과가 반환된 경우
+            status = "timeout" if result.get("degraded") else "done"
+            answer = result.get("answer") or ""
+        except asyncio.TimeoutError:
+            print(f"⚠️ {node_name} 시간 초과 ({timeout}s)")
+            status, answer = "timeout", ""
+        except Exception as e:
+            print(f"⚠️ {node_name} 실패: {e}")
+            status, answer = "error", ""
+
+        writer({
+            "mode": "partial",
+            "node_name": node_name,
+            "status": status,
+            "answer": answer
+        })
+        return status, answer
+
+    results = await asyncio.gather(*[run_branch(node_name, node_func) for node_name, node_func, _ in SEARCH_BRANCHES])
+    answers = [answer for _, answer in results]
+
+    sections = [
+        f"### {title}\n{answer}"
+        for (_, _, title), answer in zip(SEARCH_BRANCHES, answers)
+        if answer
+    ]
+    answer = "\n\n".join(sections) if sections else "검색 결과를 가져오지 못했습니다."
+    generated_message = {"role": "assistant", "content": answer}
+
+    return {
+        "messages": [generated_message],
+        "answer": answer,
+        # 일부 검색이 실패한 결과는 그래프 캐시에 저장하지 않음
+        "degraded": any(status != "done" for status, _ in results)
+    }
@@ -1,29 +1,19 @@
 from graphs.graph_status import GraphStatus
-from mcp_server_api import get_multi_server_mcp_clients_from_api
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langgraph.prebuilt import create_react_agent
-from tools.mcp.llm_models.chat_gpt import model_instance as chat_gpt
+from mcp_client_pool import instance as mcp_client_pool
+from graphs.agent_registry import react_agent_registry
+from admission import admission_controller
 
-from graphs.nodes.node_utils import node
+from graphs.nodes.node_utils import node, skip_search_fallback
 
 
-@node
+@node(timeout=45, reserve=20, fallback=skip_search_fallback)
 async def web_search(state: GraphStatus) -> GraphStatus:
     """
     웹 검색을 하는 단계
     """
     
-    client_config = await get_multi_server_mcp_clients_from_api()
-    
-    client = MultiServerMCPClient(client_config)
-    
-    model = chat_gpt.get_model()
-    
-    tools = await client.get_tools(server_name="naver_search_mcp")
-    
-    agent = create_react_agent(model=model,
-                            tools=tools,
-                            state_schema=GraphStatus)
+    # 미리 컴파일된 agent 조회 (MCP tool 목록이 바뀐 경우에만 새로 컴파일)
+    agent = await react_agent_registry.get_agent("WEB_SEARCH")
     
     prompt = f'''
     Search for information about the question. Please cite the sources of search results and respond in Korean.
@@ -51,9 +41,16 @@ async def web_search(state: GraphStatus) -> GraphStatus:
     '''
     question_message = {"role":"user", "content": prompt}
         
-    result = await agent.ainvoke(
-        {"messages": [question_message]}
-    )
+    # MCP 호출 동시 실행 수 제한 (대기열이 가득 차면 AdmissionRejectedError)
+    async with admission_controller.admit("mcp"):
+        try:
+            result = await agent.ainvoke(
+                {"messages": [question_message]}
+            )
+        except Exception as e:
+            # 연결 문제일 때만 응답 없는 세션을 폐기 (다음 요청에서 재연결, 다른 요청이 사용 중인 정상 세션은 유지)
+            await mcp_client_pool.reset_if_disconnected(e, "naver_search_mcp")
+            raise
      
     answer =  result.get("messages")[-1].content if result.get("messages") else "No response"
     generated_message = {"role":"assistant", "content": answer}
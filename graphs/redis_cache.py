@@ -0,0 +1,214 @@
+import hashlib
+import json
+import os
+import time
+from typing import Any, Callable, Mapping, Optional, Sequence
+
+from langgraph.cache.base import BaseCache, FullKey, Namespace
+from langgraph.types import CachePolicy
+
+from databases.redis_connector import RedisClient
+from graphs.graph_status import GraphStatus
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+def content_hash_key(*optional_arg_fields: str, include_messages: bool = False) -> Callable[[GraphStatus], str]:
+    """
+    노드 입력 중 결과에 영향을 주는 값만 모아 해시한 캐시 키 함수를 만듭니다.
+    thread_id는 포함하지 않으므로 같은 질문이면 세션/워커와 관계없이 캐시를 공유합니다.
+
+    :param optional_arg_fields: 키에 포함할 optional_args 항목 (예: "department")
+    :param include_messages: 이전 대화 내역에 따라 결과가 달라지는 노드면 True
+    """
+    def key_func(state: GraphStatus) -> str:
+        optional_args = state.get("optional_args") or {}
+        payload = {
+            "instruction": state.get("instruction"),
+            "search_type": state.get("search_type"),
+            "optional_args": {field: optional_args.get(field) for field in optional_arg_fields},
+        }
+        if include_messages:
+            payload["messages"] = state.get("messages")
+        serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+    return key_func
+
+
+def _is_degraded(writes: Any) -> bool:
+    """노드 결과(write 목록)에 degraded=True가 포함되어 있는지 확인합니다."""
+    try:
+        return any(channel == "degraded" and value for channel, value in writes)
+    except (TypeError, ValueError):
+        return False
+
+
+def node_cache_policy(node_name: str, default_ttl: int, key_func: Callable[[GraphStatus], str]) -> CachePolicy:
+    """
+    노드별 CachePolicy를 만듭니다. TTL은 GRAPH_CACHE_TTL_<NODE_NAME> 환경변수로 덮어쓸 수 있습니다.
+    """
+    ttl = _get_int_env(f"GRAPH_CACHE_TTL_{node_name.upper()}", default_ttl)
+    return CachePolicy(ttl=ttl if ttl > 0 else None, key_func=key_func)
+
+
+class RedisCache(BaseCache):
+    """
+    Redis에 노드 실행 결과를 저장하는 LangGraph 캐시입니다.
+
+    - 여러 uvicorn 워커와 재시작 이후에도 캐시가 공유됩니다.
+    - namespace(노드)마다 최근 사용 순서를 sorted set으로 관리하고,
+      max_entries_per_namespace를 넘으면 가장 오래된 항목부터 제거합니다.
+    - 비동기(ainvoke/astream)와 동기(invoke/stream) 실행 모두 지원합니다.
+    """
+    def __init__(self, *, max_entries_per_namespace: int = 1000, prefix: str = "graph_cache", serde=None):
+        super().__init__(serde=serde)
+        self.max_entries_per_namespace = max_entries_per_namespace
+        self.prefix = prefix
+
+    def _get_key(self, namespace: Namespace, key: str) -> str:
+        return f"{self.prefix}:{':'.join(namespace)}:{key}"
+
+    def _get_index_key(self, namespace: Namespace) -> str:
+        return f"{self.prefix}_index:{':'.join(namespace)}"
+
+    def _dumps(self, value: Any) -> bytes:
+        type_, data = self.serde.dumps_typed(value)
+        return type_.encode("utf-8") + b"|" + data
+
+    def _loads(self, raw: bytes) -> Any:
+        type_, data = raw.split(b"|", 1)
+        return self.serde.loads_typed((type_.decode("utf-8"), data))
+
+    def _parse_values(self, keys: Sequence[FullKey], raw_values: Sequence[Optional[bytes]], pipe) -> dict:
+        """조회한 값을 역직렬화하고, 찾은 항목의 최근 사용 시각 갱신을 pipe에 추가합니다."""
+        values = {}
+        now = time.time()
+        for (namespace, key), raw in zip(keys, raw_values):
+            if raw is None:
+                continue
+            try:
+                values[(namespace, key)] = self._loads(raw)
+            except Exception as e:
+                print(f"⚠️ 그래프 캐시 역직렬화 실패: {namespace} {key} - {e}")
+                continue
+            # 최근 사용 시각 갱신 (LRU)
+            pipe.zadd(self._get_index_key(namespace), {key: now})
+        return values
+
+    def _add_writes(self, pairs: Mapping[FullKey, tuple], pipe) -> set:
+        """저장할 값을 pipe에 추가하고 값이 추가된 namespace 목록을 반환합니다."""
+        now = time.time()
+        namespaces = set()
+        for (namespace, key), (value, ttl) in pairs.items():
+            if _is_degraded(value):
+                # 시간 초과로 fallback된 노드 결과는 캐시하지 않음
+                continue
+            pipe.set(self._get_key(namespace, key), self._dumps(value), ex=ttl)
+            pipe.zadd(self._get_index_key(namespace), {key: now})
+            namespaces.add(tuple(namespace))
+        return namespaces
+
+    def _get_clear_patterns(self, namespaces: Optional[Sequence[Namespace]]) -> list:
+        if namespaces is None:
+            return [f"{self.prefix}:*", f"{self.prefix}_index:*"]
+        patterns = []
+        for namespace in namespaces:
+            patterns += [f"{self.prefix}:{':'.join(namespace)}:*", self._get_index_key(namespace)]
+        return patterns
+
+    async def aget(self, keys: Sequence[FullKey]) -> dict:
+        if not keys:
+            return {}
+
+        client = RedisClient.get_binary_client()
+        raw_values = await client.mget([self._get_key(namespace, key) for namespace, key in keys])
+
+        pipe = client.pipeline(transaction=False)
+        values = self._parse_values(keys, raw_values, pipe)
+        if values:
+            await pipe.execute()
+        return values
+
+    async def aset(self, pairs: Mapping[FullKey, tuple]) -> None:
+        if not pairs:
+            return
+
+        client = RedisClient.get_binary_client()
+        pipe = client.pipeline(transaction=False)
+        namespaces = self._add_writes(pairs, pipe)
+        if not namespaces:
+            return
+        await pipe.execute()
+
+        for namespace in namespaces:
+            await self._aevict(namespace)
+
+    async def _aevict(self, namespace: Namespace):
+        client = RedisClient.get_binary_client()
+        index_key = self._get_index_key(namespace)
+        overflow = await client.zcard(index_key) - self.max_entries_per_namespace
+        if overflow <= 0:
+            return
+
+        evicted = await client.zpopmin(index_key, overflow)
+        if evicted:
+            await client.delete(*[self._get_key(namespace, key.decode("utf-8")) for key, _ in evicted])
+
+    async def aclear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        client = RedisClient.get_binary_client()
+        for pattern in self._get_clear_patterns(namespaces):
+            keys = [key async for key in client.scan_iter(match=pattern)]
+            if keys:
+                await client.delete(*keys)
+
+    def get(self, keys: Sequence[FullKey]) -> dict:
+        if not keys:
+            return {}
+
+        client = RedisClient.get_sync_binary_client()
+        raw_values = client.mget([self._get_key(namespace, key) for namespace, key in keys])
+
+        pipe = client.pipeline(transaction=False)
+        values = self._parse_values(keys, raw_values, pipe)
+        if values:
+            pipe.execute()
+        return values
+
+    def set(self, pairs: Mapping[FullKey, tuple]) -> None:
+        if not pairs:
+            return
+
+        client = RedisClient.get_sync_binary_client()
+        pipe = client.pipeline(transaction=False)
+        namespaces = self._add_writes(pairs, pipe)
+        if not namespaces:
+            return
+        pipe.execute()
+
+        for namespace in namespaces:
+            self._evict(namespace)
+
+    def _evict(self, namespace: Namespace):
+        client = RedisClient.get_sync_binary_client()
+        index_key = self._get_index_key(namespace)
+        overflow = client.zcard(index_key) - self.max_entries_per_namespace
+        if overflow <= 0:
+            return
+
+        evicted = client.zpopmin(index_key, overflow)
+        if evicted:
+            client.delete(*[self._get_key(namespace, key.decode("utf-8")) for key, _ in evicted])
+
+    def clear(self, namespaces: Optional[Sequence[Namespace]] = None) -> None:
+        client = RedisClient.get_sync_binary_client()
+        for pattern in self._get_clear_patterns(namespaces):
+            keys = list(client.scan_iter(match=pattern))
+            if keys:
+                client.delete(*keys)
+
+redis_cache = RedisCache(max_entries_per_namespace=_get_int_env("GRAPH_CACHE_MAX_ENTRIES", 1000))
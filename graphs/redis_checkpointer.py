@@ -0,0 +1,355 @@
+import os
+import random
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+)
+from langgraph.checkpoint.memory import MemorySaver
+
+from databases.redis_connector import RedisClient
+
+
+def _get_int_env(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        return default
+
+
+class RedisSaver(BaseCheckpointSaver):
+    """
+    Redis에 체크포인트를 저장하는 LangGraph checkpointer입니다.
+
+    - 여러 app.py 워커가 같은 체크포인트를 공유하므로 세션을 특정 워커에 고정할 필요가 없습니다.
+    - 값은 serde로 직렬화한 뒤 zlib으로 압축해 저장합니다.
+    - thread(+namespace)마다 최근 max_checkpoints_per_thread개만 유지하고, 모든 키에 ttl_seconds를 설정합니다.
+    - 비동기(ainvoke/astream/aget_state)와 동기(invoke/stream/get_state) API를 모두 지원합니다.
+
+    키 구조:
+    - checkpoint:{thread_id}:{ns}:{checkpoint_id}         (hash) checkpoint, metadata, parent_checkpoint_id
+    - checkpoint_writes:{thread_id}:{ns}:{checkpoint_id}  (hash) {task_id}:{idx} -> pending write
+    - checkpoint_index:{thread_id}:{ns}                   (sorted set) checkpoint_id, 사전순 = 시간순
+    """
+    def __init__(self, *, max_checkpoints_per_thread: int = 10, ttl_seconds: Optional[int] = None, serde=None):
+        super().__init__(serde=serde)
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _get_checkpoint_key(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"checkpoint:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    @staticmethod
+    def _get_writes_key(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> str:
+        return f"checkpoint_writes:{thread_id}:{checkpoint_ns}:{checkpoint_id}"
+
+    @staticmethod
+    def _get_index_key(thread_id: str, checkpoint_ns: str) -> str:
+        return f"checkpoint_index:{thread_id}:{checkpoint_ns}"
+
+    def _dumps(self, value: Any) -> bytes:
+        type_, data = self.serde.dumps_typed(value)
+        return type_.encode("utf-8") + b"|" + zlib.compress(data)
+
+    def _loads(self, raw: bytes) -> Any:
+        type_, data = raw.split(b"|", 1)
+        return self.serde.loads_typed((type_.decode("utf-8"), zlib.decompress(data)))
+
+    @staticmethod
+    def _parse_config(config: RunnableConfig) -> Tuple[str, str, Optional[str]]:
+        configurable = config["configurable"]
+        return (
+            str(configurable["thread_id"]),
+            configurable.get("checkpoint_ns", ""),
+            configurable.get("checkpoint_id"),
+        )
+
+    @staticmethod
+    def _make_config(thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> RunnableConfig:
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint_id,
+            }
+        }
+
+    def _build_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str, saved: Dict[bytes, bytes], writes: Dict[bytes, bytes]) -> Optional[CheckpointTuple]:
+        if not saved:
+            return None
+
+        pending_writes = [
+            self._loads(raw)
+            for _, raw in sorted(writes.items(), key=lambda item: item[0])
+        ]
+        parent_checkpoint_id = saved.get(b"parent_checkpoint_id", b"").decode("utf-8")
+        return CheckpointTuple(
+            config=self._make_config(thread_id, checkpoint_ns, checkpoint_id),
+            checkpoint=self._loads(saved[b"checkpoint"]),
+            metadata=self._loads(saved[b"metadata"]),
+            parent_config=self._make_config(thread_id, checkpoint_ns, parent_checkpoint_id) if parent_checkpoint_id else None,
+            pending_writes=pending_writes,
+        )
+
+    def _queue_load(self, pipe, thread_id: str, checkpoint_ns: str, checkpoint_id: str):
+        pipe.hgetall(self._get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id))
+        pipe.hgetall(self._get_writes_key(thread_id, checkpoint_ns, checkpoint_id))
+
+    @staticmethod
+    def _get_list_range(before: Optional[RunnableConfig]) -> str:
+        return f"({before['configurable']['checkpoint_id']}" if before else "+"
+
+    @staticmethod
+    def _matches(checkpoint_tuple: CheckpointTuple, filter: Optional[Dict[str, Any]]) -> bool:
+        return not filter or all(checkpoint_tuple.metadata.get(k) == v for k, v in filter.items())
+
+    def _queue_put(self, pipe, thread_id: str, checkpoint_ns: str, parent_checkpoint_id: Optional[str], checkpoint: Checkpoint, metadata: CheckpointMetadata) -> bool:
+        """
+        체크포인트 저장 명령을 pipe에 추가합니다.
+        보관 개수 제한이 있으면 같은 pipe에서 오래된 id를 조회(ZRANGE)하고 색인에서 제거(ZREMRANGEBYRANK)하며,
+        이 경우 True를 반환합니다. (모든 score가 0이므로 순위 = 사전순 = 시간순)
+        """
+        checkpoint_id = checkpoint["id"]
+        checkpoint_key = self._get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id)
+        index_key = self._get_index_key(thread_id, checkpoint_ns)
+
+        pipe.hset(checkpoint_key, mapping={
+            "checkpoint": self._dumps(checkpoint),
+            "metadata": self._dumps(metadata),
+            "parent_checkpoint_id": parent_checkpoint_id or "",
+        })
+        pipe.zadd(index_key, {checkpoint_id: 0})
+        if self.ttl_seconds:
+            pipe.expire(checkpoint_key, self.ttl_seconds)
+            pipe.expire(index_key, self.ttl_seconds)
+
+        if self.max_checkpoints_per_thread <= 0:
+            return False
+        pipe.zrange(index_key, 0, -(self.max_checkpoints_per_thread + 1))
+        pipe.zremrangebyrank(index_key, 0, -(self.max_checkpoints_per_thread + 1))
+        return True
+
+    def _queue_delete_pruned(self, pipe, thread_id: str, checkpoint_ns: str, raw_ids: Sequence[bytes]) -> bool:
+        """색인에서 제거된 체크포인트의 본문/write 키 삭제 명령을 pipe에 추가합니다."""
+        for raw_id in raw_ids:
+            checkpoint_id = raw_id.decode("utf-8")
+            pipe.delete(
+                self._get_checkpoint_key(thread_id, checkpoint_ns, checkpoint_id),
+                self._get_writes_key(thread_id, checkpoint_ns, checkpoint_id),
+            )
+        return bool(raw_ids)
+
+    def _queue_writes(self, pipe, thread_id: str, checkpoint_ns: str, checkpoint_id: str, writes: Sequence[Tuple[str, Any]], task_id: str):
+        writes_key = self._get_writes_key(thread_id, checkpoint_ns, checkpoint_id)
+        for idx, (channel, value) in enumerate(writes):
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            field = f"{task_id}:{write_idx:08d}" if write_idx >= 0 else f"{task_id}:{write_idx}"
+            raw = self._dumps((task_id, channel, value))
+            # 일반 write는 처음 저장된 값을 유지하고, 특수 채널(에러/인터럽트 등)은 덮어씀
+            if write_idx >= 0:
+                pipe.hsetnx(writes_key, field, raw)
+            else:
+                pipe.hset(writes_key, field, raw)
+        if self.ttl_seconds:
+            pipe.expire(writes_key, self.ttl_seconds)
+
+    # 비동기 API (ainvoke/astream/aget_state)
+
+    async def _aload_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        pipe = RedisClient.get_binary_client().pipeline(transaction=False)
+        self._queue_load(pipe, thread_id, checkpoint_ns, checkpoint_id)
+        saved, writes = await pipe.execute()
+        return self._build_tuple(thread_id, checkpoint_ns, checkpoint_id, saved, writes)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+        if checkpoint_id is None:
+            latest = await RedisClient.get_binary_client().zrevrangebylex(
+                self._get_index_key(thread_id, checkpoint_ns), "+", "-", start=0, num=1
+            )
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode("utf-8")
+        return await self._aload_tuple(thread_id, checkpoint_ns, checkpoint_id)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        if config is None:
+            # thread를 지정하지 않은 전체 조회는 지원하지 않음 (모든 키를 훑어야 하므로)
+            return
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+
+        if checkpoint_id is not None:
+            checkpoint_ids = [checkpoint_id]
+        else:
+            raw_ids = await RedisClient.get_binary_client().zrevrangebylex(
+                self._get_index_key(thread_id, checkpoint_ns), self._get_list_range(before), "-"
+            )
+            checkpoint_ids = [raw_id.decode("utf-8") for raw_id in raw_ids]
+
+        count = 0
+        for checkpoint_id in checkpoint_ids:
+            checkpoint_tuple = await self._aload_tuple(thread_id, checkpoint_ns, checkpoint_id)
+            if checkpoint_tuple is None or not self._matches(checkpoint_tuple, filter):
+                continue
+            yield checkpoint_tuple
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id, checkpoint_ns, parent_checkpoint_id = self._parse_config(config)
+        client = RedisClient.get_binary_client()
+
+        pipe = client.pipeline(transaction=False)
+        pruning = self._queue_put(pipe, thread_id, checkpoint_ns, parent_checkpoint_id, checkpoint, metadata)
+        results = await pipe.execute()
+
+        # 보관 개수를 넘은 체크포인트가 있을 때만 삭제 왕복이 추가됨
+        pipe = client.pipeline(transaction=False)
+        if pruning and self._queue_delete_pruned(pipe, thread_id, checkpoint_ns, results[-2]):
+            await pipe.execute()
+        return self._make_config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+        pipe = RedisClient.get_binary_client().pipeline(transaction=False)
+        self._queue_writes(pipe, thread_id, checkpoint_ns, checkpoint_id, writes, task_id)
+        await pipe.execute()
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        client = RedisClient.get_binary_client()
+        for prefix in ("checkpoint", "checkpoint_writes", "checkpoint_index"):
+            keys = [key async for key in client.scan_iter(match=f"{prefix}:{thread_id}:*")]
+            if keys:
+                await client.delete(*keys)
+
+    # 동기 API (invoke/stream/get_state)
+
+    def _load_tuple(self, thread_id: str, checkpoint_ns: str, checkpoint_id: str) -> Optional[CheckpointTuple]:
+        pipe = RedisClient.get_sync_binary_client().pipeline(transaction=False)
+        self._queue_load(pipe, thread_id, checkpoint_ns, checkpoint_id)
+        saved, writes = pipe.execute()
+        return self._build_tuple(thread_id, checkpoint_ns, checkpoint_id, saved, writes)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+        if checkpoint_id is None:
+            latest = RedisClient.get_sync_binary_client().zrevrangebylex(
+                self._get_index_key(thread_id, checkpoint_ns), "+", "-", start=0, num=1
+            )
+            if not latest:
+                return None
+            checkpoint_id = latest[0].decode("utf-8")
+        return self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        if config is None:
+            return
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+
+        if checkpoint_id is not None:
+            checkpoint_ids = [checkpoint_id]
+        else:
+            raw_ids = RedisClient.get_sync_binary_client().zrevrangebylex(
+                self._get_index_key(thread_id, checkpoint_ns), self._get_list_range(before), "-"
+            )
+            checkpoint_ids = [raw_id.decode("utf-8") for raw_id in raw_ids]
+
+        count = 0
+        for checkpoint_id in checkpoint_ids:
+            checkpoint_tuple = self._load_tuple(thread_id, checkpoint_ns, checkpoint_id)
+            if checkpoint_tuple is None or not self._matches(checkpoint_tuple, filter):
+                continue
+            yield checkpoint_tuple
+            count += 1
+            if limit is not None and count >= limit:
+                return
+
+    def put(self, config: RunnableConfig, checkpoint: Checkpoint, metadata: CheckpointMetadata, new_versions: ChannelVersions) -> RunnableConfig:
+        thread_id, checkpoint_ns, parent_checkpoint_id = self._parse_config(config)
+        client = RedisClient.get_sync_binary_client()
+
+        pipe = client.pipeline(transaction=False)
+        pruning = self._queue_put(pipe, thread_id, checkpoint_ns, parent_checkpoint_id, checkpoint, metadata)
+        results = pipe.execute()
+
+        pipe = client.pipeline(transaction=False)
+        if pruning and self._queue_delete_pruned(pipe, thread_id, checkpoint_ns, results[-2]):
+            pipe.execute()
+        return self._make_config(thread_id, checkpoint_ns, checkpoint["id"])
+
+    def put_writes(self, config: RunnableConfig, writes: Sequence[Tuple[str, Any]], task_id: str, task_path: str = "") -> None:
+        thread_id, checkpoint_ns, checkpoint_id = self._parse_config(config)
+        pipe = RedisClient.get_sync_binary_client().pipeline(transaction=False)
+        self._queue_writes(pipe, thread_id, checkpoint_ns, checkpoint_id, writes, task_id)
+        pipe.execute()
+
+    def delete_thread(self, thread_id: str) -> None:
+        client = RedisClient.get_sync_binary_client()
+        for prefix in ("checkpoint", "checkpoint_writes", "checkpoint_index"):
+            keys = list(client.scan_iter(match=f"{prefix}:{thread_id}:*"))
+            if keys:
+                client.delete(*keys)
+
+    def get_next_version(self, current: Optional[str], channel: Any) -> str:
+        # MemorySaver와 같은 문자열 버전 형식 ("{순번}.{난수}")
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def create_checkpointer() -> BaseCheckpointSaver:
+    """
+    환경변수 GRAPH_CHECKPOINTER에 따라 checkpointer를 생성합니다.
+    - redis (기본값): 워커 간 공유, thread별 보관 개수 제한(CHECKPOINT_MAX_PER_THREAD) 및 TTL(CHECKPOINT_TTL_SECONDS) 적용
+    - memory: 프로세스 메모리 (로컬 개발용)
+    """
+    backend = os.getenv("GRAPH_CHECKPOINTER", "redis").lower()
+    if backend == "memory":
+        return MemorySaver()
+    if backend != "redis":
+        print(f"⚠️ 알 수 없는 GRAPH_CHECKPOINTER '{backend}', redis를 사용합니다.")
+
+    ttl_seconds = _get_int_env("CHECKPOINT_TTL_SECONDS", 86400)
+    return RedisSaver(
+        max_checkpoints_per_thread=_get_int_env("CHECKPOINT_MAX_PER_THREAD", 10),
+        ttl_seconds=ttl_seconds if ttl_seconds > 0 else None,
+    )
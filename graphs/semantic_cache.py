@@ -0,0 +1,170 @@
+import asyncio
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from databases.department_database import department_resolver
+from graphs.nodes.node_utils import mark_client_streaming_node
+from tools.mcp.search_index import normalize
+from tools.mcp.vectordb.chroma.chroma_db import db_instance as chroma_db
+
+# 캐시 적중 시 답변을 스트리밍하는 가상의 노드 이름
+SEMANTIC_CACHE_NODE_NAME = "semantic_cache"
+mark_client_streaming_node(SEMANTIC_CACHE_NODE_NAME)
+
+# 이전 대화 내역과 관계없이 질문만으로 답변이 결정되는 모드
+HISTORY_INDEPENDENT_MODES = {"FAST_FORWARD"}
+# 이전 대화 내역이 없을 때만 캐시를 사용하는 모드
+# (검색 모드의 최종 답변은 merge_messages가 대화 내역을 바탕으로 다시 작성하므로 내역이 있으면 재사용할 수 없음)
+CACHEABLE_MODES = HISTORY_INDEPENDENT_MODES | {"COMMON", "DEPARTMENT_SEARCH", "KOCW_SEARCH", "YOUTUBE_SEARCH", "WEB_SEARCH", "SEARCH_ALL"}
+
+
+@dataclass
+class SemanticCacheEntry:
+    question: str
+    embedding: np.ndarray
+    answer: str
+    created_at: float
+
+
+@dataclass
+class SemanticCacheQuery:
+    question: str
+    bucket: Tuple[str, str]
+    embedding: Optional[np.ndarray]
+
+
+class SemanticAnswerCache:
+    """
+    세션과 관계없이 의미가 비슷한 질문의 답변을 재사용하는 캐시입니다.
+
+    - 검색 모드와 학과로 버킷을 나누고, 버킷 안에서 KR-SBERT 임베딩의 코사인 유사도가
+      similarity_threshold 이상인 질문이 있으면 저장된 답변을 반환합니다.
+    - 항목은 ttl_seconds가 지나면 만료되고, 버킷마다 max_entries_per_bucket개를 넘으면 가장 오래 사용되지 않은 항목부터 제거합니다.
+    """
+    def __init__(self, similarity_threshold: float, ttl_seconds: int, max_entries_per_bucket: int):
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries_per_bucket = max_entries_per_bucket
+
+        self._buckets: Dict[Tuple[str, str], "OrderedDict[int, SemanticCacheEntry]"] = {}
+        self._next_id = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    async def prepare(self, question: str, search_type: str, optional_args: Optional[Dict[str, Any]], existing_messages: List[Dict[str, Any]]) -> Optional[SemanticCacheQuery]:
+        """
+        캐시 조회/저장에 사용할 질의를 만듭니다. 캐시를 사용할 수 없는 요청이면 None을 반환합니다.
+        """
+        mode = (search_type or "COMMON").upper()
+        if mode not in CACHEABLE_MODES:
+            return None
+        if mode not in HISTORY_INDEPENDENT_MODES and existing_messages:
+            return None
+
+        department = await self._get_department_key((optional_args or {}).get("department"))
+
+        try:
+            # 임베딩 서비스의 worker 스레드에서 다른 요청과 함께 배치로 계산 (LRU 캐시 적용)
+            embedding = await chroma_db.aembed(question)
+        except Exception as e:
+            print(f"⚠️ 시맨틱 캐시 임베딩 실패: {e}")
+            return None
+
+        embedding = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(embedding)
+        if norm == 0:
+            return None
+
+        return SemanticCacheQuery(question=question, bucket=(mode, department), embedding=embedding / norm)
+
+    @staticmethod
+    async def _get_department_key(department: Optional[str]) -> str:
+        """
+        버킷 키로 사용할 학과명. "컴공", "컴퓨터공학" 등은 정식 학과명으로 정규화해 같은 버킷을 사용하고,
+        정규화할 수 없으면 공백/기호를 제거한 입력값을 사용합니다.
+        """
+        if not department or not department.strip():
+            return ""
+        try:
+            resolved = await asyncio.to_thread(department_resolver.resolve, department)
+        except Exception as e:
+            print(f"⚠️ 시맨틱 캐시 학과명 정규화 실패: {e}")
+            resolved = None
+        return resolved or normalize(department)
+
+    def lookup(self, query: Optional[SemanticCacheQuery]) -> Optional[str]:
+        """비슷한 질문의 답변이 있으면 반환합니다."""
+        if query is None:
+            return None
+
+        bucket = self._buckets.get(query.bucket)
+        if not bucket:
+            self._misses += 1
+            return None
+
+        self._remove_expired(bucket)
+        if not bucket:
+            self._misses += 1
+            return None
+
+        entry_ids = list(bucket.keys())
+        similarities = np.stack([bucket[entry_id].embedding for entry_id in entry_ids]) @ query.embedding
+        best_index = int(np.argmax(similarities))
+
+        if similarities[best_index] < self.similarity_threshold:
+            self._misses += 1
+            return None
+
+        entry_id = entry_ids[best_index]
+        bucket.move_to_end(entry_id)
+        self._hits += 1
+        print(f"🎯 시맨틱 캐시 적중: '{query.question}' ≈ '{bucket[entry_id].question}' ({similarities[best_index]:.3f})")
+        return bucket[entry_id].answer
+
+    def store(self, query: Optional[SemanticCacheQuery], answer: Optional[str]):
+        """질문과 답변을 캐시에 저장합니다."""
+        if query is None or not answer:
+            return
+
+        bucket = self._buckets.setdefault(query.bucket, OrderedDict())
+        bucket[self._next_id] = SemanticCacheEntry(
+            question=query.question,
+            embedding=query.embedding,
+            answer=answer,
+            created_at=time.monotonic()
+        )
+        self._next_id += 1
+
+        while len(bucket) > self.max_entries_per_bucket:
+            bucket.popitem(last=False)
+            self._evictions += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total else 0.0,
+            "evictions": self._evictions,
+            "entries": sum(len(bucket) for bucket in self._buckets.values()),
+            "buckets": len(self._buckets),
+        }
+
+    def _remove_expired(self, bucket: "OrderedDict[int, SemanticCacheEntry]"):
+        now = time.monotonic()
+        for entry_id in [k for k, entry in bucket.items() if now - entry.created_at >= self.ttl_seconds]:
+            del bucket[entry_id]
+            self._evictions += 1
+
+
+semantic_cache = SemanticAnswerCache(
+    similarity_threshold=float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92")),
+    ttl_seconds=int(os.getenv("SEMANTIC_CACHE_TTL_SECONDS", "3600")),
+    max_entries_per_bucket=int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1000")),
+)
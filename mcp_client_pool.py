@@ -0,0 +1,263 @@
+import asyncio
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+import httpx
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from mcp.shared.exceptions import McpError
+from mcp_server_api import get_multi_server_mcp_clients_from_api, add_client_config_listener
+
+# MCP 서버 연결(세션 초기화 + tool 목록 조회) 제한 시간
+MCP_CONNECT_TIMEOUT = float(os.getenv("MCP_CONNECT_TIMEOUT", "10"))
+# 세션이 살아있는지 ping으로 확인할 때의 제한 시간
+MCP_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", "3"))
+
+# 세션 연결 자체의 문제일 수 있는 예외 (LLM 오류, 잘못된 tool 인자 등은 세션과 무관)
+TRANSPORT_ERRORS = (
+    McpError,
+    anyio.ClosedResourceError,
+    anyio.BrokenResourceError,
+    anyio.EndOfStream,
+    httpx.TransportError,
+    ConnectionError,
+)
+
+
+def is_transport_error(error: BaseException) -> bool:
+    """예외(또는 ExceptionGroup에 포함된 예외)가 MCP 세션 연결 문제인지 확인합니다."""
+    if isinstance(error, TRANSPORT_ERRORS):
+        return True
+    return any(is_transport_error(e) for e in getattr(error, "exceptions", ()))
+
+
+def _get_config_signature(client_config: dict) -> str:
+    """클라이언트 설정이 바뀌었는지 비교하기 위한 해시값을 생성합니다."""
+    serialized = json.dumps(client_config, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+class MCPServerSession:
+    """
+    하나의 MCP 서버에 대한 장기 세션입니다.
+
+    SSE 세션은 anyio task group 위에서 동작하므로, 세션을 연 태스크에서 닫아야 합니다.
+    따라서 세션 전용 백그라운드 태스크가 컨텍스트를 열어둔 채로 종료 신호를 기다립니다.
+    """
+    def __init__(self, client: MultiServerMCPClient, server_name: str, generation: int = 0):
+        self.client = client
+        self.server_name = server_name
+        # 풀에서 세션을 만들 때마다 증가하는 번호 (세션에 바인딩된 tool이 바뀌었는지 판단할 때 사용)
+        self.generation = generation
+        self.session = None
+        self.tools: List[BaseTool] = []
+        self._task: Optional[asyncio.Task] = None
+        self._closed = asyncio.Event()
+
+    @property
+    def is_alive(self) -> bool:
+        return self._task is not None and not self._task.done() and self.session is not None
+
+    async def start(self, timeout: Optional[float] = None) -> List[BaseTool]:
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        try:
+            return await asyncio.wait_for(ready, timeout)
+        except BaseException:
+            # 연결에 실패했거나 시간이 초과되면 반쯤 열린 세션이 남지 않도록 태스크를 취소
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            raise
+
+    async def ping(self, timeout: float = MCP_PING_TIMEOUT) -> bool:
+        """세션이 실제로 응답하는지 확인합니다."""
+        if not self.is_alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            async with self.client.session(self.server_name) as session:
+                self.session = session
+                self.tools = await load_mcp_tools(session)
+                if ready.done():
+                    return
+                ready.set_result(self.tools)
+                print(f"🔌 MCP 세션 연결: {self.server_name} (tools: {len(self.tools)})")
+                await self._closed.wait()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                print(f"⚠️ MCP 세션 연결 끊김: {self.server_name} - {e}")
+        finally:
+            self.session = None
+
+    async def close(self):
+        self._closed.set()
+        if self._task is not None:
+            try:
+                await self._task
+            except Exception as e:
+                print(f"⚠️ MCP 세션 종료 중 오류: {self.server_name} - {e}")
+
+
+class MCPClientPool:
+    """
+    프로세스 전역에서 MCP 서버 세션과 tool 목록을 재사용하기 위한 풀입니다.
+
+    - 서버별로 SSE 세션을 유지하고, 세션에 바인딩된 tool 목록을 캐시합니다.
+    - 세션이 끊어져 있으면 다음 요청 시 재연결합니다. 연결은 서버별 lock으로 보호하므로
+      한 서버의 연결이 느려도 다른 서버의 세션 생성은 기다리지 않습니다. (MCP_CONNECT_TIMEOUT 초과 시 실패)
+    - MCP 서버 API의 클라이언트 설정이 바뀌면 모든 세션을 폐기하고 다시 연결합니다.
+    """
+    def __init__(self):
+        self._client: Optional[MultiServerMCPClient] = None
+        self._client_config: Dict[str, Any] = {}
+        self._config_signature: Optional[str] = None
+        self._sessions: Dict[str, MCPServerSession] = {}
+        self._lock = asyncio.Lock()
+        self._server_locks: Dict[str, asyncio.Lock] = {}
+        self._session_generation = 0
+        
+        # MCP 서버 API에서 설정 버전이 바뀌었다고 알려주면 세션을 모두 폐기
+        add_client_config_listener(self._on_client_config_changed)
+
+    async def get_tools(self, server_name: Optional[str] = None) -> List[BaseTool]:
+        """
+        캐시된 MCP tool 목록을 반환합니다.
+        server_name이 없으면 설정된 모든 서버의 tool을 합쳐서 반환합니다.
+        """
+        tools, _ = await self.get_tools_with_version(server_name)
+        return tools
+
+    async def get_tools_with_version(self, server_name: Optional[str] = None) -> Tuple[List[BaseTool], Tuple[Tuple[str, int], ...]]:
+        """
+        tool 목록과 그 tool을 제공한 세션들의 버전((서버명, 세션 번호) 목록)을 함께 반환합니다.
+        버전은 사용한 서버의 세션이 다시 연결될 때만 바뀌고, 다른 서버의 재연결에는 영향을 받지 않습니다.
+        """
+        await self._sync_config()
+
+        server_names = [server_name] if server_name else list(self._client_config.keys())
+
+        tools: List[BaseTool] = []
+        version = []
+        for name in server_names:
+            session = await self._get_session(name)
+            tools.extend(session.tools)
+            version.append((name, session.generation))
+        return tools, tuple(version)
+
+    async def _sync_config(self):
+        client_config = await get_multi_server_mcp_clients_from_api()
+        signature = _get_config_signature(client_config)
+
+        if signature == self._config_signature:
+            return
+
+        async with self._lock:
+            if signature == self._config_signature:
+                return
+            print("🔄 MCP 클라이언트 설정 변경 감지, 세션을 다시 연결합니다.")
+            await self._close_sessions()
+            self._client_config = client_config
+            self._client = MultiServerMCPClient(client_config)
+            self._config_signature = signature
+
+    def _get_server_lock(self, server_name: str) -> asyncio.Lock:
+        return self._server_locks.setdefault(server_name, asyncio.Lock())
+
+    async def _get_session(self, server_name: str) -> MCPServerSession:
+        session = self._sessions.get(server_name)
+        if session is not None and session.is_alive:
+            return session
+
+        async with self._get_server_lock(server_name):
+            session = self._sessions.get(server_name)
+            if session is not None and session.is_alive:
+                return session
+
+            if session is not None:
+                self._sessions.pop(server_name, None)
+                await session.close()
+
+            if server_name not in self._client_config:
+                raise ValueError(f"'{server_name}' MCP 서버 설정을 찾을 수 없습니다.")
+
+            client = self._client
+            self._session_generation += 1
+            session = MCPServerSession(client, server_name, generation=self._session_generation)
+            try:
+                await session.start(timeout=MCP_CONNECT_TIMEOUT)
+            except asyncio.TimeoutError:
+                raise TimeoutError(f"'{server_name}' MCP 서버 연결 시간 초과 ({MCP_CONNECT_TIMEOUT}s)")
+
+            # 연결하는 동안 설정이 바뀌었다면 이전 설정으로 만든 세션은 사용하지 않음
+            if client is not self._client:
+                await session.close()
+                raise RuntimeError(f"'{server_name}' MCP 서버 연결 중 설정이 변경되었습니다. 다시 시도해주세요.")
+
+            self._sessions[server_name] = session
+            return session
+
+    async def reset(self, server_name: Optional[str] = None):
+        """
+        세션을 폐기합니다. tool 호출이 실패했을 때 호출하면 다음 요청에서 재연결합니다.
+        server_name이 없으면 모든 세션을 폐기합니다.
+        """
+        if server_name is not None:
+            async with self._get_server_lock(server_name):
+                if server_name in self._sessions:
+                    await self._sessions.pop(server_name).close()
+            return
+
+        async with self._lock:
+            await self._close_sessions()
+
+    async def reset_if_disconnected(self, error: BaseException, server_name: Optional[str] = None) -> List[str]:
+        """
+        agent 실행이 실패했을 때 호출합니다. 연결 문제로 보이는 예외일 때만,
+        ping에 응답하지 않는 세션(server_name이 있으면 그 서버, 없으면 모든 서버)을 폐기합니다.
+        다른 요청이 함께 사용 중인 정상 세션은 유지됩니다.
+        :return: 폐기한 서버 이름 목록
+        """
+        if not is_transport_error(error):
+            return []
+
+        server_names = [server_name] if server_name else list(self._sessions.keys())
+        dead = []
+        for name in server_names:
+            session = self._sessions.get(name)
+            if session is not None and not await session.ping():
+                await self.reset(name)
+                dead.append(name)
+        if dead:
+            print(f"⚠️ 응답 없는 MCP 세션 폐기: {dead}")
+        return dead
+
+    async def invalidate(self):
+        """설정 변경 알림을 받았을 때 설정과 세션을 모두 폐기합니다."""
+        async with self._lock:
+            await self._close_sessions()
+            self._config_signature = None
+
+    async def _on_client_config_changed(self, client_config: dict):
+        await self.invalidate()
+
+    async def _close_sessions(self):
+        sessions = list(self._sessions.values())
+        self._sessions.clear()
+        for session in sessions:
+            await session.close()
+
+
+instance = MCPClientPool()
@@ -1,4 +1,6 @@
-from typing import Optional, List
+from typing import Optional, List, Callable, Awaitable
+import asyncio
+import time
 import httpx
 from models import (
     McpServerUpdateRequest, DateRangeRequest
@@ -7,8 +9,35 @@ from models import (
 # MCP 서버 API 기본 URL
 MCP_SERVER_API_BASE_URL = "http://localhost:8888"
 
+# watcher가 동작하지 않을 때 캐시된 클라이언트 설정을 재검증하는 주기(초)
+CLIENT_CONFIG_CACHE_TTL_SECONDS = 30
+# 설정 변경 long-poll 대기 시간(초)
+CLIENT_CONFIG_WATCH_TIMEOUT_SECONDS = 30
+CLIENT_CONFIG_WATCH_RETRY_SECONDS = 5
+
 import functools
 
+_http_client: Optional[httpx.AsyncClient] = None
+
+def _get_http_client() -> httpx.AsyncClient:
+    """
+    keep-alive 연결을 재사용하는 공용 HTTP 클라이언트를 반환합니다.
+    """
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10),
+            timeout=httpx.Timeout(10.0, read=CLIENT_CONFIG_WATCH_TIMEOUT_SECONDS + 10.0)
+        )
+    return _http_client
+
+async def close_http_client():
+    """공용 HTTP 클라이언트를 닫습니다."""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
+
 async def _request_api(
     method: str,
     url: str,
@@ -24,24 +53,24 @@ async def _request_api(
     공통 API 요청 함수
     """
     try:
-        async with httpx.AsyncClient() as client:
-            # GET 요청에는 json 파라미터를 전달하지 않음
-            if method.lower() == "get":
-                response = await getattr(client, method)(
-                    url,
-                    params=params
-                )
-            else:
-                response = await getattr(client, method)(
-                    url,
-                    params=params,
-                    json=json
-                )
-            response.raise_for_status()
-            data = response.json()
-            if get_item:
-                return get_item(data)
-            return data.get(item_key, default)
+        client = _get_http_client()
+        # GET 요청에는 json 파라미터를 전달하지 않음
+        if method.lower() == "get":
+            response = await getattr(client, method)(
+                url,
+                params=params
+            )
+        else:
+            response = await getattr(client, method)(
+                url,
+                params=params,
+                json=json
+            )
+        response.raise_for_status()
+        data = response.json()
+        if get_item:
+            return get_item(data)
+        return data.get(item_key, default)
     except Exception as e:
         print(f"🚨 {error_msg}: {e}")
         return default
@@ -67,15 +96,114 @@ async def run_mcp_server_via_api(group_name: str, server_name: str) -> bool:
         get_item=lambda data: data.get("item", {}).get("success", False)
     )
 
+class ClientConfigCache:
+    """
+    MCP 클라이언트 설정을 로컬에 캐시합니다.
+
+    - 서버가 내려주는 version(ETag)으로 조건부 요청(If-None-Match)을 보내 재검증합니다.
+    - 백그라운드 watcher가 long-poll로 설정 변경을 기다리므로, 평상시 요청은 API를 호출하지 않습니다.
+    - 설정 버전이 바뀌면 등록된 리스너에게 알립니다.
+    """
+    def __init__(self):
+        self.config: Optional[dict] = None
+        self.version: Optional[str] = None
+        self.fetched_at = 0.0
+        self._listeners: List[Callable[[dict], Awaitable[None]]] = []
+        self._watch_task: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    def add_listener(self, listener: Callable[[dict], Awaitable[None]]):
+        self._listeners.append(listener)
+
+    @property
+    def is_watching(self) -> bool:
+        return self._watch_task is not None and not self._watch_task.done()
+
+    async def get(self) -> dict:
+        self._ensure_watcher()
+
+        if self.config is not None and (self.is_watching or time.monotonic() - self.fetched_at < CLIENT_CONFIG_CACHE_TTL_SECONDS):
+            return self.config
+
+        async with self._lock:
+            if self.config is None or time.monotonic() - self.fetched_at >= CLIENT_CONFIG_CACHE_TTL_SECONDS:
+                await self._revalidate()
+
+        return self.config if self.config is not None else {}
+
+    async def _revalidate(self):
+        headers = {"If-None-Match": self.version} if self.version else {}
+        try:
+            response = await _get_http_client().get(
+                f"{MCP_SERVER_API_BASE_URL}/api/multi-server-mcp-clients",
+                headers=headers
+            )
+            if response.status_code == 304:
+                self.fetched_at = time.monotonic()
+                return
+            response.raise_for_status()
+            data = response.json()
+            item = data.get("item")
+            if not item:
+                raise ValueError(data.get("message"))
+            await self._update(item.get("client_config", {}), item.get("version") or response.headers.get("ETag"))
+        except Exception as e:
+            # 조회에 실패하면 기존 캐시를 그대로 사용
+            print(f"🚨 MCP 클라이언트 설정 조회 실패: {e}")
+
+    async def _update(self, config: dict, version: Optional[str]):
+        changed = self.version is not None and version != self.version
+        self.config = config
+        self.version = version
+        self.fetched_at = time.monotonic()
+
+        if changed:
+            print(f"🔄 MCP 클라이언트 설정 버전 변경: {version}")
+            for listener in self._listeners:
+                try:
+                    await listener(config)
+                except Exception as e:
+                    print(f"🚨 MCP 클라이언트 설정 변경 알림 실패: {e}")
+
+    def _ensure_watcher(self):
+        if not self.is_watching:
+            self._watch_task = asyncio.create_task(self._watch())
+
+    async def _watch(self):
+        """설정 버전이 바뀔 때까지 long-poll로 대기하고, 바뀌면 캐시를 갱신합니다."""
+        while True:
+            try:
+                params = {"timeout": CLIENT_CONFIG_WATCH_TIMEOUT_SECONDS}
+                if self.version:
+                    params["version"] = self.version
+                response = await _get_http_client().get(
+                    f"{MCP_SERVER_API_BASE_URL}/api/multi-server-mcp-clients/watch",
+                    params=params
+                )
+                response.raise_for_status()
+                data = response.json()
+                item = data.get("item")
+                if not item:
+                    raise ValueError(data.get("message"))
+                if item.get("version") != self.version:
+                    await self._update(item.get("client_config", {}), item.get("version"))
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"🚨 MCP 클라이언트 설정 watch 실패: {e}")
+                # watcher가 멈춘 동안에는 TTL 기반 재검증으로 동작
+                self.fetched_at = 0.0
+                await asyncio.sleep(CLIENT_CONFIG_WATCH_RETRY_SECONDS)
+
+client_config_cache = ClientConfigCache()
+
+def add_client_config_listener(listener: Callable[[dict], Awaitable[None]]):
+    """MCP 클라이언트 설정 버전이 바뀌었을 때 호출될 리스너를 등록합니다."""
+    client_config_cache.add_listener(listener)
+
 async def get_multi_server_mcp_clients_from_api() -> dict:
-    """MCP 서버 API에서 클라이언트 설정을 가져옵니다."""
-    return await _request_api(
-        "get",
-        f"{MCP_SERVER_API_BASE_URL}/api/multi-server-mcp-clients",
-        error_msg="MCP 클라이언트 설정 조회 실패",
-        default={},
-        get_item=lambda data: data.get("item", {}).get("client_config", {})
-    )
+    """MCP 서버 API에서 클라이언트 설정을 가져옵니다. (로컬 캐시 사용)"""
+    return await client_config_cache.get()
 
 async def get_mcp_server_from_db_api(server_name: str, name: str) -> dict:
     """MCP 서버 API에서 데이터베이스 서버 정보를 가져옵니다."""
@@ -229,6 +357,16 @@ async def get_sql_agent_logs_latest_by_request_id_from_db_api() -> List[dict]:
         default=[]
     )
 
+async def get_sql_agent_log_stats_from_db_api(limit: int = 20) -> dict:
+    """MCP 서버 API에서 SQL Agent가 생성한 쿼리 중 가장 느린/자주 실행된 쿼리 통계를 가져옵니다."""
+    return await _request_api(
+        "get",
+        f"{MCP_SERVER_API_BASE_URL}/api/sql-agent-logs-db/stats",
+        params={"limit": limit},
+        error_msg="SQL Agent 쿼리 통계 DB 조회 실패",
+        default={"slowest": [], "most_repeated": []}
+    )
+
 async def get_sql_agent_logs_by_date_range_from_db_api(request: 'DateRangeRequest') -> List[dict]:
     """MCP 서버 API에서 SQL Agent 로그를 날짜 범위로 가져옵니다."""
     return await _request_api(
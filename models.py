@@ -26,6 +26,7 @@ class ChatType(str, Enum):
     YOUTUBE_SEARCH = 'YOUTUBE_SEARCH'
     KOCW_SEARCH = 'KOCW_SEARCH'
     WEB_SEARCH = 'WEB_SEARCH'
+    SEARCH_ALL = 'SEARCH_ALL'
     DEPARTMENT_SEARCH = 'DEPARTMENT_SEARCH'
     COMMON = 'COMMON'
     FAST_FORWARD = 'FAST_FORWARD'
@@ -81,6 +82,7 @@ class SqlAgentLog(BaseModel):
     tool_output: str
     step_order: int
     request_id: Optional[str] = None
+    duration_ms: Optional[int] = None
     execution_time: Optional[datetime] = None
     created_at: Optional[datetime] = None
 
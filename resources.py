@@ -0,0 +1,131 @@
+import asyncio
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+STATE_PENDING = "pending"
+STATE_LOADING = "loading"
+STATE_READY = "ready"
+STATE_FAILED = "failed"
+
+
+class Resource:
+    """
+    처음 사용할 때 생성되는 무거운 싱글톤(그래프, LLM 클라이언트, 벡터 DB, DB 풀 등)입니다.
+
+    - get()/aget()은 factory()를 한 번만 실행하고 결과를 재사용합니다. 생성에 실패하면 다음 호출에서 다시 시도합니다.
+    - warm_up()은 인스턴스를 만든 뒤 인스턴스의 warm_up() 메서드(있다면)를 실행합니다.
+    - required가 True인 리소스가 모두 준비되어야 서비스 준비(readiness) 상태가 됩니다.
+    """
+    def __init__(self, name: str, factory: Callable[[], Any], required: bool = True):
+        self.name = name
+        self.factory = factory
+        self.required = required
+
+        self.state = STATE_PENDING
+        self.error: Optional[str] = None
+        self.load_seconds: Optional[float] = None
+
+        self._instance: Any = None
+        self._created = False
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        if self._created:
+            return self._instance
+
+        with self._lock:
+            if not self._created:
+                started_at = time.perf_counter()
+                try:
+                    self._instance = self.factory()
+                except Exception as e:
+                    self.state, self.error = STATE_FAILED, str(e)
+                    raise
+                self._created = True
+                self.load_seconds = time.perf_counter() - started_at
+                if self.state != STATE_READY:
+                    self.state, self.error = STATE_LOADING, None
+        return self._instance
+
+    async def aget(self) -> Any:
+        """get()의 비동기 버전. 생성(import 포함)은 이벤트 루프 밖에서 수행합니다."""
+        if self._created:
+            return self._instance
+        return await asyncio.to_thread(self.get)
+
+    async def warm_up(self):
+        started_at = time.perf_counter()
+        self.state = STATE_LOADING
+        try:
+            instance = await self.aget()
+            warm_up = getattr(instance, "warm_up", None)
+            if warm_up is not None:
+                if asyncio.iscoroutinefunction(warm_up):
+                    await warm_up()
+                else:
+                    await asyncio.to_thread(warm_up)
+        except Exception as e:
+            self.state, self.error = STATE_FAILED, str(e)
+            print(f"⚠️ 리소스 준비 실패: {self.name} - {e}")
+            return
+
+        self.state, self.error = STATE_READY, None
+        self.load_seconds = time.perf_counter() - started_at
+        print(f"✅ 리소스 준비 완료: {self.name} ({self.load_seconds:.1f}s)")
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "required": self.required,
+            "error": self.error,
+            "load_seconds": round(self.load_seconds, 3) if self.load_seconds is not None else None,
+        }
+
+
+class ResourceRegistry:
+    """
+    무거운 싱글톤을 이름으로 등록해두고 지연 생성/사전 준비(warm-up)를 관리합니다.
+    앱은 import 시점에 아무것도 만들지 않고, lifespan의 warm_up_all() 또는 첫 요청에서 생성합니다.
+    """
+    def __init__(self, retry_interval: float = 10.0):
+        self.retry_interval = retry_interval
+        self._resources: Dict[str, Resource] = {}
+
+    def register(self, name: str, factory: Callable[[], Any], required: bool = True) -> Resource:
+        resource = Resource(name, factory, required=required)
+        self._resources[name] = resource
+        return resource
+
+    def _get_resource(self, name: str) -> Resource:
+        if name not in self._resources:
+            raise KeyError(f"'{name}' 리소스가 등록되지 않았습니다.")
+        return self._resources[name]
+
+    def get(self, name: str) -> Any:
+        return self._get_resource(name).get()
+
+    async def aget(self, name: str) -> Any:
+        return await self._get_resource(name).aget()
+
+    async def warm_up_all(self):
+        """
+        모든 리소스를 동시에 준비합니다.
+        필수 리소스가 실패하면(예: DB가 아직 떠 있지 않음) retry_interval마다 다시 시도합니다.
+        """
+        pending = list(self._resources.values())
+        while pending:
+            await asyncio.gather(*(resource.warm_up() for resource in pending))
+            pending = [resource for resource in pending if resource.required and resource.state == STATE_FAILED]
+            if pending:
+                await asyncio.sleep(self.retry_interval)
+
+    def is_ready(self) -> bool:
+        return all(resource.state == STATE_READY for resource in self._resources.values() if resource.required)
+
+    def get_status(self) -> Dict[str, Dict[str, Any]]:
+        return {name: resource.get_status() for name, resource in self._resources.items()}
+
+
+resource_registry = ResourceRegistry(retry_interval=float(os.getenv("RESOURCE_WARM_UP_RETRY_SECONDS", "10")))
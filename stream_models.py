@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Any, Dict, Optional
 
+from graphs.nodes.node_utils import is_client_streaming_node
+
 
 @dataclass
 class AiMessageChunkModel:
@@ -50,14 +52,26 @@ class ChunkMetadataModel:
 
     def to_client_payload(self) -> Dict[str, Any]:
         node_name = self.node_name
+        is_answer = is_client_streaming_node(node_name)
         return {
-            "mode": "loading" if node_name != "merge_messages" else "answer",
+            "mode": "loading" if not is_answer else "answer",
             "metadata": {
                 "node_name": node_name,
                 "message": self.get_message_by_node_name(node_name)
-            } if node_name != "merge_messages" else None,
+            } if not is_answer else None,
         }
         
+    @staticmethod
+    def get_custom_payload(event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        노드가 get_stream_writer로 보낸 이벤트를 클라이언트 페이로드로 변환합니다.
+        이벤트의 mode(예: partial)를 그대로 사용하고 나머지 값은 metadata로 전달합니다.
+        """
+        return {
+            "mode": event.get("mode", "loading"),
+            "metadata": {key: value for key, value in event.items() if key != "mode"}
+        }
+
     @staticmethod
     def get_client_answer_payload() -> Dict[str, Any]:
         return {
@@ -72,6 +86,7 @@ class ChunkMetadataModel:
             "youtube_search": "답변을 위해 '유튜브 검색'을 진행하고 있어요.",
             "kocw_search": f"답변을 위해 'KOCW 강의 검색'을 진행하고 있어요.",
             "web_search": f"답변을 위해 '웹 검색'을 진행하고 있어요.",
+            "search_all": f"답변을 위해 '유튜브, KOCW, 웹 검색'을 동시에 진행하고 있어요.",
             "department_search": f"답변을 위해 '학과 정보 검색'을 진행하고 있어요.",
         }.get(node_name, "답변을 위해 작업을 진행하고 있어요.")
         
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("langgraph")
+
+import admission  # noqa: E402
+from admission import AdmissionGate, AdmissionRejectedError, TokenBucket  # noqa: E402
+
+
+def test_gate_admits_waiters_by_priority_then_arrival():
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrency=1, max_queue=10)
+        await gate.acquire(priority=1)
+        order = []
+
+        async def wait(label, priority):
+            await gate.acquire(priority)
+            order.append(label)
+            gate.release()
+
+        tasks = []
+        for label, priority in (("search-1", 2), ("common", 1), ("search-2", 2), ("fast", 0)):
+            tasks.append(asyncio.create_task(wait(label, priority)))
+            await asyncio.sleep(0)
+
+        gate.release()
+        await asyncio.gather(*tasks)
+        return order, gate.get_metrics()
+
+    order, metrics = asyncio.run(scenario())
+
+    assert order == ["fast", "common", "search-1", "search-2"]
+    assert metrics["active"] == 0
+    assert metrics["admitted"] == 5
+
+
+def test_gate_rejects_when_queue_is_full():
+    async def scenario():
+        gate = AdmissionGate("test", max_concurrency=1, max_queue=1)
+        await gate.acquire(priority=1)
+        waiter = asyncio.create_task(gate.acquire(priority=1))
+        await asyncio.sleep(0)
+
+        with pytest.raises(AdmissionRejectedError):
+            await gate.acquire(priority=0)
+
+        gate.release()
+        await waiter
+        gate.release()
+        return gate.get_metrics()
+
+    metrics = asyncio.run(scenario())
+
+    assert metrics["rejected"] == 1
+    assert metrics["active"] == 0
+    assert metrics["queued"] == 0
+
+
+def test_token_bucket_refills_over_time(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(admission.time, "monotonic", lambda: now[0])
+    bucket = TokenBucket(tokens_per_minute=60)
+
+    asyncio.run(bucket.acquire(60))
+    assert bucket.available == 0
+
+    now[0] += 30
+    assert bucket.available == 30
+
+    now[0] += 60
+    assert bucket.available == 60
+
+
+def test_token_bucket_waits_without_holding_lock():
+    async def scenario():
+        bucket = TokenBucket(tokens_per_minute=60)
+        await bucket.acquire(60)
+
+        # 1초에 1토큰씩 채워지므로 약 60초를 기다려야 하는 요청
+        waiter = asyncio.create_task(bucket.acquire(60))
+        await asyncio.sleep(0.05)
+        locked = bucket._lock.locked()
+
+        waiter.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiter
+        return locked
+
+    assert asyncio.run(scenario()) is False
@@ -0,0 +1,69 @@
+import asyncio
+import os
+import sys
+from contextlib import asynccontextmanager
+
+import pytest
+
+# MCP 서버 코드는 tools/mcp를 루트로 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "mcp"))
+
+pytest.importorskip("langchain_openai")
+pytest.importorskip("tiktoken")
+
+from langchain_core.messages import AIMessage, HumanMessage  # noqa: E402
+from langchain_core.outputs import ChatGeneration, ChatResult  # noqa: E402
+from langchain_openai import ChatOpenAI  # noqa: E402
+
+from llm_models import chat_gpt  # noqa: E402
+from llm_models.chat_gpt import AdmittedChatOpenAI, ChatGPTModel  # noqa: E402
+
+
+class _FakeEncoding:
+    def encode(self, text):
+        return list(text)
+
+
+def _create_model(admitted):
+    model = ChatGPTModel()
+    model._encoding = _FakeEncoding()
+    model._model = AdmittedChatOpenAI(model=model.model_name, api_key="test", admission=model._admit_messages)
+    model.expected_completion_tokens = 0
+
+    @asynccontextmanager
+    async def admission(tokens):
+        admitted.append(tokens)
+        yield
+
+    model.set_admission(admission)
+    return model
+
+
+@pytest.fixture(autouse=True)
+def fake_generate(monkeypatch):
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="ok"))])
+
+    monkeypatch.setattr(ChatOpenAI, "_agenerate", _agenerate)
+
+
+def test_direct_model_call_is_admitted_once():
+    admitted = []
+    model = _create_model(admitted)
+
+    asyncio.run(model.model._agenerate([HumanMessage(content="안녕")]))
+
+    assert admitted == [2 + 4]
+
+
+def test_nested_generate_is_not_admitted_twice():
+    admitted = []
+    model = _create_model(admitted)
+
+    async def scenario():
+        async with model._admit(10):
+            await model.model._agenerate([HumanMessage(content="안녕")])
+        return chat_gpt._admitted.get()
+
+    assert asyncio.run(scenario()) is False
+    assert admitted == [10]
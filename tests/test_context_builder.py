@@ -0,0 +1,79 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+pytest.importorskip("tiktoken")
+
+from tools.mcp.vectordb import context_builder  # noqa: E402
+from tools.mcp.vectordb.context_builder import ContextBuilder, get_token_budget  # noqa: E402
+
+
+class _CharEncoding:
+    """글자 하나를 토큰 하나로 세는 결정적인 인코딩"""
+    def encode(self, text):
+        return list(text)
+
+    def decode(self, tokens):
+        return "".join(tokens)
+
+
+@pytest.fixture(autouse=True)
+def char_encoding(monkeypatch):
+    monkeypatch.setattr(context_builder, "_get_encoding", lambda model_name: _CharEncoding())
+
+
+def _chunk(chunk_id, document, department=None):
+    return {"id": chunk_id, "document": document, "metadata": {"department": department} if department else {}}
+
+
+def test_token_budget_by_model(monkeypatch):
+    monkeypatch.delenv("CONTEXT_TOKEN_BUDGET", raising=False)
+    assert get_token_budget("gpt-4o-mini") == 2000
+    assert get_token_budget("gpt-4o") == 1500
+    assert get_token_budget("unknown-model") == 1500
+
+    monkeypatch.setenv("CONTEXT_TOKEN_BUDGET", "300")
+    assert get_token_budget("gpt-4o-mini") == 300
+
+
+def test_build_respects_token_budget():
+    chunks = [_chunk(f"doc{i}", f"{i}번 문서의 내용입니다. " * 3) for i in range(20)]
+    builder = ContextBuilder(token_budget=200)
+
+    context = builder.build("문서 내용", chunks)
+
+    assert 0 < len(context) <= 200
+    assert context.startswith("[doc0]")
+
+
+def test_build_drops_near_duplicates_and_keeps_rank_order():
+    chunks = [
+        _chunk("a", "컴퓨터공학과는 3학년부터 전공 심화 과목을 수강합니다.", "컴퓨터공학과"),
+        _chunk("b", "전기공학과 졸업 요건은 130학점입니다.", "전기공학과"),
+        _chunk("c", "컴퓨터공학과는 3학년부터 전공 심화 과목을 수강합니다!"),
+        _chunk("d", "심리학과는 상담 실습 수업이 있습니다."),
+    ]
+
+    lines = ContextBuilder(token_budget=1000).build("수업", chunks).split("\n")
+
+    assert [line.split("]")[0] for line in lines] == ["[a", "[b", "[d"]
+    assert lines[0].startswith("[a] (컴퓨터공학과) ")
+
+
+def test_dedupe_can_be_disabled():
+    chunks = [_chunk("a", "같은 문서입니다."), _chunk("b", "같은 문서입니다.")]
+
+    context = ContextBuilder(token_budget=1000, duplicate_threshold=None).build("문서", chunks)
+
+    assert context.count("같은 문서입니다.") == 2
+
+
+def test_trim_keeps_relevant_sentences_in_original_order():
+    document = "학과 소개입니다. 졸업 요건은 130학점입니다. 동아리가 많습니다. 졸업 논문은 필수입니다. 기숙사가 있습니다."
+
+    trimmed = ContextBuilder(max_sentences=2).trim("졸업 요건", document)
+
+    assert trimmed == "졸업 요건은 130학점입니다. 졸업 논문은 필수입니다."
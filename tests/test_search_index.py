@@ -0,0 +1,90 @@
+import os
+import sys
+
+import pytest
+
+# MCP 서버 코드는 tools/mcp를 루트로 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "mcp"))
+
+import search_index  # noqa: E402
+from search_index import DepartmentResolver  # noqa: E402
+
+DEPARTMENTS = [
+    "컴퓨터융합학부", "컴퓨터공학과", "전기공학과", "전자공학과", "전기전자공학과",
+    "국어국문학과", "영어영문학과", "기계공학부", "경영학부", "건축학과", "건축공학과",
+    "수학과", "물리학과", "심리학과",
+]
+
+
+@pytest.fixture(scope="module")
+def resolver():
+    return DepartmentResolver(loader=lambda: DEPARTMENTS)
+
+
+@pytest.mark.parametrize("name, expected", [
+    ("컴퓨터공학과", "컴퓨터공학과"),
+    ("  컴퓨터공학과 ", "컴퓨터공학과"),
+    ("컴퓨터융합", "컴퓨터융합학부"),
+    ("컴공", "컴퓨터공학과"),
+    ("컴퓨터공학", "컴퓨터공학과"),
+    ("전기과", "전기공학과"),
+    ("전자과", "전자공학과"),
+    ("국문과", "국어국문학과"),
+    ("영문과", "영어영문학과"),
+    ("건축과", "건축학과"),
+    ("수학", "수학과"),
+    ("천문우주과학과", None),
+    # 물리학과/심리학과와 같은 점수로 비슷하므로 어느 쪽으로도 정규화하지 않음
+    ("요리학과", None),
+    ("", None),
+    (None, None),
+])
+def test_resolve(resolver, name, expected):
+    assert resolver.resolve(name) == expected
+
+
+def test_ambiguous_short_name_is_not_exact_match():
+    resolver = DepartmentResolver(loader=lambda: ["생물학과", "생물학부"])
+
+    assert resolver.resolve("생물학과") == "생물학과"
+    assert resolver.resolve("생물학부") == "생물학부"
+    # "생물"은 두 학과의 짧은 이름이 겹치므로 정확 일치에서 제외되고, 후보 점수도 같아 정규화하지 않음
+    assert resolver.resolve("생물") is None
+    assert "생물" not in resolver._exact
+
+
+def test_find_mentions(resolver):
+    mentions = resolver.find_mentions("컴공 3학년이 국문과 수업을 들을 수 있나요?")
+
+    assert mentions == {"국문과": "국어국문학과", "컴공": "컴퓨터공학과"}
+
+
+def test_failed_background_refresh_keeps_index_and_retries_later(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(search_index.time, "monotonic", lambda: now[0])
+
+    calls = []
+
+    def loader():
+        calls.append(now[0])
+        if len(calls) > 1:
+            raise RuntimeError("db down")
+        return DEPARTMENTS
+
+    resolver = DepartmentResolver(loader=loader, refresh_interval=3600, retry_interval=60)
+    assert resolver.resolve("컴공") == "컴퓨터공학과"
+
+    # 갱신 주기가 지나 _ensure_loaded가 시작하는 백그라운드 갱신과 같은 순서로 실행
+    now[0] += 3600
+    assert resolver._refresh_lock.acquire(blocking=False)
+    resolver._refresh_in_background()
+
+    assert len(calls) == 2
+    assert not resolver._refresh_lock.locked()
+    assert resolver.resolve("컴공") == "컴퓨터공학과"
+    assert resolver._next_refresh_at == now[0] + 60
+
+    # retry_interval 전에는 다시 갱신하지 않음
+    now[0] += 30
+    resolver.resolve("컴공")
+    assert len(calls) == 2
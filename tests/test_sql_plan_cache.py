@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+# MCP 서버 코드는 tools/mcp를 루트로 import
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "tools", "mcp"))
+
+pytest.importorskip("sqlalchemy")
+
+from agent.sql_plan_cache import _parameterize, extract_slots  # noqa: E402
+
+
+def test_extract_slots_does_not_take_target_year_as_subject():
+    slots = extract_slots("컴퓨터융합학부 3학년 과목")
+
+    assert slots == {"department": "컴퓨터융합학부", "target_year": 3}
+
+
+def test_canonical_question_is_parameterized():
+    slots = extract_slots("컴퓨터융합학부 3학년 과목")
+    plan = _parameterize(
+        "SELECT subject_name FROM course_registration_info WHERE department = '컴퓨터융합학부' AND target_year = 3",
+        slots,
+    )
+
+    assert plan is not None
+    assert "'" not in plan.sql
+    assert plan.bind({"department": "전기공학과", "target_year": 2}) == {"department_0": "전기공학과", "target_year": 2}
+
+
+def test_template_with_unbound_literal_is_not_cached():
+    slots = {"department": "전기공학과"}
+    plan = _parameterize(
+        "SELECT subject_name FROM course_registration_info WHERE department IN ('전기공학과', '전기전자공학과')",
+        slots,
+    )
+
+    assert plan is None
+
+
+def test_template_with_unbound_target_year_is_not_cached():
+    slots = extract_slots("컴퓨터융합학부 3학년 과목")
+    plan = _parameterize(
+        "SELECT subject_name FROM course_registration_info WHERE department = '컴퓨터융합학부' AND (target_year = 3 OR target_year = 4)",
+        slots,
+    )
+
+    assert plan is None
+
+
+def test_limit_does_not_block_caching():
+    slots = extract_slots("컴퓨터융합학부 3학년 과목")
+    plan = _parameterize(
+        "SELECT subject_name FROM course_registration_info WHERE department = '컴퓨터융합학부' AND target_year = 3 LIMIT 10",
+        slots,
+    )
+
+    assert plan is not None
+    assert plan.sql.endswith("target_year = :target_year LIMIT 10")
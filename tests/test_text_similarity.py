@@ -0,0 +1,47 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.mcp.vectordb.text_similarity import compact, iter_distinct, tokenize  # noqa: E402
+
+
+def test_tokenize_adds_syllable_bigrams_for_long_words():
+    tokens = tokenize("컴퓨터공학과 AI 수업")
+
+    assert "컴퓨터공학과" in tokens
+    assert "공학" in tokens
+    assert "ai" in tokens
+    # 2글자 이하 단어는 그대로만 사용
+    assert tokens.count("수업") == 1
+
+
+def test_compact_ignores_spaces_and_punctuation():
+    assert compact("컴퓨터 공학과!") == compact("컴퓨터공학과") == "컴퓨터공학과"
+
+
+def test_iter_distinct_drops_near_duplicates_and_keeps_order():
+    documents = [
+        "컴퓨터공학과는 3학년부터 전공 심화 과목을 수강합니다.",
+        "전기공학과 졸업 요건은 130학점입니다.",
+        "컴퓨터공학과는 3학년부터 전공 심화 과목을 수강합니다!!",
+        "심리학과는 상담 실습 수업이 있습니다.",
+        "전기공학과 졸업 요건은 130학점 입니다.",
+    ]
+
+    distinct = list(iter_distinct(documents, lambda document: document))
+
+    assert distinct == [documents[0], documents[1], documents[3]]
+
+
+def test_iter_distinct_is_lazy():
+    seen = []
+
+    def get_text(document):
+        seen.append(document)
+        return document
+
+    distinct = iter_distinct(["가나다라마", "바사아자차", "카타파하"], get_text)
+
+    assert next(distinct) == "가나다라마"
+    assert seen == ["가나다라마"]
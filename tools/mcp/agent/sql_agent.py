@@ -1,54 +1,239 @@
 from langchain_community.utilities import SQLDatabase
 from langchain_community.agent_toolkits import create_sql_agent
 from llm_models.chat_gpt import model_instance
+from agent.sql_plan_cache import SQLPlanCache
+from agent.sql_agent_log_writer import StepTimingCallbackHandler, log_writer
+from datetime import datetime
+from database.database_connector import get_engine
+from database.course_keyword_index import INDEXED_TABLES, format_keyword_results, keyword_index
+from langchain_core.tools import StructuredTool
+from typing import Dict, Iterable, List, Optional, Tuple
 import json
+import sys
+import threading
+import time
 import uuid
 
+class CachedSQLDatabase(SQLDatabase):
+    """
+    테이블 스키마/샘플 행 정보(table info)를 캐시하는 SQLDatabase입니다.
+    스키마가 바뀐 경우 refresh_schema()로 다시 읽어옵니다.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._table_info_cache: Dict[Tuple[str, ...], str] = {}
+        self._table_info_lock = threading.Lock()
+
+    def get_table_info(self, table_names: Optional[List[str]] = None) -> str:
+        key = tuple(sorted(table_names)) if table_names else ()
+        table_info = self._table_info_cache.get(key)
+        if table_info is None:
+            with self._table_info_lock:
+                table_info = self._table_info_cache.get(key)
+                if table_info is None:
+                    table_info = super().get_table_info(table_names)
+                    self._table_info_cache[key] = table_info
+        return table_info
+
+    def refresh_schema(self):
+        """테이블 메타데이터를 다시 읽고 table info 캐시를 비웁니다."""
+        with self._table_info_lock:
+            self._metadata.clear()
+            self._metadata.reflect(
+                views=self._view_support,
+                bind=self._engine,
+                only=list(self._usable_tables),
+                schema=self._schema,
+            )
+            self._table_info_cache.clear()
+
+
+def create_keyword_search_tools(allowed_tables: List[str]) -> list:
+    """
+    허용 테이블의 과목명/학과명을 n-gram 색인으로 찾는 tool을 만듭니다.
+    색인 대상 테이블이 없으면 빈 목록을 반환합니다.
+    """
+    tables = [table for table in allowed_tables if table in INDEXED_TABLES]
+    if not tables:
+        return []
+
+    def search_keywords(keyword: str, field: Optional[str] = None) -> str:
+        return format_keyword_results(keyword_index.search(keyword, tables=tables, field=field))
+
+    return [StructuredTool.from_function(
+        func=search_keywords,
+        name="search_keywords",
+        description=(
+            "Find the exact subject (course) names or department names stored in the tables that are similar to a Korean keyword. "
+            "Input: keyword (e.g. '인간컴퓨터상호작용', '컴퓨터융합'), optional field ('subject' or 'department'). "
+            "Use the returned values with = or IN in the WHERE clause instead of LIKE '%...%' fragments."
+        )
+    )]
+
+
 class SQLAgent:
     def __init__(self, allowed_tables: list[str]):
-        with open("database/database_config.json", 'r', encoding='utf-8') as f:
-            config = json.load(f)
-            
-        db_config = config['database']
-        
-        self.db = SQLDatabase.from_uri(
-            f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['name']}",
-            include_tables = allowed_tables,
+        self.allowed_tables = list(allowed_tables)
+        self.db = CachedSQLDatabase(
+            engine=get_engine(),
+            include_tables=self.allowed_tables,
             sample_rows_in_table_info=1
             )
 
         self.model = model_instance.get_model()
         
+        # 검증된 SQL 템플릿 캐시 (적중 시 LLM tool-calling 루프를 건너뜀)
+        self.plan_cache = SQLPlanCache()
+
         self.sql_agent = create_sql_agent(
             llm=self.model,
             db=self.db,
             agent_type="tool-calling",
+            extra_tools=create_keyword_search_tools(self.allowed_tables),
             verbose=True,
             agent_executor_kwargs={"return_intermediate_steps": True}
         )
-    
-    def question(self, prompt: str, instruction: str):
+
+    def refresh_schema(self):
+        self.db.refresh_schema()
+        # 스키마가 바뀌면 저장된 SQL 템플릿도 더 이상 유효하지 않을 수 있음
+        self.plan_cache.clear()
+
+    def question(self, prompt: str, instruction: str, request_id: Optional[str] = None):
+
+        request_id = request_id or str(uuid.uuid4())
+        execution_time = datetime.now()
+
+        cached = self._question_by_plan_cache(prompt, instruction, request_id)
+        if cached is not None:
+            return cached
 
         messages=[
             {"role": "system", "content": prompt},
             {"role": "user", "content": instruction}
         ]
-        
+
+        # tool 호출별 실행 시간 측정
+        timing = StepTimingCallbackHandler()
         result = self.sql_agent.invoke({
             "input": messages
-        })
-        
-        # 중간 단계 출력을 데이터베이스에 저장(미구현)
+        }, config={"callbacks": [timing]})
+
+        # 중간 단계 출력을 백그라운드 writer로 데이터베이스에 저장
         if "intermediate_steps" in result:
+            logs = []
             for step_order, (action, observation) in enumerate(result["intermediate_steps"]):
                 tool_name = action.tool if hasattr(action, 'tool') else "unknown"
                 tool_input = action.tool_input if hasattr(action, 'tool_input') else str(action)
                 tool_output = str(observation) if observation else ""
-                
+
+                # sql_db_query는 같은 쿼리끼리 집계할 수 있도록 SQL 문자열만 저장
                 if isinstance(tool_input, dict):
-                    tool_input = json.dumps(tool_input)
+                    tool_input = tool_input.get("query") if tool_name == "sql_db_query" and "query" in tool_input else json.dumps(tool_input, ensure_ascii=False)
                 if isinstance(tool_output, dict):
                     tool_output = json.dumps(tool_output)
-        
+
+                logs.append({
+                    "instruction": instruction,
+                    "tool_name": tool_name,
+                    "tool_input": tool_input,
+                    "tool_output": tool_output,
+                    "step_order": step_order,
+                    "request_id": request_id,
+                    "duration_ms": timing.durations_ms[step_order] if step_order < len(timing.durations_ms) else None,
+                    "execution_time": execution_time
+                })
+            log_writer.write(logs)
+
+            self.plan_cache.learn(prompt, instruction, result["intermediate_steps"])
+
+        result["request_id"] = request_id
         return result
-    
\ No newline at end of file
+
+    def _question_by_plan_cache(self, prompt: str, instruction: str, request_id: str):
+        """
+        같은 형태의 질문에 대해 검증된 SQL 템플릿이 있으면 슬롯 값만 바꿔 바로 실행합니다.
+        조회 결과는 tool 호출 없이 LLM 한 번으로 프롬프트의 답변 규칙에 맞게 정리하므로, 캐시 적중 여부와 관계없이 같은 형태의 답변을 반환합니다.
+        실행 오류가 나거나 결과가 없으면 None을 반환해 LLM 루프로 넘어갑니다.
+        """
+        cached_plan = self.plan_cache.lookup(prompt, instruction)
+        if cached_plan is None:
+            return None
+
+        plan, params = cached_plan
+        started_at = time.perf_counter()
+        try:
+            output = self.plan_cache.execute(self.db._engine, plan, params)
+        except Exception as e:
+            print(f"SQL 템플릿 실행 오류, 템플릿을 폐기합니다: {e}", file=sys.stderr)
+            self.plan_cache.discard(prompt, instruction)
+            return None
+
+        if output is None:
+            return None
+
+        try:
+            answer = self._format_rows(prompt, instruction, plan.sql, output)
+        except Exception as e:
+            print(f"SQL 템플릿 결과 정리 오류: {e}", file=sys.stderr)
+            return None
+
+        log_writer.write([{
+            "instruction": instruction,
+            "tool_name": "sql_plan_cache",
+            "tool_input": plan.sql,
+            "tool_output": output,
+            "step_order": 0,
+            "request_id": request_id,
+            "duration_ms": int((time.perf_counter() - started_at) * 1000),
+            "execution_time": datetime.now()
+        }])
+
+        return {
+            "input": instruction,
+            "output": answer,
+            "rows": output,
+            "intermediate_steps": [],
+            "cached": True,
+            "request_id": request_id
+        }
+
+    def _format_rows(self, prompt: str, instruction: str, sql: str, rows: str) -> str:
+        """캐시된 SQL의 조회 결과(행 목록)를 agent와 같은 답변 규칙으로 정리합니다."""
+        return model_instance.query_by_messages([
+            {"role": "system", "content": prompt},
+            {"role": "system", "content": (
+                "The following SQL query has already been executed for the user's question. "
+                "Do not write or run another query. Answer the question using only these rows, following all the rules above.\n\n"
+                f"### SQL\n{sql}\n\n### Rows\n{rows}"
+            )},
+            {"role": "user", "content": instruction}
+        ])
+
+
+_agents: Dict[Tuple[str, ...], SQLAgent] = {}
+_agents_lock = threading.Lock()
+
+
+def get_sql_agent(allowed_tables: Iterable[str]) -> SQLAgent:
+    """
+    허용 테이블 조합별로 하나의 SQLAgent를 만들어 재사용합니다.
+    """
+    key = tuple(sorted(allowed_tables))
+    agent = _agents.get(key)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(key)
+            if agent is None:
+                agent = SQLAgent(allowed_tables=list(key))
+                _agents[key] = agent
+    return agent
+
+
+def refresh_schema():
+    """
+    생성된 모든 SQLAgent의 스키마 캐시를 갱신합니다. (테이블 구조 변경 후 호출)
+    """
+    for agent in list(_agents.values()):
+        agent.refresh_schema()
+    return len(_agents)
@@ -0,0 +1,108 @@
+from database.sql_agent_log_database import insert_logs
+from langchain_core.callbacks import BaseCallbackHandler
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import atexit
+import queue
+import sys
+import threading
+import time
+
+
+class StepTimingCallbackHandler(BaseCallbackHandler):
+    """
+    SQL agent가 호출한 tool의 실행 시간을 호출 순서대로 기록합니다.
+    intermediate_steps와 같은 순서이므로 step_order로 매칭할 수 있습니다.
+    """
+    def __init__(self):
+        self.durations_ms: List[Optional[int]] = []
+        self._started: Dict[UUID, tuple] = {}
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = (len(self.durations_ms), time.perf_counter())
+        self.durations_ms.append(None)
+
+    def _finish(self, run_id: UUID):
+        started = self._started.pop(run_id, None)
+        if started is not None:
+            index, started_at = started
+            self.durations_ms[index] = int((time.perf_counter() - started_at) * 1000)
+
+    def on_tool_end(self, output: Any, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+    def on_tool_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._finish(run_id)
+
+
+class SqlAgentLogWriter:
+    """
+    SQL agent 단계 로그를 백그라운드 스레드에서 모아 한 번에 저장합니다.
+    write()는 큐에 넣기만 하므로 tool 호출을 막지 않습니다.
+    """
+    def __init__(self, batch_size: int = 50, flush_interval: float = 2.0, max_queue_size: int = 10000):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Dict[str, Any]]" = queue.Queue(maxsize=max_queue_size)
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="sql-agent-log-writer", daemon=True)
+                    self._thread.start()
+
+    def write(self, logs: List[Dict[str, Any]]):
+        self._ensure_started()
+        for log in logs:
+            try:
+                self._queue.put_nowait(log)
+            except queue.Full:
+                print("SQL agent 로그 큐가 가득 차 로그를 버립니다.", file=sys.stderr)
+                return
+
+    def _drain(self, timeout: float) -> List[Dict[str, Any]]:
+        batch = []
+        deadline = time.monotonic() + timeout
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _flush(self, batch: List[Dict[str, Any]]):
+        if not batch:
+            return
+        try:
+            insert_logs(batch)
+        except Exception as e:
+            print(f"SQL agent 로그 저장 오류 ({len(batch)}건): {e}", file=sys.stderr)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._flush(self._drain(self.flush_interval))
+
+    def close(self):
+        """남은 로그를 모두 저장하고 writer를 종료합니다."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.flush_interval + 1)
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        for i in range(0, len(remaining), self.batch_size):
+            self._flush(remaining[i:i + self.batch_size])
+
+
+log_writer = SqlAgentLogWriter()
+atexit.register(log_writer.close)
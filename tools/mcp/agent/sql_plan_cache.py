@@ -0,0 +1,226 @@
+from collections import OrderedDict
+from dataclasses import dataclass
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import re
+import sys
+import threading
+
+# 슬롯 추출 패턴
+_DEPARTMENT_PATTERN = re.compile(r"([가-힣A-Za-z]{2,}(?:학과|학부|전공))")
+_TARGET_YEAR_PATTERN = re.compile(r"([1-6])\s*학년")
+_QUOTED_PATTERN = re.compile(r"[\"'“‘]([^\"'”’]{2,})[\"'”’]")
+_SUBJECT_PATTERN = re.compile(r"([가-힣A-Za-z0-9]{2,})\s*(?:과목|강의|수업)")
+_SUBJECT_STOPWORDS = {"듣는", "많이", "어떤", "무슨", "추천", "관련", "인기", "전공", "교양", "필수", "선택", "우리", "학교", "충남대학교"}
+
+_SQL_LITERAL_PATTERN = re.compile(r"'((?:[^']|'')*)'")
+_SQL_NUMBER_PATTERN = re.compile(r"(?<![\w.:])\d+(?:\.\d+)?(?![\w.])")
+_SQL_LIMIT_PATTERN = re.compile(r"\b(?:LIMIT\s+\d+(?:\s*,\s*\d+)?|OFFSET\s+\d+)", re.IGNORECASE)
+
+
+def extract_slots(instruction: str) -> Dict[str, Any]:
+    """
+    질문에서 학과(department), 학년(target_year), 과목 키워드(subject)를 추출합니다.
+    """
+    slots: Dict[str, Any] = {}
+
+    department = _DEPARTMENT_PATTERN.search(instruction)
+    if department and department.group(1) != "충남대학교":
+        slots["department"] = department.group(1)
+
+    target_year = _TARGET_YEAR_PATTERN.search(instruction)
+    if target_year:
+        slots["target_year"] = int(target_year.group(1))
+
+    subject = _QUOTED_PATTERN.search(instruction)
+    if subject is None:
+        subject = next(
+            (m for m in _SUBJECT_PATTERN.finditer(instruction)
+             if m.group(1) not in _SUBJECT_STOPWORDS and not m.group(1).endswith(("는", "은", "한")) and m.group(1) != slots.get("department")
+             # "3학년 과목"의 "3학년"은 학년 슬롯이므로 과목 키워드가 아님
+             and not _TARGET_YEAR_PATTERN.search(m.group(1))
+             and not (target_year and m.start(1) < target_year.end() and target_year.start() < m.end(1))),
+            None
+        )
+    if subject:
+        slots["subject"] = subject.group(1).strip()
+
+    return slots
+
+
+def normalize_intent(instruction: str, slots: Dict[str, Any]) -> str:
+    """슬롯 값을 자리표시자로 바꾸고 공백/문장부호를 정리한 질문 형태를 반환합니다."""
+    intent = instruction
+    for name, value in slots.items():
+        if name == "target_year":
+            intent = _TARGET_YEAR_PATTERN.sub("{target_year}학년", intent)
+        else:
+            intent = intent.replace(str(value), "{" + name + "}")
+    intent = re.sub(r"[^\w{}가-힣]+", " ", intent)
+    return " ".join(intent.lower().split())
+
+
+@dataclass
+class SQLPlan:
+    sql: str
+    # 바인드 파라미터 이름 -> (슬롯 이름, 접두사, 접미사)  예: '%' + department + '%'
+    params: Dict[str, Tuple[str, str, str]]
+    hits: int = 0
+
+    def bind(self, slots: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            name: slots[slot] if slot == "target_year" else f"{prefix}{slots[slot]}{suffix}"
+            for name, (slot, prefix, suffix) in self.params.items()
+        }
+
+
+class SQLPlanCache:
+    """
+    검증된 SQL 템플릿 캐시입니다.
+
+    - 키: (프롬프트, 정규화된 질문 형태, 슬롯 이름 목록)
+    - SQL agent가 성공적으로 실행한 마지막 쿼리에서 슬롯 값을 바인드 파라미터로 바꿔 저장합니다.
+    - 슬롯에 묶이지 않은 문자열 리터럴(예: '%전기%', IN 목록의 다른 학과명)이나 LIMIT/OFFSET 외의 숫자 리터럴(예: target_year = 4)이
+      남아 있으면 다른 값에 재사용할 수 없으므로 저장하지 않습니다.
+    - 적중하면 LLM이 SQL을 만드는 단계 없이 파라미터화된 SQL을 커넥션 풀에서 바로 실행합니다.
+    """
+    def __init__(self, max_entries: int = 500, max_rows: int = 50):
+        self.max_entries = max_entries
+        self.max_rows = max_rows
+        self._plans: "OrderedDict[Tuple[str, str, Tuple[str, ...]], SQLPlan]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    @staticmethod
+    def _get_key(prompt: str, instruction: str) -> Tuple[Tuple[str, str, Tuple[str, ...]], Dict[str, Any]]:
+        slots = extract_slots(instruction)
+        prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()[:16]
+        return (prompt_hash, normalize_intent(instruction, slots), tuple(sorted(slots))), slots
+
+    def lookup(self, prompt: str, instruction: str) -> Optional[Tuple[SQLPlan, Dict[str, Any]]]:
+        key, slots = self._get_key(prompt, instruction)
+        with self._lock:
+            plan = self._plans.get(key)
+            if plan is None:
+                self._misses += 1
+                return None
+            self._plans.move_to_end(key)
+            plan.hits += 1
+            self._hits += 1
+        return plan, plan.bind(slots)
+
+    def execute(self, engine: Engine, plan: SQLPlan, params: Dict[str, Any]) -> Optional[str]:
+        """캐시된 SQL을 실행해 결과 문자열을 반환합니다. 결과가 없으면 None을 반환합니다."""
+        with engine.connect() as connection:
+            result = connection.execute(text(plan.sql), params)
+            columns = list(result.keys())
+            rows = result.fetchmany(self.max_rows)
+
+        if not rows:
+            return None
+
+        lines = [" | ".join(columns)]
+        lines += [" | ".join("" if value is None else str(value) for value in row) for row in rows]
+        return "\n".join(lines)
+
+    def discard(self, prompt: str, instruction: str):
+        key, _ = self._get_key(prompt, instruction)
+        with self._lock:
+            self._plans.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._plans.clear()
+
+    def learn(self, prompt: str, instruction: str, intermediate_steps: List[Any]):
+        """SQL agent의 중간 단계에서 성공한 쿼리를 찾아 템플릿으로 저장합니다."""
+        key, slots = self._get_key(prompt, instruction)
+        if not slots:
+            return
+
+        sql = _find_successful_query(intermediate_steps)
+        if sql is None:
+            return
+
+        plan = _parameterize(sql, slots)
+        if plan is None:
+            return
+
+        with self._lock:
+            self._plans[key] = plan
+            self._plans.move_to_end(key)
+            while len(self._plans) > self.max_entries:
+                self._plans.popitem(last=False)
+        print(f"SQL 템플릿 저장: {key[1]} -> {plan.sql}", file=sys.stderr)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        total = self._hits + self._misses
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / total if total else 0.0,
+            "entries": len(self._plans),
+        }
+
+
+def _find_successful_query(intermediate_steps: List[Any]) -> Optional[str]:
+    """마지막으로 실행되어 결과를 반환한 SELECT 쿼리를 찾습니다."""
+    for action, observation in reversed(intermediate_steps or []):
+        if getattr(action, "tool", None) != "sql_db_query":
+            continue
+        tool_input = getattr(action, "tool_input", None)
+        sql = tool_input.get("query") if isinstance(tool_input, dict) else tool_input
+        output = str(observation or "").strip()
+        if not sql or not output or output.startswith("Error") or output in ("[]", "()"):
+            continue
+        return sql
+    return None
+
+
+def _parameterize(sql: str, slots: Dict[str, Any]) -> Optional[SQLPlan]:
+    """SQL의 슬롯 값 리터럴을 바인드 파라미터로 바꿉니다. 안전하게 바꿀 수 없으면 None을 반환합니다."""
+    sql = sql.strip().rstrip(";").strip()
+    if not sql.lower().startswith("select") or ";" in sql or ":" in sql:
+        return None
+
+    params: Dict[str, Tuple[str, str, str]] = {}
+    unresolved = set(slot for slot in slots if slot != "target_year")
+
+    def replace_literal(match: re.Match) -> str:
+        literal = match.group(1).replace("''", "'")
+        for slot in ("department", "subject"):
+            value = slots.get(slot)
+            if value and value in literal:
+                prefix, suffix = literal.split(value, 1)
+                if value in suffix:
+                    break
+                name = f"{slot}_{len(params)}"
+                params[name] = (slot, prefix, suffix)
+                unresolved.discard(slot)
+                return f":{name}"
+        return match.group(0)
+
+    template = _SQL_LITERAL_PATTERN.sub(replace_literal, sql)
+
+    if "target_year" in slots:
+        template, count = re.subn(rf"(target_year\s*=\s*)'?{slots['target_year']}'?(?!\d)", r"\1:target_year", template)
+        if count == 0:
+            return None
+        params["target_year"] = ("target_year", "", "")
+
+    if unresolved:
+        return None
+
+    # 슬롯에 묶이지 않은 문자열 리터럴이 남아 있으면 다른 값에 재사용할 수 없음
+    # (예: '%전기%' 같은 슬롯 값 조각, search_keywords로 찾은 IN ('전기공학과', '전기전자공학과')의 나머지 값)
+    if _SQL_LITERAL_PATTERN.search(template):
+        return None
+
+    # 숫자 리터럴도 마찬가지 (예: "(target_year = 3 OR target_year = 4)"의 4는 다른 학년 질문에도 그대로 남음)
+    if _SQL_NUMBER_PATTERN.search(_SQL_LIMIT_PATTERN.sub(" ", template)):
+        return None
+
+    return SQLPlan(sql=template, params=params)
@@ -0,0 +1,132 @@
+from database.database_connector import get_engine
+from search_index import NgramIndex
+from sqlalchemy import text
+from typing import Any, Dict, List, Optional, Tuple
+import sys
+import threading
+import time
+
+# 키워드 색인 대상 테이블
+INDEXED_TABLES = ("syllabus", "course_registration_info", "kocw_lecture")
+
+# 과목명/학과명 컬럼 후보 (테이블마다 실제 존재하는 첫 번째 컬럼을 사용)
+SUBJECT_COLUMN_CANDIDATES = ("subject_name", "course_name", "lecture_name", "name")
+DEPARTMENT_COLUMN_CANDIDATES = ("department", "department_name")
+
+
+class CourseKeywordIndex:
+    """
+    과목명/학과명 키워드 검색용 인메모리 n-gram 색인입니다.
+
+    LLM이 '%인간%', '%컴퓨터%'처럼 leading wildcard LIKE 조각으로 테이블을 훑는 대신,
+    이 색인에서 실제 저장된 과목명/학과명을 한 번에 찾아 = / IN 조건으로 조회할 수 있게 합니다.
+    테이블의 DISTINCT 값만 색인하며 refresh_interval마다 다시 읽어옵니다.
+    """
+    def __init__(self, tables: Tuple[str, ...] = INDEXED_TABLES, refresh_interval: float = 3600):
+        self.tables = tables
+        self.refresh_interval = refresh_interval
+        self._indexes: Dict[Tuple[str, str], NgramIndex] = {}
+        self._columns: Dict[Tuple[str, str], str] = {}
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+        # 동시에 들어온 첫 요청들이 각자 색인을 만들지 않도록 갱신은 한 번에 하나만 실행
+        self._refresh_lock = threading.Lock()
+
+    def _find_columns(self, connection) -> Dict[Tuple[str, str], str]:
+        rows = connection.execute(text("""
+            SELECT TABLE_NAME, COLUMN_NAME FROM information_schema.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+        """)).fetchall()
+        existing = {(row[0], row[1]) for row in rows}
+
+        columns = {}
+        for table in self.tables:
+            for field, candidates in (("subject", SUBJECT_COLUMN_CANDIDATES), ("department", DEPARTMENT_COLUMN_CANDIDATES)):
+                column = next((c for c in candidates if (table, c) in existing), None)
+                if column:
+                    columns[(table, field)] = column
+        return columns
+
+    def refresh(self):
+        """테이블에서 과목명/학과명을 다시 읽어 색인을 만듭니다."""
+        indexes = {}
+        with get_engine().connect() as connection:
+            columns = self._find_columns(connection)
+            for (table, field), column in columns.items():
+                # 테이블/컬럼명은 information_schema에서 확인된 값만 사용
+                values = connection.execute(text(
+                    f"SELECT DISTINCT `{column}` FROM `{table}` WHERE `{column}` IS NOT NULL AND `{column}` <> ''"
+                )).scalars().all()
+                indexes[(table, field)] = NgramIndex.build((value, value) for value in values)
+
+        with self._lock:
+            self._indexes = indexes
+            self._columns = columns
+            self._loaded_at = time.monotonic()
+        print(f"키워드 색인 갱신: {[(key, len(index)) for key, index in indexes.items()]}", file=sys.stderr)
+
+    def _is_fresh(self) -> bool:
+        return bool(self._indexes) and time.monotonic() - self._loaded_at < self.refresh_interval
+
+    def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+
+        if self._indexes:
+            # 기존 색인이 있으면 다른 요청이 갱신 중일 때 기다리지 않고 기존 색인을 사용
+            if not self._refresh_lock.acquire(blocking=False):
+                return
+        else:
+            self._refresh_lock.acquire()
+
+        try:
+            # lock을 기다리는 동안 다른 요청이 이미 갱신했을 수 있음
+            if self._is_fresh():
+                return
+            self.refresh()
+        except Exception as e:
+            # 갱신에 실패하면 기존 색인을 계속 사용
+            print(f"키워드 색인 갱신 오류: {e}", file=sys.stderr)
+            if not self._indexes:
+                raise
+        finally:
+            self._refresh_lock.release()
+
+    def search(self, keyword: str, tables: Optional[List[str]] = None, field: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        키워드와 비슷한 과목명/학과명을 찾습니다.
+        :param keyword: 검색어 (예: "인간컴퓨터상호작용", "컴퓨터융합")
+        :param tables: 검색할 테이블 목록 (없으면 전체)
+        :param field: "subject" 또는 "department" (없으면 둘 다)
+        :return: table, field, column, value, score를 가진 dict 목록 (점수 내림차순)
+        """
+        self._ensure_loaded()
+        results = []
+        for (table, index_field), index in self._indexes.items():
+            if tables and table not in tables:
+                continue
+            if field and index_field != field:
+                continue
+            for score, value in index.search(keyword, limit=limit):
+                results.append({
+                    "table": table,
+                    "field": index_field,
+                    "column": self._columns[(table, index_field)],
+                    "value": value,
+                    "score": score
+                })
+        results.sort(key=lambda item: -item["score"])
+        return results[:limit]
+
+
+keyword_index = CourseKeywordIndex()
+
+
+def format_keyword_results(results: List[Dict[str, Any]]) -> str:
+    """검색 결과를 agent가 SQL 작성에 바로 쓸 수 있는 형태로 변환합니다."""
+    if not results:
+        return "No matching values. Fall back to LIKE with core keywords."
+    return "\n".join(
+        f"{item['table']}.{item['column']} = '{item['value']}' (score {item['score']})"
+        for item in results
+    )
@@ -1,5 +1,9 @@
 import mysql.connector
 import json,os
+import threading
+from typing import Optional
+from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine
 
 class DatabaseConnector:
     def __init__(self):
@@ -37,4 +41,31 @@ class DatabaseConnector:
         if hasattr(self, 'connection'):
             self.connection.close()
 
+_engine: Optional[Engine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> Engine:
+    """
+    SQLAgent, 로그 writer 등이 공유하는 SQLAlchemy 엔진을 반환합니다. (커넥션 풀 재사용)
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                with open("database/database_config.json", 'r', encoding='utf-8') as f:
+                    config = json.load(f)
+                db_config = config['database']
+
+                _engine = create_engine(
+                    f"mysql+mysqlconnector://{db_config['user']}:{db_config['password']}@{db_config['host']}:{db_config['port']}/{db_config['name']}",
+                    pool_size=db_config.get('pool_size', 5),
+                    max_overflow=db_config.get('pool_max_overflow', 5),
+                    pool_recycle=db_config.get('pool_recycle', 3600),
+                    # 유휴 상태에서 끊긴 연결을 사용 전에 감지
+                    pool_pre_ping=True
+                )
+    return _engine
+
+
 instance = DatabaseConnector()
\ No newline at end of file
@@ -0,0 +1,17 @@
+-- SQL agent 단계 로그 테이블
+-- 배포 전에 한 번 실행합니다. (애플리케이션은 런타임에 DDL을 실행하지 않음)
+--   mysql -h <host> -u <user> -p <database> < tools/mcp/database/migrations/001_create_sql_agent_log.sql
+CREATE TABLE IF NOT EXISTS sql_agent_log (
+    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+    instruction TEXT NOT NULL,
+    tool_name VARCHAR(100) NOT NULL,
+    tool_input MEDIUMTEXT NOT NULL,
+    tool_output MEDIUMTEXT NOT NULL,
+    step_order INT NOT NULL,
+    request_id VARCHAR(64) NULL,
+    duration_ms INT NULL,
+    execution_time DATETIME NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    INDEX idx_sql_agent_log_request_id (request_id),
+    INDEX idx_sql_agent_log_tool_name (tool_name)
+);
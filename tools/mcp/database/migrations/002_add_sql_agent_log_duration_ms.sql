@@ -0,0 +1,5 @@
+-- 단계별 소요 시간(duration_ms) 컬럼 추가
+-- 001 이전 스키마로 이미 만들어진 sql_agent_log 테이블에만 한 번 실행합니다.
+-- (001로 새로 만든 테이블에는 이미 컬럼이 있으므로 실행하지 않음)
+--   mysql -h <host> -u <user> -p <database> < tools/mcp/database/migrations/002_add_sql_agent_log_duration_ms.sql
+ALTER TABLE sql_agent_log ADD COLUMN duration_ms INT NULL AFTER request_id;
@@ -0,0 +1,50 @@
+from database.database_connector import get_engine
+from sqlalchemy import text
+from typing import Any, Dict, List
+
+# sql_agent_log 스키마는 database/migrations/*.sql로 배포 전에 적용합니다. (런타임에는 DDL을 실행하지 않음)
+
+
+def insert_logs(logs: List[Dict[str, Any]]):
+    """
+    SQL agent 단계 로그를 한 번에 저장합니다.
+    :param logs: instruction, tool_name, tool_input, tool_output, step_order, request_id, duration_ms, execution_time 키를 가진 dict 목록
+    """
+    if not logs:
+        return
+
+    with get_engine().begin() as connection:
+        connection.execute(text("""
+            INSERT INTO sql_agent_log
+                (instruction, tool_name, tool_input, tool_output, step_order, request_id, duration_ms, execution_time)
+            VALUES
+                (:instruction, :tool_name, :tool_input, :tool_output, :step_order, :request_id, :duration_ms, :execution_time)
+        """), logs)
+
+
+def _get_query_stats(order_by: str, limit: int) -> List[Dict[str, Any]]:
+    with get_engine().connect() as connection:
+        rows = connection.execute(text(f"""
+            SELECT
+                ANY_VALUE(tool_input) AS query,
+                COUNT(*) AS executions,
+                ROUND(AVG(duration_ms)) AS avg_duration_ms,
+                MAX(duration_ms) AS max_duration_ms,
+                MAX(created_at) AS last_executed_at
+            FROM sql_agent_log
+            WHERE tool_name = 'sql_db_query'
+            GROUP BY MD5(tool_input)
+            ORDER BY {order_by}
+            LIMIT :limit
+        """), {"limit": limit}).mappings().all()
+    return [dict(row) for row in rows]
+
+
+def get_slowest_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """평균 실행 시간이 가장 긴 SQL agent 생성 쿼리를 조회합니다."""
+    return _get_query_stats("avg_duration_ms DESC", limit)
+
+
+def get_most_repeated_queries(limit: int = 20) -> List[Dict[str, Any]]:
+    """가장 자주 실행된 SQL agent 생성 쿼리를 조회합니다."""
+    return _get_query_stats("executions DESC", limit)
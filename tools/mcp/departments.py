@@ -1,4 +1,5 @@
 from database.department_database import DepartmentsDatabase
+from search_index import DepartmentResolver
 
 class Departments:
     def __init__(self):
@@ -17,4 +18,24 @@ class Departments:
 
     @property
     def college_department_pairs(self):
-        return self._college_department_pairs
\ No newline at end of file
+        return self._college_department_pairs
+
+
+def _load_college_department_pairs():
+    return DepartmentsDatabase().readAll()
+
+
+# 학과명 정규화 resolver (MCP 서버 프로세스에서 공유, 1시간마다 갱신)
+department_resolver = DepartmentResolver(loader=_load_college_department_pairs)
+
+
+def annotate_departments(instruction: str) -> str:
+    """
+    질문에 포함된 학과명 표현을 정식 학과명으로 확인해 덧붙입니다.
+    agent가 비슷한 학과명을 찾느라 턴을 소모하지 않고 바로 = 조건으로 조회할 수 있습니다.
+    """
+    mentions = department_resolver.find_mentions(instruction)
+    if not mentions:
+        return instruction
+    resolved = ", ".join(f"'{mention}' -> '{department}'" for mention, department in mentions.items())
+    return f"{instruction}\n\n(Resolved department names: {resolved}. Use these exact department names.)"
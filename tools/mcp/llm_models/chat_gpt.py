@@ -1,26 +1,125 @@
 from langchain_openai import ChatOpenAI
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
-from typing import List, Dict, Any
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, AIMessage
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from pydantic import Field
+from typing import Any, Callable, Dict, List, Optional
 import json, os
+import threading
+import tiktoken
+
+# 현재 컨텍스트가 이미 admission을 통과했는지 여부 (같은 호출을 두 번 admission하지 않도록)
+_admitted: ContextVar[bool] = ContextVar("chat_gpt_admitted", default=False)
+
+
+class AdmittedChatOpenAI(ChatOpenAI):
+    """
+    모든 비동기 생성/스트리밍 호출이 admission 훅을 거치는 ChatOpenAI입니다.
+    ReAct agent처럼 모델을 직접 호출하는 경우에도 동시 실행 수/분당 토큰 제한이 적용됩니다.
+    """
+    admission: Optional[Callable[[List[BaseMessage]], Any]] = Field(default=None, exclude=True)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any):
+        async with self.admission(messages):
+            return await super()._agenerate(messages, stop=stop, run_manager=run_manager, **kwargs)
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None, **kwargs: Any):
+        async with self.admission(messages):
+            async for chunk in super()._astream(messages, stop=stop, run_manager=run_manager, **kwargs):
+                yield chunk
+
 
 class ChatGPTModel:
     """
     ChatGPT API를 사용하기 위한 모델 클래스
+    클라이언트와 토크나이저는 처음 사용할 때(또는 warm_up()에서) 생성합니다.
     """
     def __init__(self, model: str = "gpt-4o-mini"):
-        base_dir = os.path.dirname(os.path.abspath(__file__))  # chat_gpt.py의 경로 기준
-        config_path = os.path.join(base_dir, "llm_config.json")
+        self.model_name = model
+        self._model: Optional[ChatOpenAI] = None
+        self._encoding = None
+        self._lock = threading.Lock()
         
-        with open(config_path) as f:
-            llm_config = json.load(f)
-            
-        self.model = ChatOpenAI(model=model, 
-                            temperature=0,
-                            api_key=llm_config["OPENAI_API_KEY"])
+        # 비동기 호출 전에 거치는 admission 훅 (토큰 수 -> async context manager). 없으면 제한 없이 호출
+        self.admission: Optional[Callable[[int], Any]] = None
+        # 응답 토큰 수 추정치 (요청 토큰 수와 합산해 rate limit에 사용)
+        self.expected_completion_tokens = int(os.getenv("OPENAI_EXPECTED_COMPLETION_TOKENS", "500"))
+    
+    @property
+    def model(self) -> ChatOpenAI:
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    base_dir = os.path.dirname(os.path.abspath(__file__))  # chat_gpt.py의 경로 기준
+                    config_path = os.path.join(base_dir, "llm_config.json")
+                    
+                    with open(config_path) as f:
+                        llm_config = json.load(f)
+                    
+                    self._model = AdmittedChatOpenAI(model=self.model_name, 
+                                        temperature=0,
+                                        api_key=llm_config["OPENAI_API_KEY"],
+                                        admission=self._admit_messages)
+        return self._model
+    
+    @property
+    def encoding(self):
+        # tiktoken 인코딩 파일 로드는 최초 1회만 수행
+        if self._encoding is None:
+            with self._lock:
+                if self._encoding is None:
+                    try:
+                        self._encoding = tiktoken.encoding_for_model(self.model_name)
+                    except KeyError:
+                        self._encoding = tiktoken.get_encoding("o200k_base")
+        return self._encoding
+    
+    def warm_up(self):
+        """
+        API 클라이언트와 토크나이저를 미리 생성합니다. (API 호출은 하지 않음)
+        """
+        self.get_model()
+        self.count_tokens("")
     
     def get_model(self):
         return self.model
     
+    def set_admission(self, admission: Optional[Callable[[int], Any]]):
+        """
+        비동기 호출의 동시 실행 수/토큰 사용량을 제한하는 훅을 설정합니다.
+        admission(tokens)는 async with로 사용할 수 있는 context manager를 반환해야 합니다.
+        """
+        self.admission = admission
+    
+    @asynccontextmanager
+    async def _admit(self, prompt_tokens: int):
+        if self.admission is None or _admitted.get():
+            yield
+            return
+        async with self.admission(prompt_tokens + self.expected_completion_tokens):
+            # 스트리밍 generator는 다른 컨텍스트에서 닫힐 수 있으므로 reset 대신 값을 되돌림
+            _admitted.set(True)
+            try:
+                yield
+            finally:
+                _admitted.set(False)
+    
+    def _admit_messages(self, messages: List[BaseMessage]):
+        # 모델 직접 호출(ReAct agent 등)용. 이 클래스의 메서드에서 이미 admission을 통과했다면 그대로 통과
+        return self._admit(sum(self.count_tokens(str(message.content)) + 4 for message in messages))
+    
+    def count_tokens(self, text: str) -> int:
+        """
+        텍스트의 토큰 수를 계산합니다.
+        """
+        return len(self.encoding.encode(text or ""))
+    
+    def count_message_tokens(self, messages: List[Dict[str, Any]]) -> int:
+        """
+        메시지 리스트의 토큰 수를 계산합니다. (메시지당 role 등 부가 토큰 4개 포함)
+        """
+        return sum(self.count_tokens(msg.get("content", "")) + 4 for msg in messages)
+    
     def query_by_single_instruction(self, instruction: str) -> str:
         """
         ChatGPT에 단순 질의를 수행합니다.
@@ -33,24 +132,46 @@ class ChatGPTModel:
         except Exception as e:
             raise Exception(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
         
+    async def aquery_by_single_instruction(self, instruction: str) -> str:
+        """
+        ChatGPT에 단순 질의를 비동기로 수행합니다. (이벤트 루프를 막지 않음)
+        """
+        
+        # admission 거절(대기열 초과)은 호출자가 구분할 수 있도록 감싸지 않고 그대로 전달
+        async with self._admit(self.count_tokens(instruction)):
+            try:
+                response = await self.model.ainvoke([instruction])
+                print("🤖 GPT RESPONSE(SINGLE_INSTRUCTION):",response.content)
+                return response.content
+            except Exception as e:
+                raise Exception(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
+    
+    def _to_langchain_messages(self, messages: List[Dict[str, Any]]) -> list:
+        """
+        Dict 형태의 메시지들을 LangChain Message 객체로 변환합니다.
+        """
+        langchain_messages = []
+        
+        for msg in messages:
+            role = msg.get("role", "")
+            content = msg.get("content", "")
+            
+            if role == "system":
+                langchain_messages.append(SystemMessage(content=content))
+            elif role == "user":
+                langchain_messages.append(HumanMessage(content=content))
+            elif role == "assistant":
+                langchain_messages.append(AIMessage(content=content))
+        
+        return langchain_messages
+        
     def query_by_messages(self, messages: List[Dict[str, Any]]) -> str:
         """
         ChatGPT에 메시지 리스트로 질의를 수행합니다.
         """
         try:
             # Dict 형태의 메시지들을 LangChain Message 객체로 변환
-            langchain_messages = []
-            
-            for msg in messages:
-                role = msg.get("role", "")
-                content = msg.get("content", "")
-                
-                if role == "system":
-                    langchain_messages.append(SystemMessage(content=content))
-                elif role == "user":
-                    langchain_messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    langchain_messages.append(AIMessage(content=content))
+            langchain_messages = self._to_langchain_messages(messages)
             
             # 변환된 메시지 리스트를 invoke에 전달 (리스트로 감싸지 않음!)
             response = self.model.invoke(langchain_messages)
@@ -61,33 +182,37 @@ class ChatGPTModel:
             
         except Exception as e:
             raise Exception(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
+    
+    async def aquery_by_messages(self, messages: List[Dict[str, Any]]) -> str:
+        """
+        ChatGPT에 메시지 리스트로 비동기 질의를 수행합니다. (이벤트 루프를 막지 않음)
+        """
+        async with self._admit(self.count_message_tokens(messages)):
+            try:
+                response = await self.model.ainvoke(self._to_langchain_messages(messages))
+                
+                print("🤖 GPT RESPONSE(MESSAGES):",response.content)
+                
+                return response.content
+                
+            except Exception as e:
+                raise Exception(f"ChatGPT API 호출 중 오류 발생: {str(e)}")
 
     async def stream_query_by_messages(self, messages: List[Dict[str, Any]]) -> str:
         """
         ChatGPT에 메시지 리스트로 질의를 수행합니다.
         """
-        try:
-            # Dict 형태의 메시지들을 LangChain Message 객체로 변환
-            langchain_messages = []
+        async with self._admit(self.count_message_tokens(messages)):
+            try:
+                # Dict 형태의 메시지들을 LangChain Message 객체로 변환
+                langchain_messages = self._to_langchain_messages(messages)
             
-            for msg in messages:
-                role = msg.get("role", "")
-                content = msg.get("content", "")
+                async for chunk in self.model.astream(langchain_messages):
+                    # chunk는 AIMessageChunk이며 .content 또는 .text 사용 가능
+                    # 부분 토큰만 포함될 수 있으므로 누적은 호출자 측에서 수행
+                    yield chunk
                 
-                if role == "system":
-                    langchain_messages.append(SystemMessage(content=content))
-                elif role == "user":
-                    langchain_messages.append(HumanMessage(content=content))
-                elif role == "assistant":
-                    langchain_messages.append(AIMessage(content=content))
-            
-        
-            async for chunk in self.model.astream(langchain_messages):
-                # chunk는 AIMessageChunk이며 .content 또는 .text 사용 가능
-                # 부분 토큰만 포함될 수 있으므로 누적은 호출자 측에서 수행
-                yield chunk
-            
-        except Exception as e:
-            raise Exception(f"ChatGPT API 스트리밍 중 오류 발생: {str(e)}")
+            except Exception as e:
+                raise Exception(f"ChatGPT API 스트리밍 중 오류 발생: {str(e)}")
         
 model_instance = ChatGPTModel()
\ No newline at end of file
@@ -8,6 +8,9 @@ class MCPServerManager:
         self.global_mcp_server_configs = {}
         self.groups = {}
         
+        # 그룹 구성이나 서버 프로세스가 바뀔 때마다 증가 (클라이언트 설정 ETag에 포함)
+        self.config_version = 0
+        
         # 기본 그룹 생성
         self.groups["default"] = {"mcp_server_configs": {}}
         
@@ -52,17 +55,19 @@ class MCPServerManager:
     def delete_group(self, group_name: str):
         if group_name != "default":
             self.groups.pop(group_name, None)
+            self.config_version += 1
 
     def add_mcp_server_to_group(self, group_name: str, server_name: str):
         if group_name in self.groups and server_name in self.global_mcp_server_configs:
             self.groups[group_name]["mcp_server_configs"][server_name] = self.global_mcp_server_configs[server_name].copy()
-            
+            self.config_version += 1
             
             print(f"MCP 서버 '{server_name}'가 그룹 '{group_name}'에 추가되었습니다.")
 
     def remove_mcp_server_from_group(self, group_name: str, server_name: str):
         if group_name in self.groups:
             self.groups[group_name]["mcp_server_configs"].pop(server_name, None)
+            self.config_version += 1
 
     def get_mcp_server_configs(self, group_name: str = "default") -> dict:
         return self.groups.get(group_name, {"mcp_server_configs": {}})["mcp_server_configs"]
@@ -187,6 +192,9 @@ class MCPServerManager:
             # 서버가 정상적으로 시작되었는지 확인
             print(f"{server_name} MCP 서버가 백그라운드에서 실행되었습니다. (PID: {process.pid})")
             
+            # 프로세스가 재시작되면 기존 SSE 세션이 끊어지므로 클라이언트가 재연결하도록 버전 증가
+            self.config_version += 1
+            
             # 실시간 로그 출력
             import threading
             def stream_output(pipe, prefix):
@@ -1,8 +1,10 @@
-from fastapi import FastAPI, Query
+from fastapi import FastAPI, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from typing import Optional
+import asyncio, hashlib, json
 import uvicorn
 from mcp_server_manager import mcp_manager
+from database.sql_agent_log_database import get_slowest_queries, get_most_repeated_queries
 
 from models import (
     HttpResponse
@@ -10,6 +12,9 @@ from models import (
 
 app = FastAPI(title="MCP Server API", version="1.0.0", port=8888)
 
+# 클라이언트 설정 변경 long-poll 시 버전 확인 주기(초)
+CLIENT_CONFIG_WATCH_INTERVAL_SECONDS = 0.5
+
 # CORS 설정
 app.add_middleware(
     CORSMiddleware,
@@ -87,26 +92,45 @@ async def run_mcp_server(group_name: str, server_name: str):
             item=None
         )
 
+def _get_serialized_client_config() -> tuple:
+    """
+    Multi Server MCP 클라이언트 설정을 직렬화하고, 설정 내용과 버전으로 만든 ETag를 함께 반환합니다.
+    """
+    client_config = mcp_manager.get_multi_server_mcp_clients()
+    
+    # 클라이언트 설정을 직렬화 가능한 형태로 변환
+    serialized_config = {}
+    for key, value in client_config.items():
+        if hasattr(value, '__dict__'):
+            # 객체인 경우 딕셔너리로 변환
+            serialized_config[key] = vars(value)
+        else:
+            serialized_config[key] = value
+    
+    digest = hashlib.sha256(
+        json.dumps(serialized_config, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    ).hexdigest()[:16]
+    etag = f'"{mcp_manager.config_version}-{digest}"'
+    
+    return serialized_config, etag
+
 @app.get("/api/multi-server-mcp-clients", response_model=HttpResponse)
-async def get_multi_server_mcp_clients():
-    """Multi Server MCP 클라이언트 설정을 가져옵니다."""
+async def get_multi_server_mcp_clients(request: Request, response: Response):
+    """Multi Server MCP 클라이언트 설정을 가져옵니다. If-None-Match가 현재 버전과 같으면 304를 반환합니다."""
     try:
-        client_config = mcp_manager.get_multi_server_mcp_clients()
+        serialized_config, etag = _get_serialized_client_config()
+        
+        if request.headers.get("if-none-match") == etag:
+            return Response(status_code=304, headers={"ETag": etag})
         
-        # 클라이언트 설정을 직렬화 가능한 형태로 변환
-        serialized_config = {}
-        for key, value in client_config.items():
-            if hasattr(value, '__dict__'):
-                # 객체인 경우 딕셔너리로 변환
-                serialized_config[key] = vars(value)
-            else:
-                serialized_config[key] = value
+        response.headers["ETag"] = etag
         
         return HttpResponse(
             status=200,
             message="Multi Server MCP 클라이언트 설정을 성공적으로 조회했습니다.",
             item={
-                "client_config": serialized_config
+                "client_config": serialized_config,
+                "version": etag
             }
         )
     except Exception as e:
@@ -116,6 +140,57 @@ async def get_multi_server_mcp_clients():
             item=None
         )
 
+@app.get("/api/multi-server-mcp-clients/watch", response_model=HttpResponse)
+async def watch_multi_server_mcp_clients(
+    version: Optional[str] = Query(None, description="클라이언트가 캐시하고 있는 설정 버전"),
+    timeout: float = Query(30, ge=0, le=60, description="최대 대기 시간(초)")
+):
+    """설정 버전이 주어진 version과 달라지거나 timeout이 지날 때까지 대기한 후 현재 설정을 반환합니다. (long-poll)"""
+    try:
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        
+        serialized_config, etag = _get_serialized_client_config()
+        while etag == version and loop.time() < deadline:
+            await asyncio.sleep(CLIENT_CONFIG_WATCH_INTERVAL_SECONDS)
+            serialized_config, etag = _get_serialized_client_config()
+        
+        return HttpResponse(
+            status=200,
+            message="Multi Server MCP 클라이언트 설정을 성공적으로 조회했습니다.",
+            item={
+                "client_config": serialized_config,
+                "version": etag,
+                "changed": etag != version
+            }
+        )
+    except Exception as e:
+        return HttpResponse(
+            status=500,
+            message=f"클라이언트 설정 변경 대기 실패: {str(e)}",
+            item=None
+        )
+
+@app.get("/api/sql-agent-logs-db/stats", response_model=HttpResponse)
+async def get_sql_agent_log_stats(limit: int = Query(20, ge=1, le=100, description="조회할 쿼리 수")):
+    """SQL agent가 생성한 쿼리 중 가장 느린 쿼리와 가장 자주 실행된 쿼리를 조회합니다. (인덱스/캐시 대상 선정용)"""
+    try:
+        slowest, most_repeated = await asyncio.gather(
+            asyncio.to_thread(get_slowest_queries, limit),
+            asyncio.to_thread(get_most_repeated_queries, limit)
+        )
+        return HttpResponse(
+            status=200,
+            message="SQL agent 쿼리 통계를 조회했습니다.",
+            item=json.loads(json.dumps({"slowest": slowest, "most_repeated": most_repeated}, default=str))
+        )
+    except Exception as e:
+        return HttpResponse(
+            status=500,
+            message=f"SQL agent 쿼리 통계 조회 실패: {str(e)}",
+            item=None
+        )
+
 @app.get("/health", response_model=HttpResponse)
 async def health_check():
     """헬스 체크 엔드포인트"""
@@ -0,0 +1,288 @@
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+import re
+import sys
+import threading
+import time
+
+_NON_WORD_PATTERN = re.compile(r"[^0-9a-z가-힣]+")
+
+
+def normalize(text: str) -> str:
+    """소문자로 바꾸고 공백/문장부호를 제거합니다. ("인간-컴퓨터 상호작용" -> "인간컴퓨터상호작용")"""
+    return _NON_WORD_PATTERN.sub("", (text or "").lower())
+
+
+def char_ngrams(text: str, n: int = 2) -> Set[str]:
+    """
+    정규화된 문자열의 문자 n-gram 집합을 반환합니다.
+    한국어는 띄어쓰기/조사와 관계없이 음절 bigram이 잘 겹치므로 형태소 분석 없이도 부분 일치를 찾을 수 있습니다.
+    """
+    normalized = normalize(text)
+    if len(normalized) < n:
+        return {normalized} if normalized else set()
+    return {normalized[i:i + n] for i in range(len(normalized) - n + 1)}
+
+
+class NgramIndex:
+    """
+    문자 n-gram 역색인입니다.
+
+    - 질의의 n-gram을 하나라도 공유하는 문서만 후보로 모은 뒤 Dice 계수로 점수를 매깁니다.
+    - 정규화된 질의가 문서에 그대로 포함되거나(부분 문자열) 완전히 같으면 가산점을 줍니다.
+    """
+    def __init__(self, n: int = 2):
+        self.n = n
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._grams: List[Set[str]] = []
+        self._texts: List[str] = []
+        self._payloads: List[Any] = []
+
+    def __len__(self) -> int:
+        return len(self._payloads)
+
+    def add(self, text: str, payload: Any = None) -> int:
+        doc_id = len(self._payloads)
+        grams = char_ngrams(text, self.n)
+        self._grams.append(grams)
+        self._texts.append(normalize(text))
+        self._payloads.append(text if payload is None else payload)
+        for gram in grams:
+            self._postings[gram].add(doc_id)
+        return doc_id
+
+    @classmethod
+    def build(cls, items: Iterable[Tuple[str, Any]], n: int = 2) -> "NgramIndex":
+        index = cls(n=n)
+        for text, payload in items:
+            index.add(text, payload)
+        return index
+
+    def search(self, query: str, limit: int = 10, min_score: float = 0.3) -> List[Tuple[float, Any]]:
+        """질의와 비슷한 문서를 (점수, payload) 목록으로 점수 내림차순 반환합니다."""
+        query_grams = char_ngrams(query, self.n)
+        if not query_grams:
+            return []
+        normalized_query = normalize(query)
+
+        candidates: Dict[int, int] = defaultdict(int)
+        for gram in query_grams:
+            for doc_id in self._postings.get(gram, ()):
+                candidates[doc_id] += 1
+
+        results = []
+        for doc_id, overlap in candidates.items():
+            score = 2 * overlap / (len(query_grams) + len(self._grams[doc_id]))
+            text = self._texts[doc_id]
+            if text == normalized_query:
+                score += 1.0
+            elif normalized_query in text or text in normalized_query:
+                score += 0.5
+            if score >= min_score:
+                results.append((score, doc_id))
+
+        results.sort(key=lambda item: (-item[0], len(self._texts[item[1]])))
+        return [(round(score, 4), self._payloads[doc_id]) for score, doc_id in results[:limit]]
+
+    def get(self, query: str) -> Optional[Any]:
+        """가장 점수가 높은 문서의 payload를 반환합니다."""
+        results = self.search(query, limit=1)
+        return results[0][1] if results else None
+
+
+def levenshtein(a: str, b: str) -> int:
+    """두 문자열의 편집 거리를 계산합니다."""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b)
+            ))
+        previous = current
+    return previous[-1]
+
+
+# 학과명 뒤에 붙는 접미사 (짧은 이름/별칭 생성에 사용)
+DEPARTMENT_SUFFIXES = ("학과", "학부", "전공", "과")
+
+# 자주 쓰이는 줄임말 -> 색인 검색어
+DEFAULT_DEPARTMENT_ALIASES = {
+    "컴공": "컴퓨터공학",
+    "전전": "전기전자",
+    "기계과": "기계공학",
+    "전자과": "전자공학",
+    "건축과": "건축",
+    "경영과": "경영",
+    "국문과": "국어국문",
+    "영문과": "영어영문",
+}
+
+_DEPARTMENT_MENTION_PATTERN = re.compile(r"[가-힣A-Za-z]{2,}(?:학과|학부|전공|과)")
+
+
+class DepartmentResolver:
+    """
+    학과명을 결정적으로 정규화(canonicalize)하는 인메모리 resolver입니다.
+
+    - 정확히 일치하는 이름과 접미사를 뗀 짧은 이름("컴퓨터융합")은 dict 조회로 바로 찾습니다.
+    - 줄임말은 alias 표로 검색어를 바꾼 뒤 찾습니다.
+    - 그 외에는 문자 n-gram 색인으로 후보를 모으고 편집 거리로 순위를 매깁니다.
+    - 학과 목록은 loader()로 읽어오며 refresh_interval마다 백그라운드에서 갱신합니다.
+
+    :param loader: {"college", "department"} dict 또는 학과명 문자열 목록을 반환하는 함수
+    """
+    def __init__(self, loader: Callable[[], List[Any]], aliases: Optional[Dict[str, str]] = None, refresh_interval: float = 3600, min_score: float = 1.2, retry_interval: float = 60):
+        self.loader = loader
+        self.aliases = dict(DEFAULT_DEPARTMENT_ALIASES if aliases is None else aliases)
+        self.refresh_interval = refresh_interval
+        self.retry_interval = retry_interval
+        self.min_score = min_score
+
+        self._departments: List[str] = []
+        self._colleges: Dict[str, Optional[str]] = {}
+        self._exact: Dict[str, str] = {}
+        self._index = NgramIndex()
+        self._loaded_at = 0.0
+        self._next_refresh_at = 0.0
+        # 최초 로드와 백그라운드 갱신이 동시에 하나만 실행되도록 보장
+        self._refresh_lock = threading.Lock()
+
+    @property
+    def departments(self) -> List[str]:
+        self._ensure_loaded()
+        return list(self._departments)
+
+    def get_college(self, department: str) -> Optional[str]:
+        self._ensure_loaded()
+        return self._colleges.get(department)
+
+    def refresh(self):
+        """loader로 학과 목록을 다시 읽어 색인을 만듭니다."""
+        rows = self.loader()
+        colleges: Dict[str, Optional[str]] = {}
+        for row in rows:
+            if isinstance(row, dict):
+                department, college = row.get("department"), row.get("college")
+            else:
+                department, college = row, None
+            if department:
+                colleges.setdefault(department, college)
+
+        departments = sorted(colleges)
+        exact: Dict[str, str] = {}
+        names: List[Tuple[str, str]] = []
+        for department in departments:
+            for name in self._get_names(department):
+                # 짧은 이름이 여러 학과에 겹치면 정확 일치 대상에서 제외 (색인 검색으로 처리)
+                key = normalize(name)
+                if key in exact and exact[key] != department and name != department:
+                    exact[key] = None
+                elif key not in exact:
+                    exact[key] = department
+                names.append((name, department))
+
+        index = NgramIndex.build(names)
+        self._departments, self._colleges = departments, colleges
+        self._exact = {key: value for key, value in exact.items() if value}
+        self._index = index
+        self._loaded_at = time.monotonic()
+        self._next_refresh_at = self._loaded_at + self.refresh_interval
+
+    @staticmethod
+    def _get_names(department: str) -> List[str]:
+        names = [department]
+        for suffix in DEPARTMENT_SUFFIXES:
+            if department.endswith(suffix) and len(department) - len(suffix) >= 2:
+                names.append(department[:-len(suffix)])
+                break
+        return names
+
+    def _ensure_loaded(self):
+        if not self._loaded_at:
+            with self._refresh_lock:
+                if not self._loaded_at:
+                    self.refresh()
+            return
+
+        # lock을 얻은 스레드만 갱신 스레드를 시작하고, 갱신 스레드가 끝나며 lock을 놓음
+        if time.monotonic() >= self._next_refresh_at and self._refresh_lock.acquire(blocking=False):
+            threading.Thread(target=self._refresh_in_background, name="department-resolver-refresh", daemon=True).start()
+
+    def _refresh_in_background(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            # 갱신에 실패하면 기존 목록을 계속 사용하고, 갱신 주기 전체가 아니라 retry_interval 뒤에 다시 시도
+            print(f"⚠️ 학과 목록 갱신 실패: {e}", file=sys.stderr)
+            self._next_refresh_at = time.monotonic() + self.retry_interval
+        finally:
+            self._refresh_lock.release()
+
+    def candidates(self, name: str, limit: int = 5) -> List[Tuple[float, str]]:
+        """이름과 비슷한 학과를 (점수, 학과명) 목록으로 반환합니다."""
+        self._ensure_loaded()
+        query = self.aliases.get(name.strip(), name) if name else name
+        normalized_query = normalize(query)
+        if not normalized_query:
+            return []
+
+        # 접미사를 뗀 어간 ("전기과" -> "전기")이 학과명의 앞부분과 같으면 가산점
+        stem = normalize(self._get_names(query)[-1])
+
+        scores: Dict[str, float] = {}
+        for score, department in self._index.search(query, limit=limit * 4, min_score=0.2):
+            # n-gram 점수와 편집 거리 유사도를 함께 반영
+            normalized_department = normalize(department)
+            distance = levenshtein(normalized_query, normalized_department)
+            similarity = 1 - distance / max(len(normalized_query), len(normalized_department))
+            combined = score + similarity
+            if len(stem) >= 2 and normalized_department.startswith(stem):
+                combined += 0.3
+            if combined > scores.get(department, 0):
+                scores[department] = combined
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], len(item[0])))
+        return [(round(score, 4), department) for department, score in ranked[:limit]]
+
+    def resolve(self, name: Optional[str]) -> Optional[str]:
+        """학과명을 학과 목록에 있는 정식 이름으로 바꿉니다. 찾지 못하면 None을 반환합니다."""
+        if not name:
+            return None
+        self._ensure_loaded()
+
+        exact = self._exact.get(normalize(name))
+        if exact:
+            return exact
+
+        alias = self.aliases.get(name.strip())
+        if alias:
+            exact = self._exact.get(normalize(alias))
+            if exact:
+                return exact
+
+        candidates = self.candidates(name, limit=2)
+        if not candidates or candidates[0][0] < self.min_score:
+            return None
+        # 점수가 같은 학과가 둘 이상이면 어느 쪽인지 알 수 없으므로 정규화하지 않음 (예: "요리학과" -> 물리학과/심리학과)
+        if len(candidates) > 1 and candidates[1][0] == candidates[0][0]:
+            return None
+        return candidates[0][1]
+
+    def find_mentions(self, text: str) -> Dict[str, str]:
+        """문장에서 학과명처럼 보이는 표현을 찾아 {표현: 정식 학과명}으로 반환합니다."""
+        mentions = {}
+        for mention in _DEPARTMENT_MENTION_PATTERN.findall(text or ""):
+            resolved = self.resolve(mention)
+            if resolved:
+                mentions[mention] = resolved
+        for alias in self.aliases:
+            if alias in (text or "") and alias not in mentions:
+                resolved = self.resolve(alias)
+                if resolved:
+                    mentions[alias] = resolved
+        return mentions
@@ -1,8 +1,12 @@
 from mcp.server.fastmcp import FastMCP
-from agent.sql_agent import SQLAgent
+from agent.sql_agent import get_sql_agent, refresh_schema
+from database.course_keyword_index import INDEXED_TABLES, format_keyword_results, keyword_index
+from typing import Optional
 from mcp_server_config_loader import get_server_config_from_db
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
+from departments import annotate_departments
+import asyncio
 import sys
 
 mcp = FastMCP(
@@ -17,13 +21,22 @@ async def health_check(request: Request) -> PlainTextResponse:
     return PlainTextResponse("ok")
 
 
+@mcp.custom_route("/schema/refresh", methods=["POST"])
+async def refresh_schema_cache(request: Request) -> PlainTextResponse:
+    # 테이블 구조가 변경된 경우 캐시된 스키마 정보를 다시 읽어옴
+    # DB를 조회하는 동기 함수이므로 이벤트 루프를 막지 않도록 스레드에서 실행
+    count = await asyncio.to_thread(refresh_schema)
+    await asyncio.to_thread(keyword_index.refresh)
+    return PlainTextResponse(f"refreshed {count} agents")
+
+
 @mcp.tool(
     name="search_syllabus",
     description="우리 학교(충남대학교)의 과목 및 강의계획서 정보를 조회"
 )
 def search_syllabus(full_instruction: str) -> str:
     try:
-        sql_agent = SQLAgent(allowed_tables=['syllabus'])
+        sql_agent = get_sql_agent(allowed_tables=['syllabus'])
         
         print(full_instruction)
         
@@ -34,16 +47,16 @@ def search_syllabus(full_instruction: str) -> str:
         
         3. If the course is offered in graduate school, you must explicitly state that it is a graduate-level course.
         
-        4. If the course is not found in the database, extract and separate the core keywords from the input course title.
-        Example : "%인간컴퓨터상호작용%" -> "%인간%", "%컴퓨터%", "%상호작용%"
+        4. Before writing the query, use the `search_keywords` tool to resolve the course title and the department to the exact values stored in the table,
+        and filter with `=` or `IN` using those values. (ex. "인간컴퓨터상호작용" -> subject_name IN ('인간컴퓨터상호작용', ...))
         
-        5. and, extract and separate the core keywords from the input department too.
-        Example : ("전기공학과" -> "%전기%"), ("경영학부" -> "%경영%"), ("컴퓨터융합학부" -> "%컴퓨터%", "%융합%"), ("정보통신융합학부" -> "%정보%", "%통신%", "%융합%")
+        5. Only if `search_keywords` finds nothing, extract and separate the core keywords and use LIKE.
+        Example : "%인간컴퓨터상호작용%" -> "%인간%", "%컴퓨터%", "%상호작용%" / ("컴퓨터융합학부" -> "%컴퓨터%", "%융합%")
         
         6. 학과 이름이 주어지지 않았다면 과목명으로만 탐색하세요. '충남대학교'는 학과 이름이 아닙니다.
         '''
         
-        result = sql_agent.question(prompt, full_instruction)
+        result = sql_agent.question(prompt, annotate_departments(full_instruction))
         
         answer = result["output"]
     
@@ -62,7 +75,7 @@ def search_syllabus(full_instruction: str) -> str:
 )
 def search_course_registration_info(full_instruction: str) -> str:
     try:
-        sql_agent = SQLAgent(allowed_tables=['course_registration_info'])
+        sql_agent = get_sql_agent(allowed_tables=['course_registration_info'])
         
         prompt = '''
         1. If information that seems to be a department name is specified, you must include it in the WHERE clause.  
@@ -73,16 +86,16 @@ def search_course_registration_info(full_instruction: str) -> str:
         
         4. 만약 해당 강의가 대학원 과정에서 개설되는 과목이라면, 반드시 그 과목이 대학원 수준의 강의임을 명확하게 표시하세요.
         
-        5. If the course is not found in the database, extract and separate the core keywords from the input course title.
-        Example : "%인간컴퓨터상호작용%" -> "%인간%", "%컴퓨터%", "%상호작용%"
+        5. Before writing the query, use the `search_keywords` tool to resolve the course title and the department to the exact values stored in the table,
+        and filter with `=` or `IN` using those values.
         
-        6. and, If the course is not found in the database, extract and separate the core keywords from the input department too.
-        Example : ("전기공학과" -> "%전기%"), ("경영학부" -> "%경영%"), ("컴퓨터융합학부" -> "%컴퓨터%", "%융합%"), ("정보통신융합학부" -> "%정보%", "%통신%", "%융합%")
+        6. Only if `search_keywords` finds nothing, extract and separate the core keywords and use LIKE.
+        Example : "%인간컴퓨터상호작용%" -> "%인간%", "%컴퓨터%", "%상호작용%" / ("컴퓨터융합학부" -> "%컴퓨터%", "%융합%")
         
         7. 학과 이름이 주어지지 않았다면 과목명으로만 탐색하세요. '충남대학교'는 학과 이름이 아닙니다.
         '''
         
-        result = sql_agent.question(prompt, full_instruction)
+        result = sql_agent.question(prompt, annotate_departments(full_instruction))
         
         answer = result["output"]
     
@@ -96,5 +109,24 @@ def search_course_registration_info(full_instruction: str) -> str:
     
     
 
+@mcp.tool(
+    name="search_keywords",
+    description="우리 학교(충남대학교) 강의계획서/수강신청/KOCW 강의 데이터에 실제로 저장된 과목명 또는 학과명 중 키워드와 비슷한 값을 색인에서 찾음. field는 'subject' 또는 'department', table은 syllabus/course_registration_info/kocw_lecture 중 하나 (생략 가능)"
+)
+def search_keywords(keyword: str, field: Optional[str] = None, table: Optional[str] = None) -> str:
+    try:
+        if table and table not in INDEXED_TABLES:
+            return f"지원하지 않는 테이블입니다: {table}"
+        results = keyword_index.search(keyword, tables=[table] if table else None, field=field)
+        return format_keyword_results(results)
+    except Exception as e:
+        print(f"키워드 검색 오류 : {e}", file=sys.stderr)
+        return f"키워드 검색 오류가 발생했습니다. 오류 메시지: {e}"
+
+
+# 첫 tool 호출 전에 엔진 연결, 스키마 조회, agent 구성을 미리 수행
+for allowed_tables in (['syllabus'], ['course_registration_info']):
+    get_sql_agent(allowed_tables=allowed_tables)
+
 print(f"MCP Server({mcp.name}) is running...")
 mcp.run(transport="sse")
\ No newline at end of file
@@ -3,11 +3,15 @@ from agent.sql_agent import SQLAgent
 from mcp_server_config_loader import get_server_config_from_db
 from llm_models.chat_gpt import model_instance as chat_gpt
 from vectordb.chroma.chroma_db import db_instance as chroma_db
+from vectordb.context_builder import ContextBuilder
 
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
 import sys
 
+# 검색 결과를 질의 관련 문장만 남겨 모델별 토큰 예산 안에서 컨텍스트로 구성
+context_builder = ContextBuilder(model_name=chat_gpt.model_name)
+
 mcp = FastMCP(
     name="department_recommand_search_mcp",
     description="자신이 좋아하는 것, 잘하는 것을 바탕으로 학과 과목을 추천하는 MCP 서버",
@@ -57,8 +61,9 @@ def search_recommand_department(full_instruction: str) -> str:
         return "데이터 조회 오류가 발생했습니다. 다시 시도해주세요. 오류 메시지: {e}"
 
 def retreive(instruction: str, department: str = None) -> str:
-    retreive_result = chroma_db.query(input = instruction, n_results=10)
-    return retreive_result
+    # 학과 추천에 필요한 department 메타데이터까지 함께 조회
+    retreive_result = chroma_db.query_candidates(chroma_db.embed(instruction), n_results=10)
+    return context_builder.build(instruction, retreive_result)
 
 print(f"MCP Server({mcp.name}) is running...")
 mcp.run(transport="sse")
\ No newline at end of file
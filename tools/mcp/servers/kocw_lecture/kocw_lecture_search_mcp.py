@@ -1,10 +1,11 @@
 from mcp.server.fastmcp import FastMCP
-from agent.sql_agent import SQLAgent
+from agent.sql_agent import get_sql_agent
 from starlette.requests import Request
 from starlette.responses import PlainTextResponse
+from departments import annotate_departments
 import sys
 
-sql_agent = SQLAgent(allowed_tables=['kocw_lecture'])
+sql_agent = get_sql_agent(allowed_tables=['kocw_lecture'])
 
 mcp = FastMCP(
     name="kocw_lecture_search_mcp",
@@ -27,15 +28,18 @@ def kocw_lecture_search(full_instruction: str) -> str:
         If `full_instruction` includes text that can reasonably be interpreted as a department name, **you must** include a corresponding `WHERE` clause using that department.
         Only include department names that exist in the `kocw_lecture` table. If a non-existent department is specified, the query must result in an error.
 
-        If the course is not found in the database, extract and separate the core keywords from the input course title.
+        Before writing the query, use the `search_keywords` tool to find the exact `subject_name` and `department` values stored in the `kocw_lecture` table
+        that are similar to the given lecture name and department, and filter with `=` or `IN` using those values.
+
+        Only if `search_keywords` finds nothing, extract and separate the core keywords from the input course title and use LIKE.
         Example: "%인간컴퓨터상호작용%" -> "%인간%", "%컴퓨터%", "%상호작용%"
 
-        Find the department name that is most similar to the department name provided in the instruction, and write a SQL query using that matched department name.
+        If the instruction includes resolved department names, use them as they are. Otherwise, find the department name that is most similar to the department name provided in the instruction, and write a SQL query using that matched department name.
 
         The query must return the following columns: `(subject_name, description,university, professor_name, created_at, url)`.
         '''
         
-        result = sql_agent.question(prompt, full_instruction)
+        result = sql_agent.question(prompt, annotate_departments(full_instruction))
         
         answer = result["output"]
     
@@ -1,30 +1,503 @@
+import asyncio
+import glob
+import math
+import os
+import queue
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
 import chromadb
-from sentence_transformers import SentenceTransformer
+import numpy as np
+
+from ..text_similarity import compact, iter_distinct, tokenize
+
+CHROMA_PATH = "./tools/mcp/vectordb/chroma/chroma"
+EMBEDDING_MODEL_NAME = "snunlp/KR-SBERT-V40K-klueNLI-augSTS"
+
+# torch: 기존 full-precision PyTorch
+# torch-int8: Linear 층 int8 동적 양자화 (PyTorch)
+# onnx / onnx-int8: ONNX Runtime (변환/양자화한 모델은 EMBEDDING_CACHE_DIR에 저장해 재사용)
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+DEFAULT_EMBEDDING_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "models")
+
+
+def _find_file(directory: str, file_name: str) -> Optional[str]:
+    """directory 아래에서 file_name을 찾아 directory 기준 상대 경로를 반환합니다."""
+    for path in sorted(glob.glob(os.path.join(directory, "**", file_name), recursive=True)):
+        return os.path.relpath(path, directory)
+    return None
+
+
+def _export_onnx_model(model_name: str, export_dir: str):
+    from sentence_transformers import SentenceTransformer
+
+    # 다른 프로세스(메인 앱/MCP 서버)와 동시에 변환하더라도 완성된 디렉토리만 보이도록 임시 디렉토리에 저장 후 이동
+    temp_dir = f"{export_dir}.tmp-{os.getpid()}"
+    SentenceTransformer(model_name, backend="onnx", device="cpu").save_pretrained(temp_dir)
+    try:
+        os.rename(temp_dir, export_dir)
+    except OSError:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def _load_onnx_model(model_name: str, cache_dir: str, quantize: bool):
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    export_dir = os.path.join(cache_dir, model_name.replace("/", "__") + "-onnx")
+    if _find_file(export_dir, "model.onnx") is None:
+        os.makedirs(cache_dir, exist_ok=True)
+        _export_onnx_model(model_name, export_dir)
+
+    file_name = _find_file(export_dir, "model.onnx")
+    if quantize:
+        # avx2 / avx512 / avx512_vnni / arm64 중 서버 CPU에 맞는 설정 사용
+        config = os.getenv("EMBEDDING_ONNX_QUANTIZATION", "avx2")
+        quantized_file_name = _find_file(export_dir, f"model_qint8_{config}.onnx")
+        if quantized_file_name is None:
+            model = SentenceTransformer(export_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
+            export_dynamic_quantized_onnx_model(model, quantization_config=config, model_name_or_path=export_dir)
+            quantized_file_name = _find_file(export_dir, f"model_qint8_{config}.onnx")
+        file_name = quantized_file_name
+
+    return SentenceTransformer(export_dir, backend="onnx", device="cpu", model_kwargs={"file_name": file_name})
+
+
+def load_embedding_model(backend: Optional[str] = None, model_name: str = EMBEDDING_MODEL_NAME, cache_dir: Optional[str] = None):
+    """
+    지정한 backend로 SentenceTransformer 모델을 불러옵니다.
+    :param backend: EMBEDDING_BACKENDS 중 하나 (없으면 환경 변수 EMBEDDING_BACKEND, 기본값 torch)
+    :param cache_dir: ONNX 변환 모델을 저장할 디렉토리 (없으면 환경 변수 EMBEDDING_CACHE_DIR)
+    """
+    backend = (backend or os.getenv("EMBEDDING_BACKEND", "torch")).lower()
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"지원하지 않는 임베딩 backend입니다: {backend} (가능한 값: {', '.join(EMBEDDING_BACKENDS)})")
+    cache_dir = cache_dir or os.getenv("EMBEDDING_CACHE_DIR", DEFAULT_EMBEDDING_CACHE_DIR)
+
+    # sentence_transformers(torch) import 자체가 무거우므로 모델이 필요할 때 import
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return _load_onnx_model(model_name, cache_dir, quantize=backend == "onnx-int8")
+
+
+class EmbeddingService:
+    """
+    동시에 들어온 임베딩 요청을 모아(micro-batching) 한 번의 forward pass로 계산하는 서비스입니다.
+
+    - 모델 추론은 전용 worker 스레드에서 실행되므로 이벤트 루프를 막지 않습니다.
+    - 첫 요청이 들어온 뒤 max_wait_ms 동안 (최대 max_batch_size개까지) 요청을 더 모아 함께 인코딩합니다.
+    - 질의 임베딩은 LRU 캐시(cache_size개)에 보관해 같은 질문은 다시 계산하지 않습니다.
+    """
+    def __init__(self, encode: Callable[[List[str]], Any], max_batch_size: int = 32, max_wait_ms: float = 5, cache_size: int = 1024):
+        self.encode = encode
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.cache_size = cache_size
+
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+        self._cache_hits = 0
+        self._batches = 0
+        self._encoded = 0
+
+    def _get_cached(self, text: str):
+        with self._cache_lock:
+            embedding = self._cache.get(text)
+            if embedding is not None:
+                self._cache.move_to_end(text)
+                self._cache_hits += 1
+            return embedding
+
+    def _put_cached(self, text: str, embedding: np.ndarray):
+        with self._cache_lock:
+            self._cache[text] = embedding
+            self._cache.move_to_end(text)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def submit(self, text: str) -> Future:
+        """임베딩 계산을 요청하고 결과를 받을 Future를 반환합니다."""
+        future: Future = Future()
+        embedding = self._get_cached(text)
+        if embedding is not None:
+            future.set_result(embedding)
+        else:
+            self._queue.put((text, future))
+        return future
+
+    def embed(self, text: str) -> np.ndarray:
+        """임베딩을 동기로 계산합니다. (worker 스레드에서 다른 요청과 함께 배치 처리)"""
+        return self.submit(text).result()
+
+    async def aembed(self, text: str) -> np.ndarray:
+        """임베딩을 비동기로 계산합니다. 이벤트 루프는 결과를 기다리는 동안 다른 작업을 처리합니다."""
+        return await asyncio.wrap_future(self.submit(text))
+
+    def _collect_batch(self) -> List[Tuple[str, Future]]:
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect_batch()
+
+            # 같은 문장은 한 번만 인코딩
+            pending: Dict[str, List[Future]] = {}
+            for text, future in batch:
+                if future.set_running_or_notify_cancel():
+                    pending.setdefault(text, []).append(future)
+            if not pending:
+                continue
+
+            texts = list(pending)
+            try:
+                embeddings = np.asarray(self.encode(texts))
+            except Exception as e:
+                for futures in pending.values():
+                    for future in futures:
+                        future.set_exception(e)
+                continue
+
+            self._batches += 1
+            self._encoded += len(texts)
+            for text, embedding in zip(texts, embeddings):
+                embedding.setflags(write=False)
+                self._put_cached(text, embedding)
+                for future in pending[text]:
+                    future.set_result(embedding)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            "batches": self._batches,
+            "encoded": self._encoded,
+            "avg_batch_size": self._encoded / self._batches if self._batches else 0.0,
+            "cache_hits": self._cache_hits,
+            "cache_entries": len(self._cache),
+            "queued": self._queue.qsize(),
+        }
+
 
 class ChromaDB:
-    def __init__(self, collection_name:str = "interview_data"):
-        self.__client = chromadb.PersistentClient(path="./tools/mcp/vectordb/chroma/chroma")
-        self.__collection = self.__client.get_or_create_collection(name = collection_name)
-        self.__embedding_model = SentenceTransformer("snunlp/KR-SBERT-V40K-klueNLI-augSTS")
+    def __init__(self, collection_name:str = "interview_data", embedding_backend: Optional[str] = None):
+        self.collection_name = collection_name
+        self.embedding_backend = embedding_backend or os.getenv("EMBEDDING_BACKEND", "torch")
+        # 클라이언트/컬렉션과 임베딩 모델은 import 시점이 아니라 처음 사용할 때(또는 warm_up()에서) 불러옴
+        self.__collection = None
+        self.__embedding_model = None
+        self.__collection_lock = threading.Lock()
+        self.__model_lock = threading.Lock()
+        self.embedding_service = EmbeddingService(self.__encode)
+
+    def get_collection(self):
+        if self.__collection is None:
+            with self.__collection_lock:
+                if self.__collection is None:
+                    client = chromadb.PersistentClient(path=CHROMA_PATH)
+                    self.__collection = client.get_or_create_collection(name = self.collection_name)
+        return self.__collection
+
+    def warm_up(self):
+        """
+        컬렉션을 열고 임베딩 모델을 불러온 뒤 한 번 인코딩해 첫 요청의 지연을 없앱니다.
+        """
+        self.get_collection()
+        self.embed("warm up")
+
+    def get_embedding_model(self):
+        if self.__embedding_model is None:
+            with self.__model_lock:
+                if self.__embedding_model is None:
+                    started_at = time.perf_counter()
+                    self.__embedding_model = load_embedding_model(self.embedding_backend)
+                    print(f"임베딩 모델 로드 완료 (backend: {self.embedding_backend}, {time.perf_counter() - started_at:.1f}s)", file=sys.stderr)
+        return self.__embedding_model
+
+    def __encode(self, texts: List[str]):
+        return self.get_embedding_model().encode(texts)
 
     def __get_embeddings(self, input_str: str):
-        return self.__embedding_model.encode(input_str)
+        return self.embedding_service.embed(input_str)
 
-    def query(self, input: str, filter:list = [], n_results:int = 10):
-        doc_embeddings = self.__get_embeddings(input)
-        
+    def embed(self, input_str: str):
+        """
+        컬렉션과 같은 임베딩 모델(KR-SBERT)로 문장 임베딩을 계산합니다.
+        """
+        return self.__get_embeddings(input_str)
+
+    async def aembed(self, input_str: str):
+        """
+        embed의 비동기 버전. 동시에 들어온 요청과 함께 배치로 계산됩니다.
+        """
+        return await self.embedding_service.aembed(input_str)
+
+    def __query_by_embeddings(self, doc_embeddings, filter:list, n_results:int):
         # filter가 빈 리스트가 아닐 때만 where 조건 적용
         where_condition = {"department": {"$in": filter}} if filter else None
-        
-        query_result = self.__collection.query(
+
+        query_result = self.get_collection().query(
                 query_embeddings=doc_embeddings,
                 where=where_condition,
                 n_results=n_results
         )
-        
+
         print("ids: ", query_result['ids'][0])
         print("documents: ", query_result["documents"][0])
         return query_result['ids'][0],query_result["documents"][0]
 
+    def query_candidates(self, doc_embeddings, filter:list = [], n_results:int = 10) -> List[Dict[str, Any]]:
+        """
+        임베딩으로 검색해 id, document, metadata, distance를 가진 dict 목록(거리 오름차순)을 반환합니다.
+        """
+        where_condition = {"department": {"$in": filter}} if filter else None
+        query_result = self.get_collection().query(
+                query_embeddings=doc_embeddings,
+                where=where_condition,
+                n_results=n_results,
+                include=["documents", "metadatas", "distances"]
+        )
+        return [
+            {"id": doc_id, "document": document, "metadata": metadata or {}, "distance": distance}
+            for doc_id, document, metadata, distance in zip(
+                query_result["ids"][0], query_result["documents"][0],
+                query_result["metadatas"][0], query_result["distances"][0]
+            )
+        ]
+
+    def get_all_chunks(self, batch_size: int = 1000) -> List[Dict[str, Any]]:
+        """
+        컬렉션의 모든 청크를 id, document, metadata를 가진 dict 목록으로 반환합니다.
+        """
+        collection = self.get_collection()
+        chunks = []
+        offset = 0
+        while True:
+            result = collection.get(limit=batch_size, offset=offset, include=["documents", "metadatas"])
+            for doc_id, document, metadata in zip(result["ids"], result["documents"], result["metadatas"]):
+                chunks.append({"id": doc_id, "document": document or "", "metadata": metadata or {}})
+            if len(result["ids"]) < batch_size:
+                return chunks
+            offset += batch_size
+
+    def query(self, input: str, filter:list = [], n_results:int = 10):
+        doc_embeddings = self.__get_embeddings(input)
+        return self.__query_by_embeddings(doc_embeddings, filter, n_results)
+
+    async def aquery(self, input: str, filter:list = [], n_results:int = 10):
+        """
+        query의 비동기 버전. 임베딩은 배치 서비스에서, 벡터 검색은 스레드에서 수행합니다.
+        """
+        doc_embeddings = await self.aembed(input)
+        return await asyncio.to_thread(self.__query_by_embeddings, doc_embeddings, filter, n_results)
+
+
+class BM25Index:
+    """
+    청크 목록에 대한 in-memory BM25 역색인입니다.
+    """
+    def __init__(self, documents: List[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+
+        for doc_index, document in enumerate(documents):
+            tokens = tokenize(document)
+            self._lengths.append(len(tokens))
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, count in counts.items():
+                self._postings.setdefault(token, []).append((doc_index, count))
+
+        self._average_length = (sum(self._lengths) / len(self._lengths)) if self._lengths else 0.0
+
+    def search(self, query: str, limit: int = 10, allowed: Optional[set] = None) -> List[Tuple[int, float]]:
+        """질의와 관련된 문서를 (문서 번호, 점수) 목록으로 점수 내림차순 반환합니다."""
+        document_count = len(self._lengths)
+        scores: Dict[int, float] = {}
+        for token in set(tokenize(query)):
+            postings = self._postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (document_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_index, count in postings:
+                if allowed is not None and doc_index not in allowed:
+                    continue
+                norm = self.k1 * (1 - self.b + self.b * self._lengths[doc_index] / self._average_length)
+                scores[doc_index] = scores.get(doc_index, 0.0) + idf * count * (self.k1 + 1) / (count + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: -item[1])
+        return [(doc_index, float(score)) for doc_index, score in ranked[:limit]]
+
+
+@dataclass(frozen=True)
+class _RetrieverSnapshot:
+    """한 번의 갱신으로 만든 청크 목록/색인/학과 목록. 검색 하나는 같은 스냅샷만 사용합니다."""
+    chunks: List[Dict[str, Any]]
+    index: BM25Index
+    department_chunks: Dict[str, set]
+    departments: Dict[str, str]
+    loaded_at: float
+
+
+class HybridRetriever:
+    """
+    벡터 검색과 BM25 키워드 검색을 함께 사용하는 검색기입니다.
+
+    - 학과명은 resolve_department(앱 전체에서 쓰는 DepartmentResolver.resolve)로 정식 학과명으로 바꾼 뒤
+      컬렉션 메타데이터의 학과명과 (공백 무시) 일치시킵니다. 찾지 못하면 학과 필터 없이 검색합니다.
+    - 두 검색 결과의 순위를 RRF(Reciprocal Rank Fusion)로 합칩니다.
+    - 내용이 거의 같은 청크(3-gram 겹침 비율이 duplicate_threshold 이상)는 하나만 남깁니다.
+    - BM25 색인은 컬렉션 전체를 읽어 만들고 refresh_interval마다 다시 만듭니다.
+      갱신은 한 번에 하나만 수행하며, 갱신 중에도 다른 검색은 이전 스냅샷을 사용합니다.
+    """
+    def __init__(self, chroma: "ChromaDB", resolve_department: Optional[Callable[[str], Optional[str]]] = None, rrf_k: int = 60,
+                 candidate_k: int = 30, duplicate_threshold: float = 0.85, refresh_interval: float = 3600):
+        self.chroma = chroma
+        self.resolve_department = resolve_department
+        self.rrf_k = rrf_k
+        self.candidate_k = candidate_k
+        self.duplicate_threshold = duplicate_threshold
+        self.refresh_interval = refresh_interval
+
+        self._snapshot: Optional[_RetrieverSnapshot] = None
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self) -> _RetrieverSnapshot:
+        """컬렉션의 청크를 다시 읽어 BM25 색인과 학과 목록을 만듭니다."""
+        chunks = self.chroma.get_all_chunks()
+        department_chunks: Dict[str, set] = {}
+        for index, chunk in enumerate(chunks):
+            department = chunk["metadata"].get("department")
+            if department:
+                department_chunks.setdefault(department, set()).add(index)
+
+        snapshot = _RetrieverSnapshot(
+            chunks=chunks,
+            index=BM25Index([chunk["document"] for chunk in chunks]),
+            department_chunks=department_chunks,
+            departments={compact(department): department for department in department_chunks},
+            loaded_at=time.monotonic(),
+        )
+        self._snapshot = snapshot
+        print(f"하이브리드 검색 색인 갱신: 청크 {len(chunks)}개, 학과 {len(department_chunks)}개", file=sys.stderr)
+        return snapshot
+
+    def warm_up(self):
+        self._get_snapshot()
+
+    def _get_snapshot(self) -> _RetrieverSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None and time.monotonic() - snapshot.loaded_at < self.refresh_interval:
+            return snapshot
+
+        # 이미 다른 스레드가 갱신 중이면 기존 스냅샷을 그대로 사용 (최초 로드만 완료될 때까지 대기)
+        if not self._refresh_lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            current = self._snapshot
+            if current is not None and current is not snapshot:
+                return current
+            return self.refresh()
+        except Exception as e:
+            # 갱신에 실패하면 기존 색인을 계속 사용
+            print(f"하이브리드 검색 색인 갱신 오류: {e}", file=sys.stderr)
+            if snapshot is None:
+                raise
+            return snapshot
+        finally:
+            self._refresh_lock.release()
+
+    def canonicalize_department(self, department: Optional[str]) -> Optional[str]:
+        """학과명을 컬렉션 메타데이터에 저장된 학과명으로 바꿉니다. 찾지 못하면 None을 반환합니다."""
+        return self._canonicalize_department(self._get_snapshot(), department)
+
+    def _canonicalize_department(self, snapshot: _RetrieverSnapshot, department: Optional[str]) -> Optional[str]:
+        if not department:
+            return None
+        if self.resolve_department is not None:
+            try:
+                department = self.resolve_department(department) or department
+            except Exception as e:
+                print(f"⚠️ 학과명 정규화 실패: {e}", file=sys.stderr)
+
+        if department in snapshot.department_chunks:
+            return department
+        # 컬렉션 메타데이터의 표기가 공백/기호만 다른 경우
+        return snapshot.departments.get(compact(department))
+
+    def _fuse(self, snapshot: _RetrieverSnapshot, query: str, vector_candidates: List[Dict[str, Any]], department: Optional[str], n_results: int) -> List[Dict[str, Any]]:
+        allowed = snapshot.department_chunks.get(department) if department else None
+        keyword_candidates = snapshot.index.search(query, limit=self.candidate_k, allowed=allowed)
+
+        chunks: Dict[str, Dict[str, Any]] = {}
+        scores: Dict[str, float] = {}
+        for rank, candidate in enumerate(vector_candidates):
+            chunks[candidate["id"]] = candidate
+            scores[candidate["id"]] = scores.get(candidate["id"], 0.0) + 1 / (self.rrf_k + rank + 1)
+        for rank, (doc_index, _) in enumerate(keyword_candidates):
+            chunk = snapshot.chunks[doc_index]
+            chunks.setdefault(chunk["id"], chunk)
+            scores[chunk["id"]] = scores.get(chunk["id"], 0.0) + 1 / (self.rrf_k + rank + 1)
+
+        results = []
+        ranked = sorted(scores, key=lambda key: -scores[key])
+        for chunk_id in iter_distinct(ranked, lambda key: chunks[key]["document"], self.duplicate_threshold):
+            chunk = chunks[chunk_id]
+            results.append({
+                "id": chunk_id,
+                "document": chunk["document"],
+                "metadata": chunk["metadata"],
+                "score": round(scores[chunk_id], 6),
+            })
+            if len(results) >= n_results:
+                break
+        return results
+
+    def _search_by_embedding(self, query: str, embedding, department: Optional[str], n_results: int) -> List[Dict[str, Any]]:
+        snapshot = self._get_snapshot()
+        canonical_department = self._canonicalize_department(snapshot, department)
+        if department and canonical_department is None:
+            print(f"⚠️ 컬렉션에서 학과를 찾지 못해 전체에서 검색합니다: {department}", file=sys.stderr)
+
+        filter = [canonical_department] if canonical_department else []
+        vector_candidates = self.chroma.query_candidates(embedding, filter=filter, n_results=self.candidate_k)
+        return self._fuse(snapshot, query, vector_candidates, canonical_department, n_results)
+
+    def search(self, query: str, department: Optional[str] = None, n_results: int = 5) -> List[Dict[str, Any]]:
+        """
+        질의와 관련된 청크를 id, document, metadata, score를 가진 dict 목록(점수 내림차순)으로 반환합니다.
+        """
+        return self._search_by_embedding(query, self.chroma.embed(query), department, n_results)
+
+    async def asearch(self, query: str, department: Optional[str] = None, n_results: int = 5) -> List[Dict[str, Any]]:
+        """search의 비동기 버전. 임베딩은 배치 서비스에서, 색인/벡터 검색은 스레드에서 수행합니다."""
+        embedding = await self.chroma.aembed(query)
+        return await asyncio.to_thread(self._search_by_embedding, query, embedding, department, n_results)
+
 
-db_instance = ChromaDB(collection_name="interview_data")
\ No newline at end of file
+db_instance = ChromaDB(collection_name="interview_data")
@@ -0,0 +1,114 @@
+"""
+임베딩 backend별 정확도/지연 시간 비교 스크립트입니다.
+
+현재 컬렉션에 저장된 문서 임베딩(full-precision torch로 만든 값)을 기준으로
+- cosine: 같은 문서를 각 backend로 다시 임베딩했을 때 저장된 벡터와의 코사인 유사도
+- recall@k: 문서 앞부분을 질의로 검색했을 때 원래 문서가 상위 k개 안에 들어오는 비율
+- 단건/배치 인코딩 지연 시간, 모델 로드 시간, RSS 증가량
+을 출력합니다.
+
+저장소 루트에서 실행합니다.
+    python -m tools.mcp.vectordb.chroma.embedding_benchmark --backends torch torch-int8 onnx onnx-int8
+"""
+import argparse
+import gc
+import statistics
+import time
+
+import chromadb
+import numpy as np
+import psutil
+
+from tools.mcp.vectordb.chroma.chroma_db import CHROMA_PATH, EMBEDDING_BACKENDS, load_embedding_model
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+def _to_query(document: str, max_chars: int) -> str:
+    # 첫 문장(없으면 앞부분)을 질의로 사용
+    first_sentence = document.replace("?", ".").split(".")[0].strip()
+    return (first_sentence or document)[:max_chars]
+
+
+def benchmark(backend: str, collection, documents, ids, stored_embeddings, queries, k: int, batch_size: int):
+    process = psutil.Process()
+    gc.collect()
+    rss_before = process.memory_info().rss
+
+    started_at = time.perf_counter()
+    model = load_embedding_model(backend)
+    load_seconds = time.perf_counter() - started_at
+    model.encode(queries[:1])  # warm-up
+    rss_mb = (process.memory_info().rss - rss_before) / 1024 / 1024
+
+    # 정확도 1: 저장된 문서 벡터와의 코사인 유사도
+    embeddings = model.encode(documents, batch_size=batch_size)
+    cosines = [
+        float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+        for a, b in zip(embeddings, stored_embeddings)
+    ]
+
+    # 정확도 2: 문서 앞부분으로 검색했을 때 원래 문서가 상위 k개에 포함되는 비율
+    query_embeddings = model.encode(queries, batch_size=batch_size)
+    result = collection.query(query_embeddings=query_embeddings.tolist(), n_results=k)
+    hits = sum(doc_id in result_ids for doc_id, result_ids in zip(ids, result["ids"]))
+
+    # 지연 시간: 단건 인코딩 (실제 질의와 같은 패턴)
+    latencies = []
+    for query in queries:
+        started_at = time.perf_counter()
+        model.encode([query])
+        latencies.append((time.perf_counter() - started_at) * 1000)
+
+    started_at = time.perf_counter()
+    model.encode(queries[:batch_size], batch_size=batch_size)
+    batch_ms = (time.perf_counter() - started_at) * 1000
+
+    del model
+    gc.collect()
+
+    return {
+        "backend": backend,
+        "load_s": load_seconds,
+        "rss_mb": rss_mb,
+        "cosine_mean": statistics.mean(cosines),
+        "cosine_min": min(cosines),
+        "recall": hits / len(ids),
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "batch_ms": batch_ms,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="임베딩 backend 정확도/지연 시간 비교")
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--collection", default="interview_data")
+    parser.add_argument("--samples", type=int, default=200, help="비교에 사용할 문서 수")
+    parser.add_argument("--query-chars", type=int, default=60, help="질의로 사용할 문서 앞부분 길이")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=32)
+    args = parser.parse_args()
+
+    collection = chromadb.PersistentClient(path=CHROMA_PATH).get_collection(args.collection)
+    sample = collection.get(limit=args.samples, include=["documents", "embeddings"])
+    ids, documents = sample["ids"], sample["documents"]
+    stored_embeddings = np.asarray(sample["embeddings"])
+    queries = [_to_query(document, args.query_chars) for document in documents]
+    print(f"컬렉션 '{args.collection}'에서 문서 {len(ids)}개로 비교합니다.\n")
+
+    print(f"{'backend':<12}{'load(s)':>9}{'RSS(MB)':>9}{'cos avg':>9}{'cos min':>9}{f'R@{args.k}':>8}{'p50(ms)':>9}{'p95(ms)':>9}{f'x{args.batch_size}(ms)':>10}")
+    for backend in args.backends:
+        result = benchmark(backend, collection, documents, ids, stored_embeddings, queries, args.k, args.batch_size)
+        print(
+            f"{result['backend']:<12}{result['load_s']:>9.1f}{result['rss_mb']:>9.0f}"
+            f"{result['cosine_mean']:>9.4f}{result['cosine_min']:>9.4f}{result['recall']:>8.3f}"
+            f"{result['p50_ms']:>9.1f}{result['p95_ms']:>9.1f}{result['batch_ms']:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+import os
+import re
+import tiktoken
+
+from .text_similarity import iter_distinct, tokenize
+
+# 모델별 RAG 컨텍스트 토큰 예산 (단가가 높은 모델일수록 작게)
+DEFAULT_CONTEXT_TOKEN_BUDGETS = {
+    "gpt-4o-mini": 2000,
+    "gpt-4.1-mini": 2000,
+    "gpt-4o": 1500,
+    "gpt-4.1": 1500,
+}
+DEFAULT_CONTEXT_TOKEN_BUDGET = 1500
+
+# 예산이 이보다 적게 남으면 다음 청크를 잘라 넣지 않고 중단
+MIN_PARTIAL_CHUNK_TOKENS = 50
+
+_SENTENCE_PATTERN = re.compile(r"(?<=[.!?。])\s+|\n+")
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+Chunks = Union[Sequence[Dict[str, Any]], Tuple[Sequence[str], Sequence[str]]]
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model_name: str):
+    try:
+        return tiktoken.encoding_for_model(model_name)
+    except KeyError:
+        return tiktoken.get_encoding("o200k_base")
+
+
+def get_token_budget(model_name: str) -> int:
+    """
+    모델의 컨텍스트 토큰 예산을 반환합니다. 환경 변수 CONTEXT_TOKEN_BUDGET이 있으면 그 값을 사용합니다.
+    """
+    budget = os.getenv("CONTEXT_TOKEN_BUDGET")
+    if budget:
+        return int(budget)
+    return DEFAULT_CONTEXT_TOKEN_BUDGETS.get(model_name, DEFAULT_CONTEXT_TOKEN_BUDGET)
+
+
+class ContextBuilder:
+    """
+    검색 결과 청크를 프롬프트에 넣을 컨텍스트 문자열로 만듭니다.
+
+    1. 같은/거의 같은 청크를 제거합니다. (이미 중복을 제거한 검색 결과라면 duplicate_threshold=None으로 생략)
+    2. 각 청크에서 질의와 겹치는 단어가 많은 문장만 max_sentences개까지 (원래 순서대로) 남깁니다.
+    3. "[id] (학과) 문장..." 한 줄 형식으로 만들고, 검색 순위대로 토큰 예산 안에서만 넣습니다.
+
+    :param model_name: 토큰 계산과 기본 예산에 사용할 모델명
+    :param token_budget: 컨텍스트 최대 토큰 수 (없으면 get_token_budget(model_name))
+    """
+    def __init__(self, model_name: str = "gpt-4o-mini", token_budget: Optional[int] = None, max_sentences: int = 4, duplicate_threshold: Optional[float] = 0.85):
+        self.model_name = model_name
+        self.token_budget = token_budget
+        self.max_sentences = max_sentences
+        self.duplicate_threshold = duplicate_threshold
+
+    def count_tokens(self, text: str) -> int:
+        return len(_get_encoding(self.model_name).encode(text or ""))
+
+    @staticmethod
+    def _to_chunks(chunks: Chunks) -> List[Dict[str, Any]]:
+        # ChromaDB.query의 (ids, documents) 튜플도 허용
+        if isinstance(chunks, tuple) and len(chunks) == 2 and all(isinstance(items, (list, tuple)) for items in chunks):
+            ids, documents = chunks
+            return [{"id": doc_id, "document": document, "metadata": {}} for doc_id, document in zip(ids, documents)]
+        return list(chunks)
+
+    def _dedupe(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        if self.duplicate_threshold is None:
+            return chunks
+        return list(iter_distinct(chunks, lambda chunk: chunk.get("document"), self.duplicate_threshold))
+
+    def trim(self, query: str, document: str) -> str:
+        """문서에서 질의와 관련 있는 문장만 남깁니다."""
+        sentences = [_WHITESPACE_PATTERN.sub(" ", s).strip() for s in _SENTENCE_PATTERN.split(document or "")]
+        sentences = [s for s in sentences if s]
+        if len(sentences) <= self.max_sentences:
+            return " ".join(sentences)
+
+        # 단어와 음절 bigram으로 비교 (조사가 붙은 형태도 일치하도록)
+        query_terms = set(tokenize(query))
+        sentence_terms = [set(tokenize(sentence)) for sentence in sentences]
+        scores = [len(query_terms & terms) / (len(terms) ** 0.5 or 1) for terms in sentence_terms]
+        # 점수가 같으면 앞 문장 우선, 선택한 문장은 원래 순서대로
+        ranked = sorted(range(len(sentences)), key=lambda i: (-scores[i], i))[:self.max_sentences]
+        return " ".join(sentences[i] for i in sorted(ranked))
+
+    @staticmethod
+    def _format(chunk: Dict[str, Any], text: str) -> str:
+        department = (chunk.get("metadata") or {}).get("department")
+        prefix = f"[{chunk.get('id')}]" + (f" ({department})" if department else "")
+        return f"{prefix} {text}"
+
+    def build(self, query: str, chunks: Chunks) -> str:
+        """
+        청크 목록(검색 순위 순)을 토큰 예산 안의 컨텍스트 문자열로 만듭니다.
+        :param chunks: id, document, metadata를 가진 dict 목록 또는 (ids, documents) 튜플
+        """
+        budget = self.token_budget or get_token_budget(self.model_name)
+        encoding = _get_encoding(self.model_name)
+
+        lines, used = [], 0
+        for chunk in self._dedupe(self._to_chunks(chunks)):
+            line = self._format(chunk, self.trim(query, chunk.get("document")))
+            tokens = encoding.encode(line + "\n")
+            if used + len(tokens) <= budget:
+                lines.append(line)
+                used += len(tokens)
+                continue
+
+            # 남은 예산이 충분하면 마지막 청크는 잘라서 넣음
+            remaining = budget - used
+            if remaining >= MIN_PARTIAL_CHUNK_TOKENS:
+                lines.append(encoding.decode(tokens[:remaining - 1]).rstrip() + "…")
+            break
+
+        return "\n".join(lines)
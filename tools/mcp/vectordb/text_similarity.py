@@ -0,0 +1,46 @@
+from typing import Callable, Iterable, Iterator, List, TypeVar
+import re
+
+# 검색 색인, 컨텍스트 구성에서 함께 사용하는 토큰화/중복 판정 함수
+# (tools.mcp.vectordb, vectordb 어느 import 루트에서도 상대 import로 사용)
+
+TOKEN_PATTERN = re.compile(r"[0-9a-z가-힣]+")
+
+T = TypeVar("T")
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    단어와 (2글자 초과 단어의) 음절 bigram을 함께 반환합니다.
+    한국어는 조사가 붙어 단어가 정확히 일치하지 않는 경우가 많아 bigram으로 부분 일치를 보완합니다.
+    """
+    tokens = []
+    for word in TOKEN_PATTERN.findall((text or "").lower()):
+        tokens.append(word)
+        if len(word) > 2:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+def compact(text: str) -> str:
+    """공백/기호를 제거한 소문자 문자열 (예: "컴퓨터 공학과" -> "컴퓨터공학과")"""
+    return "".join(TOKEN_PATTERN.findall((text or "").lower()))
+
+
+def shingles(text: str) -> set:
+    compacted = compact(text)
+    return {compacted[i:i + 3] for i in range(max(len(compacted) - 2, 1))}
+
+
+def iter_distinct(items: Iterable[T], get_text: Callable[[T], str], threshold: float = 0.85) -> Iterator[T]:
+    """
+    앞서 나온 항목과 내용이 거의 같은 항목(3-gram 겹침 비율이 threshold 이상)을 건너뛰며 순서대로 반환합니다.
+    필요한 만큼만 꺼내 쓸 수 있도록 generator로 동작합니다.
+    """
+    selected = []
+    for item in items:
+        item_shingles = shingles(get_text(item))
+        if any(len(item_shingles & other) / max(min(len(item_shingles), len(other)), 1) >= threshold for other in selected):
+            continue
+        selected.append(item_shingles)
+        yield item